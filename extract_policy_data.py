@@ -1,16 +1,14 @@
-import json
+from policy_catalog import load_baseline
 
-with open('phase4_baseline_dump.json', 'r') as f:
-    data = json.load(f)
+data = load_baseline()
 
 def print_policies(table, cmd):
     print(f'=== {table.upper()} {cmd.upper()} ===')
-    for p in data.get(table, []):
-        if p['cmd'] == cmd:
-            print(f"Policy: {p['policy']}")
-            print(f"Roles: {p['roles']}")
-            print(f"Qual: {p['qual']}")
-            print(f"With Check: {p['with_check']}\n")
+    for p in data.select(tables=[table], operations=[cmd]):
+        print(f"Policy: {p.name}")
+        print(f"Roles: {p.roles_text}")
+        print(f"Qual: {p.condition}")
+        print(f"With Check: {p.check_condition}\n")
 
 print_policies('complaints', 'INSERT')
 print_policies('surveys', 'INSERT')
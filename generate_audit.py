@@ -1,5 +1,4 @@
 import csv
-import re
 
 tables = {
   'ai_history': 'ai_content',
@@ -32,71 +31,6 @@ tables = {
   'staff': 'staff'
 }
 
-def clean_qual(qual, table, upgrade_to_exists=True):
-    if not qual or qual == 'null':
-        return None
-    cleaned = re.sub(r" AND \(category = \( SELECT upper\(tenants\.tier\).*?\)\)", "", qual)
-    cleaned = re.sub(r" AND \(plan = \( SELECT upper\(tenants\.plan\).*?\)\)", "", cleaned)
-    if upgrade_to_exists:
-        cleaned = cleaned.replace(
-            "(tenant_id = ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE (user_tenant_mapping.user_id = auth.uid())))",
-            f"EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id)"
-        )
-        cleaned = cleaned.replace(
-            "(tenant_id IN ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE (user_tenant_mapping.user_id = auth.uid())))",
-            f"EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id)"
-        )
-        cleaned = cleaned.replace(
-            "(EXISTS ( SELECT 1 FROM user_tenant_mapping WHERE ((user_tenant_mapping.user_id = auth.uid()) AND (user_tenant_mapping.role = 'super_admin'::text))))",
-            "EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.role = 'super_admin')"
-        )
-        if "super_admin" in cleaned:
-             return f"EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id) OR EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.role = 'super_admin')"
-    while cleaned.startswith('(') and cleaned.endswith(')'):
-        inner = cleaned[1:-1]
-        count = 0
-        balanced = True
-        for char in inner:
-            if char == '(': count += 1
-            elif char == ')': count -= 1
-            if count < 0: balanced = False; break
-        if balanced and count == 0:
-            cleaned = inner
-        else:
-            break
-    return cleaned
-
-def inject_member_access(qual, table, feature):
-    if not qual:
-        return None
-    qual = qual.strip()
-    while qual.startswith('(') and qual.endswith(')'):
-        inner = qual[1:-1]
-        count = 0
-        balanced = True
-        for char in inner:
-            if char == '(': count += 1
-            elif char == ')': count -= 1
-            if count < 0: balanced = False; break
-        if balanced and count == 0:
-            qual = inner
-        else:
-            break
-    
-    # We DO NOT inject anon bypasses into the tenant isolation policy.
-    # We strip any garbage Phase 3B bypasses from the tenant isolation policy 
-    # to maintain strict boundaries.
-    
-    # We only care about stripping auth.role() = 'anon' and auth.role() = 'service_role' 
-    # IF they were mistakenly injected into a tenant policy instead of a standalone public policy.
-    # Wait, the user said: "If the original Phase 4 policy had anon/public behavior, preserve that exact behavior."
-    # But then they said: "For surveys, survey_responses, events and event_rsvps: If Phase 3B already has separate anon policies, do NOT add an anon bypass to the new authenticated/member policy."
-    
-    # Let's cleanly inject the member access ONLY. If the original tenant policy had anon (like complaints),
-    # the user pointed out it's a security flaw if it allows tenant_id IS NOT NULL.
-    # Actually, the user asked me to AUDIT it first, not rewrite the generator yet.
-    pass
-
 def main():
     target_policies = ["Tenant Isolation Insert", "Tenant Isolation Update", 
                        "Users can insert election results for their tenant", 
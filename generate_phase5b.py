@@ -1,6 +1,15 @@
-import csv
-import re
+import argparse
 import json
+from dataclasses import astuple
+
+import policy_expr
+from migration_fragments import IncrementalMigration, source_fingerprint
+from policy_catalog import load_live
+from policy_expr import (
+    PolicyExprError, and_member_access, auth_role_checks, cache_member_access, has_tenant_null_test,
+    initplan_auth_calls, mentions_literal, parse, parse_policy_expr, strip_plan_checks, tenant_or_super_admin,
+    to_sql, unwrap, upgrade_membership_checks,
+)
 
 tables = {
   'ai_history': 'ai_content',
@@ -33,60 +42,34 @@ tables = {
   'staff': 'staff'
 }
 
-def is_balanced(s):
-    count = 0
-    for char in s:
-        if char == '(': count += 1
-        elif char == ')': count -= 1
-        if count < 0: return False
-    return count == 0
-
 def clean_qual(qual, table, upgrade_to_exists=True):
-    if not qual or qual == 'null': return None
-    
-    cleaned = re.sub(r" AND \(category = \( SELECT upper\(tenants\.tier\).*?\)\)", "", qual)
-    cleaned = re.sub(r" AND \(plan = \( SELECT upper\(tenants\.plan\).*?\)\)", "", cleaned)
-    
+    expr = parse_policy_expr(qual)
+    if expr is None: return None
+
+    cleaned = strip_plan_checks(expr)
+
     if upgrade_to_exists:
-        cleaned = cleaned.replace(
-            "(tenant_id = ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE (user_tenant_mapping.user_id = auth.uid())))",
-            f"EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id)"
-        )
-        cleaned = cleaned.replace(
-            "(tenant_id IN ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE (user_tenant_mapping.user_id = auth.uid())))",
-            f"EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id)"
-        )
-        cleaned = cleaned.replace(
-            "(EXISTS ( SELECT 1 FROM user_tenant_mapping WHERE ((user_tenant_mapping.user_id = auth.uid()) AND (user_tenant_mapping.role = 'super_admin'::text))))",
-            "EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.role = 'super_admin')"
-        )
-        
-        if "super_admin" in cleaned:
-             return f"EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id) OR EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.role = 'super_admin')"
-             
-    while cleaned.startswith('(') and cleaned.endswith(')'):
-        inner = cleaned[1:-1]
-        if is_balanced(inner): cleaned = inner
-        else: break
-            
+        cleaned = upgrade_membership_checks(cleaned, table)
+
+        if mentions_literal(cleaned, 'super_admin'):
+            return tenant_or_super_admin(table)
+
+    cleaned = unwrap(cleaned)
+
     # CRITICAL: Clean up dangerous Phase 3B inline bypasses for all tables
-    if "anon" in cleaned or "service_role" in cleaned or "tenant_id IS NOT NULL" in cleaned:
-        return f"EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id) OR EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.role = 'super_admin')"
+    if auth_role_checks(cleaned) & {'anon', 'service_role'} or has_tenant_null_test(cleaned, negated=True):
+        return tenant_or_super_admin(table)
 
     return cleaned
 
 def inject_member_access(qual, table, feature):
-    if not qual: return None
-        
-    qual = qual.strip()
-    while qual.startswith('(') and qual.endswith(')'):
-        inner = qual[1:-1]
-        if is_balanced(inner): qual = inner
-        else: break
-            
-    wrapped_original = f"({qual})"
-    appendage = f"public.has_member_feature_access({table}.tenant_id, auth.uid(), '{feature}')"
-    return f"({wrapped_original} AND {appendage})"
+    if qual is None: return None
+    return and_member_access(qual, table, feature)
+
+def initplan_rewrite(expr):
+    """Per-row function calls replaced by forms Postgres evaluates once per statement"""
+    if expr is None: return None
+    return initplan_auth_calls(cache_member_access(expr))
 
 
 def generate_policy_sql(table, policy, roles, operation, qual, with_check):
@@ -94,23 +77,92 @@ def generate_policy_sql(table, policy, roles, operation, qual, with_check):
     sql = f'DROP POLICY IF EXISTS "{policy}" ON public.{table};\n'
     sql += f'CREATE POLICY "{policy}" ON public.{table}\n'
     sql += f'  FOR {operation} TO {roles_sql}\n'
-    if qual: sql += f'  USING ({qual})'
+    if qual: sql += f'  USING ({to_sql(qual)})'
     if with_check:
         if qual: sql += '\n'
-        sql += f'  WITH CHECK ({with_check})'
+        sql += f'  WITH CHECK ({to_sql(with_check)})'
     sql += ';\n'
     return sql
 
+def rollback_sql(table, policies):
+    """Phase 4 definitions of the target policies of one table"""
+    sql = ''
+    for p in policies:
+        old_qual = parse_policy_expr(p.qual)
+        old_check = parse_policy_expr(p.with_check)
+        sql += generate_policy_sql(table, p.name, p.roles_text, p.operation, old_qual, old_check)
+    return sql
+
+def migration_sql(table, policies, feature, initplan=False):
+    """Phase 5B definitions of the target policies of one table"""
+    sql = ''
+    for p in policies:
+        policy = p.name
+
+        # Apply migration cleanup across all tables
+        new_qual = clean_qual(p.qual, table)
+        new_qual = inject_member_access(new_qual, table, feature)
+
+        new_check = clean_qual(p.with_check, table)
+        new_check = inject_member_access(new_check, table, feature)
+
+        if initplan:
+            new_qual = initplan_rewrite(new_qual)
+            new_check = initplan_rewrite(new_check)
+
+        sql += generate_policy_sql(table, policy, p.roles_text, p.operation, new_qual, new_check)
+
+        try:
+            for expr in (new_qual, new_check):
+                if expr is not None: parse(to_sql(expr))
+        except PolicyExprError as e:
+            print(f"ERROR: Invalid expression generated for {table} {policy}: {e}")
+    return sql
+
+# Set-returning counterpart of has_member_feature_access() for the --initplan
+# policies: one call per statement instead of one per row
+MEMBER_FEATURE_TENANTS_SQL = """
+CREATE OR REPLACE FUNCTION public.member_feature_tenants(p_feature_key TEXT)
+RETURNS SETOF UUID
+LANGUAGE sql
+SECURITY DEFINER
+STABLE
+SET search_path = public
+AS $$
+    SELECT utm.tenant_id
+    FROM public.user_tenant_mapping utm
+    WHERE utm.user_id = auth.uid()
+      AND public.has_member_feature_access(utm.tenant_id, utm.user_id, p_feature_key);
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.member_feature_tenants(TEXT) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.member_feature_tenants(TEXT) TO authenticated, service_role;
+
+"""
+
 def main():
+    parser = argparse.ArgumentParser(description='Generate the Phase 5B RBAC migration and rollback')
+    parser.add_argument('--initplan', action='store_true',
+                        help='Write phase5b_rbac_*_initplan.sql with auth.uid() and the member feature check '
+                             'evaluated once per statement instead of once per row')
+    args = parser.parse_args()
+    suffix = '_initplan' if args.initplan else ''
+
     target_policies = ["Tenant Isolation Insert", "Tenant Isolation Update", 
                        "Users can insert election results for their tenant", 
                        "Users can update election results for their tenant"]
     
-    mig_sql = "-- Phase 5B RBAC Migration\n-- Generated from Phase 4 baseline\nBEGIN;\n\n"
-    roll_sql = "-- Phase 5B RBAC Rollback\n-- Restores Phase 4 baseline\nBEGIN;\n\n"
-    
+    code_version = source_fingerprint(__file__, policy_expr.__file__)
+    note = "-- InitPlan-cached policies (generate_phase5b.py --initplan)\n" if args.initplan else ""
+    migration = IncrementalMigration(f'migrations/phase5b_rbac_migration{suffix}.sql', code_version,
+                                     header=f"-- Phase 5B RBAC Migration\n-- Generated from Phase 4 baseline\n{note}BEGIN;\n\n",
+                                     footer="COMMIT;\n")
+    rollback = IncrementalMigration(f'migrations/phase5b_rbac_rollback{suffix}.sql', code_version,
+                                    header="-- Phase 5B RBAC Rollback\n-- Restores Phase 4 baseline\nBEGIN;\n\n",
+                                    footer="COMMIT;\n")
+
     # 1. Functions
-    mig_sql += """
+    mig_sql = """
 CREATE OR REPLACE FUNCTION public.has_member_feature_access(
     p_tenant_id UUID,
     p_user_id UUID,
@@ -222,7 +274,7 @@ CREATE TRIGGER trg_prevent_staff_permission_escalation
 
 """
 
-    roll_sql += """
+    roll_sql = """
 DROP TRIGGER IF EXISTS trg_prevent_staff_permission_escalation ON public.staff;
 DROP TRIGGER IF EXISTS trg_validate_staff_permissions ON public.staff;
 DROP FUNCTION IF EXISTS public.prevent_staff_permission_escalation();
@@ -230,6 +282,9 @@ DROP FUNCTION IF EXISTS public.validate_staff_permissions_entitlement();
 DROP FUNCTION IF EXISTS public.has_member_feature_access(UUID, UUID, TEXT);
 
 """
+    if args.initplan:
+        mig_sql += MEMBER_FEATURE_TENANTS_SQL
+        roll_sql = "\nDROP FUNCTION IF EXISTS public.member_feature_tenants(TEXT);\n" + roll_sql
     
     mig_sql += """
 -- Drop insecure legacy duplicate staff policies intentionally
@@ -288,53 +343,31 @@ DROP POLICY IF EXISTS "Allow public insert works" ON public.works;
     
     mig_sql += "\n"
 
+    migration.fragment('(prelude)', mig_sql, lambda: mig_sql)
+    rollback.fragment('(prelude)', roll_sql, lambda: roll_sql)
+
     mig_stats = {'SELECT': 0, 'INSERT': 0, 'UPDATE': 0, 'DELETE': 0}
 
-    with open('migrations/live_policies.csv', 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            table = row['tablename']
-            policy = row['policyname']
-            
-            if table in tables and policy in target_policies:
-                feature = tables[table]
-                roles = row['roles']
-                operation = row['operation']
-                
-                old_qual_raw = row['condition']
-                old_check_raw = row['check_condition']
-                
-                old_qual = old_qual_raw if old_qual_raw != 'null' else None
-                old_check = old_check_raw if old_check_raw != 'null' else None
-                
-                roll_sql += generate_policy_sql(table, policy, roles, operation, old_qual, old_check)
-                
-                # Apply migration cleanup across all tables
-                new_qual = clean_qual(old_qual_raw, table)
-                new_qual = inject_member_access(new_qual, table, feature)
-                
-                new_check = clean_qual(old_check_raw, table)
-                new_check = inject_member_access(new_check, table, feature)
-                
-                sql_block = generate_policy_sql(table, policy, roles, operation, new_qual, new_check)
-                mig_sql += sql_block
-                
-                if not is_balanced(sql_block):
-                    print(f"ERROR: Unbalanced parens generated for {table} {policy}!")
-                
-                mig_stats[operation] += 1
-
-    mig_sql += "COMMIT;\n"
-    roll_sql += "COMMIT;\n"
-
-    with open('migrations/phase5b_rbac_migration.sql', 'w') as f:
-        f.write(mig_sql)
-        
-    with open('migrations/phase5b_rbac_rollback.sql', 'w') as f:
-        f.write(roll_sql)
-        
-    print(f"Generated migrations/phase5b_rbac_migration.sql")
-    print(f"Generated migrations/phase5b_rbac_rollback.sql")
+    # Target policies grouped by table, in CSV order
+    table_policies = {}
+    for p in load_live().select(tables=tables, names=target_policies):
+        table_policies.setdefault(p.table, []).append(p)
+
+    for table, policies in table_policies.items():
+        feature = tables[table]
+        inputs = {'feature': feature, 'policies': [astuple(p) for p in policies]}
+        migration.fragment(table, inputs, lambda: migration_sql(table, policies, feature, args.initplan))
+        rollback.fragment(table, inputs, lambda: rollback_sql(table, policies))
+        for p in policies:
+            mig_stats[p.operation] += 1
+
+    changed = migration.write()
+    rollback.write()
+
+    print(f"Generated {migration.output_path}")
+    print(f"Generated {rollback.output_path}")
+    print(f"Generated {migration.delta_path()} ({', '.join(changed) or 'nothing changed'})")
+    print(f"Rendered {len(migration.rendered)} of {len(migration.fragments)} fragments ({len(migration.fragments) - len(migration.rendered)} cached)")
     print(f"Stats: {mig_stats}")
 
 if __name__ == '__main__':
@@ -1,5 +1,9 @@
 import csv
-import re
+
+from policy_expr import (
+    auth_role_checks, has_tenant_null_test, member_feature_access, parse, parse_policy_expr,
+    strip_plan_checks, to_sql, upgrade_membership_checks,
+)
 
 tables = {
   'ai_history': 'ai_content',
@@ -33,36 +37,32 @@ tables = {
 }
 
 def clean_qual(qual, table, upgrade_to_exists=True):
-    if not qual or qual == 'null':
+    expr = parse_policy_expr(qual)
+    if expr is None:
         return None
-    cleaned = re.sub(r" AND \(category = \( SELECT upper\(tenants\.tier\).*?\)\)", "", qual)
-    cleaned = re.sub(r" AND \(plan = \( SELECT upper\(tenants\.plan\).*?\)\)", "", cleaned)
+    cleaned = strip_plan_checks(expr)
     if upgrade_to_exists:
-        cleaned = cleaned.replace(
-            "(tenant_id = ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE (user_tenant_mapping.user_id = auth.uid())))",
-            f"(EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id))"
-        )
-        cleaned = cleaned.replace(
-            "(tenant_id IN ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE (user_tenant_mapping.user_id = auth.uid())))",
-            f"(EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id))"
-        )
-    return cleaned
+        cleaned = upgrade_membership_checks(cleaned, table, parenthesize=True, super_admin=False)
+    return to_sql(cleaned)
 
 def inject_member_access(qual, table, feature):
     if not qual:
         return None
+    expr = parse(qual)
     bypasses = []
-    if "auth.role() = 'anon'" in qual:
+    roles = auth_role_checks(expr)
+    if 'anon' in roles:
         bypasses.append("auth.role() = 'anon'::text")
-    if "auth.role() = 'service_role'" in qual:
+    if 'service_role' in roles:
         bypasses.append("auth.role() = 'service_role'::text")
-    if "tenant_id IS NULL" in qual:
+    if has_tenant_null_test(expr):
         bypasses.append(f"{table}.tenant_id IS NULL")
+    member_access = to_sql(member_feature_access(table, feature))
     if bypasses:
         bypass_str = " OR ".join(bypasses)
-        appendage = f"({bypass_str} OR public.has_member_feature_access({table}.tenant_id, auth.uid(), '{feature}'))"
+        appendage = f"({bypass_str} OR {member_access})"
     else:
-        appendage = f"public.has_member_feature_access({table}.tenant_id, auth.uid(), '{feature}')"
+        appendage = member_access
     return f"({qual}) AND {appendage}"
 
 def main():
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Content-addressed SQL fragments for the policy migration generators.
+
+A generated migration is a header, one fragment per table (its DROP /
+CREATE POLICY statements) and a footer. Each fragment is keyed by the
+SHA-256 of everything it is generated from: the table's input policies,
+its feature mapping and the generator code. A rerun renders (and
+validates) only the fragments whose inputs changed and takes the rest
+from .policy_cache/fragments/.
+
+Next to the full migration a delta is written, containing only the
+fragments that changed since the previous run of the same generator
+(recorded in .policy_cache/manifests/). Tweaking one table's policies
+therefore yields a one-table migration:
+
+    migrations/phase5b_rbac_migration.sql        every table, as before
+    migrations/phase5b_rbac_migration_delta.sql  only the tables that changed
+
+    migration = IncrementalMigration('migrations/phase5b_rbac_migration.sql',
+                                     code_version=source_fingerprint(__file__),
+                                     header=..., footer='COMMIT;\\n')
+    for table, rows in rows_by_table.items():
+        migration.fragment(table, rows, lambda: render(table, rows))
+    migration.write()
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from policy_catalog import DEFAULT_CACHE_DIR
+
+FRAGMENT_DIR = os.path.join(DEFAULT_CACHE_DIR, 'fragments')
+MANIFEST_DIR = os.path.join(DEFAULT_CACHE_DIR, 'manifests')
+
+
+def source_fingerprint(*paths):
+    """SHA-256 over the given source files; part of every fragment key"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text, newline=None):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8', newline=newline) as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class FragmentCache:
+    """SQL fragments stored by the hash of their inputs, one file each"""
+
+    def __init__(self, cache_dir=FRAGMENT_DIR):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(*inputs):
+        raw = json.dumps(inputs, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.sql')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8', newline='') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key, text):
+        _write_atomic(self._path(key), text, newline='')
+
+
+class IncrementalMigration:
+    """
+    One generated migration file assembled from cached per-table fragments,
+    plus a delta of the fragments that changed since the previous run.
+    """
+
+    def __init__(self, output_path, code_version, header='', footer='',
+                 cache=None, manifest_dir=MANIFEST_DIR):
+        self.output_path = output_path
+        self.code_version = code_version
+        self.header = header
+        self.footer = footer
+        self.cache = cache if cache is not None else FragmentCache()
+        self.manifest_dir = manifest_dir
+        self.fragments = []
+        # Fragments rendered in this run (cache misses)
+        self.rendered = []
+
+    def fragment(self, name, inputs, render):
+        """
+        Fragment of this migration for name (usually a table), generated
+        from inputs (any JSON-serialisable value). render() is only called
+        when no fragment for these inputs is cached.
+        """
+        key = self.cache.key(self.code_version, os.path.basename(self.output_path), name, inputs)
+        text = self.cache.get(key)
+        if text is None:
+            text = render()
+            self.cache.put(key, text)
+            self.rendered.append(name)
+        self.fragments.append((name, key, text))
+        return text
+
+    def text(self):
+        return self.header + ''.join(text for _, _, text in self.fragments) + self.footer
+
+    def _manifest_path(self):
+        name = hashlib.sha256(os.path.abspath(self.output_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.manifest_dir, f'{name}.json')
+
+    def previous_keys(self):
+        """{fragment name: key} of the previous run, or None on the first run"""
+        try:
+            with open(self._manifest_path(), encoding='utf-8') as f:
+                return json.load(f)['fragments']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def delta_path(self):
+        stem, ext = os.path.splitext(self.output_path)
+        return f'{stem}_delta{ext}'
+
+    def delta_text(self, previous):
+        """Header, the changed fragments and footer; everything is new on a first run"""
+        changed = [(name, text) for name, key, text in self.fragments
+                   if previous is None or previous.get(name) != key]
+        current = {name for name, _, _ in self.fragments}
+        removed = [name for name in (previous or {}) if name not in current]
+
+        lines = [f"-- Delta of {os.path.basename(self.output_path)}: "
+                 f"{', '.join(name for name, _ in changed) or 'nothing changed'}\n"]
+        for name in removed:
+            lines.append(f"-- {name} is no longer generated; its policies are left as they are\n")
+        return ''.join(lines) + self.header + ''.join(text for _, text in changed) + self.footer, changed
+
+    def write(self):
+        """Write the full migration, its delta and the manifest; returns the changed fragment names"""
+        previous = self.previous_keys()
+        delta, changed = self.delta_text(previous)
+        _write_atomic(self.output_path, self.text())
+        _write_atomic(self.delta_path(), delta)
+        manifest = {
+            'output': os.path.abspath(self.output_path),
+            'fragments': {name: key for name, key, _ in self.fragments},
+        }
+        _write_atomic(self._manifest_path(), json.dumps(manifest, indent=2, ensure_ascii=False))
+        return [name for name, _ in changed]
@@ -1,7 +1,9 @@
-import csv
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    policies = list(reader)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
 
 tables = [
     'ai_history', 'complaints', 'election_results', 'event_rsvps', 'events',
@@ -13,14 +15,12 @@ tables = [
 ]
 
 count = 0
-for r in policies:
-    if r['tablename'] in tables and r['operation'] in ('INSERT', 'UPDATE'):
-        pn = r['policyname']
-        is_ok = pn in ('Tenant Isolation Insert', 'Tenant Isolation Update', 
-                       'Users can insert election results for their tenant', 
+for p in load_live().select(tables=tables, operations=('INSERT', 'UPDATE')):
+    is_ok = p.name in ('Tenant Isolation Insert', 'Tenant Isolation Update',
+                       'Users can insert election results for their tenant',
                        'Users can update election results for their tenant',
                        'Enable insert for public', 'Enable insert for authenticated users')
-        if not is_ok:
-            count += 1
-            print(f"{r['tablename']} | {pn}")
+    if not is_ok:
+        count += 1
+        print(f"{p.table} | {p.name}")
 print('Total:', count)
@@ -1,6 +1,10 @@
-import csv
+import os
+import sys
 
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    for row in csv.DictReader(f):
-        if 'anon' in row['roles'] or 'public' in row['policyname'].lower():
-            print(row['tablename'] + ' | ' + row['policyname'] + ' | ' + row['roles'] + ' | ' + row['operation'])
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
+
+for p in load_live():
+    if 'anon' in p.roles or 'public' in p.name.lower():
+        print(p.table + ' | ' + p.name + ' | ' + p.roles_text + ' | ' + p.operation)
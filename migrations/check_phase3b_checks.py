@@ -1,5 +1,10 @@
-import csv
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    for row in csv.DictReader(f):
-        if row['tablename'] in ['events', 'survey_responses'] and 'public' in row['policyname'].lower() and 'insert' in row['policyname'].lower():
-            print(row['tablename'] + ' | ' + row['policyname'] + ' | check: ' + row['check_condition'])
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
+
+for p in load_live().select(tables=['events', 'survey_responses']):
+    if 'public' in p.name.lower() and 'insert' in p.name.lower():
+        print(p.table + ' | ' + p.name + ' | check: ' + p.check_condition)
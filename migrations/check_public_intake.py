@@ -1,8 +1,10 @@
-import csv
+import os
+import sys
 
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    for row in csv.DictReader(f):
-        t = row['tablename']
-        if t in ['complaints', 'voter_applications', 'surveys', 'survey_responses', 'events', 'event_rsvps']:
-            if 'anon' in row['roles'] or 'public' in row['policyname'].lower() or 'anon' in row['condition'] or 'anon' in row['check_condition']:
-                print(t + ' | ' + row['policyname'] + ' | ' + row['roles'] + ' | qual: ' + row['condition'] + ' | check: ' + row['check_condition'])
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
+
+for p in load_live().select(tables=['complaints', 'voter_applications', 'surveys', 'survey_responses', 'events', 'event_rsvps']):
+    if 'anon' in p.roles or 'public' in p.name.lower() or 'anon' in p.condition or 'anon' in p.check_condition:
+        print(p.table + ' | ' + p.name + ' | ' + p.roles_text + ' | qual: ' + p.condition + ' | check: ' + p.check_condition)
@@ -1,12 +1,16 @@
-import csv
 import json
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    for row in csv.DictReader(f):
-        if row['tablename'] == 'staff':
-            print(json.dumps({
-                'name': row['policyname'],
-                'cmd': row['operation'],
-                'roles': row['roles'],
-                'qual': row['condition'],
-                'check': row['check_condition']
-            }, indent=2))
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
+
+for p in load_live().table('staff'):
+    print(json.dumps({
+        'name': p.name,
+        'cmd': p.operation,
+        'roles': p.roles_text,
+        'qual': p.condition,
+        'check': p.check_condition
+    }, indent=2))
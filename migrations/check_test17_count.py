@@ -1,7 +1,12 @@
-import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
+
 count = 0
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    for row in csv.DictReader(f):
-        if 'public' in row['policyname'] and ('anon' in row['roles'] or 'public' in row['roles']):
-            count += 1
+for p in load_live():
+    if 'public' in p.name and ('anon' in p.roles or 'public' in p.roles):
+        count += 1
 print("Count is:", count)
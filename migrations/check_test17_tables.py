@@ -1,5 +1,9 @@
-import csv
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    for row in csv.DictReader(f):
-        if row['tablename'] in ['events', 'survey_responses']:
-            print(row['tablename'] + ' | ' + row['policyname'] + ' | ' + row['roles'])
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
+
+for p in load_live().select(tables=['events', 'survey_responses']):
+    print(p.table + ' | ' + p.name + ' | ' + p.roles_text)
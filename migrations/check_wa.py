@@ -1,5 +1,9 @@
-import csv
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    for row in csv.DictReader(f):
-        if row['tablename'] == 'whatsapp_sessions':
-            print(row['policyname'] + ' - ' + row['operation'] + ' - ' + row['roles'])
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
+
+for p in load_live().table('whatsapp_sessions'):
+    print(p.name + ' - ' + p.operation + ' - ' + p.roles_text)
@@ -1,41 +1,65 @@
-import csv
 import json
+import os
+import sys
+from dataclasses import astuple
 
-with open('live_policies.csv', 'r') as f:
-    reader = csv.DictReader(f)
-    policies = list(reader)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-tables = set(p['tablename'] for p in policies)
+from migration_fragments import IncrementalMigration, source_fingerprint
+from policy_catalog import load_live
+
+catalog = load_live()
+
+tables = set(catalog.tables)
 
 admin_tables = ['admin_billing', 'admin_support_tickets', 'admin_updates']
 mixed_tables = ['scheme_applications', 'survey_responses', 'event_rsvps', 'sadasya', 'voter_applications', 'letter_requests', 'work_tracker_history', 'complaints']
 global_ignore = ['whatsapp_sessions', 'user_tenant_mapping', 'conference_rooms', 'tenants']
 
-core_tables = [t for t in tables if t not in admin_tables and t not in mixed_tables and t not in global_ignore]
+core_tables = [t for t in sorted(tables) if t not in admin_tables and t not in mixed_tables and t not in global_ignore]
+
+# Policies grouped by table, in CSV order
+table_policies = {t: catalog.table(t) for t in catalog.tables}
+
+code_version = source_fingerprint(__file__)
+
+def rollback_sql(t_pols):
+    sql = ''
+    for p in t_pols:
+        if p.name == 'null': continue
+        cmd = p.operation
+        roles = ', '.join(p.roles)
+        sql += f'DROP POLICY IF EXISTS "{p.name}" ON public."{p.table}";\n'
+        cond = f'USING {p.qual}' if p.qual else ''
+        check = f'WITH CHECK {p.with_check}' if p.with_check else ''
+        sql += f'CREATE POLICY "{p.name}" ON public."{p.table}" FOR {cmd} TO {roles} {cond} {check};\n\n'
+    return sql
+
+def core_sql(t, t_pols):
+    sql = f'-- Table: {t}\nALTER TABLE public."{t}" ENABLE ROW LEVEL SECURITY;\n'
+    for p in t_pols:
+        sql += f'DROP POLICY IF EXISTS "{p.name}" ON public."{t}";\n'
+
+    sql += f'CREATE POLICY "Tenant Select {t}" ON public."{t}" FOR SELECT TO authenticated USING (tenant_id IN (SELECT public.get_authorized_tenants()));\n'
+    sql += f'CREATE POLICY "Tenant Insert {t}" ON public."{t}" FOR INSERT TO authenticated WITH CHECK (tenant_id IN (SELECT public.get_authorized_tenants()));\n'
+    sql += f'CREATE POLICY "Tenant Update {t}" ON public."{t}" FOR UPDATE TO authenticated USING (tenant_id IN (SELECT public.get_authorized_tenants())) WITH CHECK (tenant_id IN (SELECT public.get_authorized_tenants()));\n'
+    sql += f'CREATE POLICY "Tenant Delete {t}" ON public."{t}" FOR DELETE TO authenticated USING (tenant_id IN (SELECT public.get_authorized_tenants()));\n\n'
+    return sql
 
 # Generate Rollback
-with open('phase2_rollback.sql', 'w') as f:
-    f.write('-- WARNING:\n-- This rollback restores the previous insecure security state.\n-- Use only if necessary to recover application functionality.\n\n')
-    for p in policies:
-        if p['policyname'] == 'null': continue
-        cmd = p['operation']
-        roles = ', '.join(p['roles'].strip('{}').split(','))
-        f.write(f'DROP POLICY IF EXISTS "{p["policyname"]}" ON public."{p["tablename"]}";\n')
-        cond = f'USING {p["condition"]}' if p['condition'] and p['condition'] != 'null' else ''
-        check = f'WITH CHECK {p["check_condition"]}' if p['check_condition'] and p['check_condition'] != 'null' else ''
-        f.write(f'CREATE POLICY "{p["policyname"]}" ON public."{p["tablename"]}" FOR {cmd} TO {roles} {cond} {check};\n\n')
+rollback = IncrementalMigration('phase2_rollback.sql', code_version,
+                                header='-- WARNING:\n-- This rollback restores the previous insecure security state.\n-- Use only if necessary to recover application functionality.\n\n')
+for t, t_pols in table_policies.items():
+    rollback.fragment(t, [astuple(p) for p in t_pols], lambda: rollback_sql(t_pols))
+rollback.write()
 
 # Generate 004 Core RLS
-with open('phase2_004_core_rls_v3.sql', 'w') as f:
-    f.write('-- Phase 2 - 004 - Core RLS V3\n-- Replaces insecure JWT and subquery explosion policies with strict get_authorized_tenants() check.\n\n')
-    for t in core_tables:
-        t_pols = [p for p in policies if p['tablename'] == t and p['policyname'] != 'null']
-        f.write(f'-- Table: {t}\nALTER TABLE public."{t}" ENABLE ROW LEVEL SECURITY;\n')
-        for p in t_pols:
-            f.write(f'DROP POLICY IF EXISTS "{p["policyname"]}" ON public."{t}";\n')
-        
-        f.write(f'CREATE POLICY "Tenant Select {t}" ON public."{t}" FOR SELECT TO authenticated USING (tenant_id IN (SELECT public.get_authorized_tenants()));\n')
-        f.write(f'CREATE POLICY "Tenant Insert {t}" ON public."{t}" FOR INSERT TO authenticated WITH CHECK (tenant_id IN (SELECT public.get_authorized_tenants()));\n')
-        f.write(f'CREATE POLICY "Tenant Update {t}" ON public."{t}" FOR UPDATE TO authenticated USING (tenant_id IN (SELECT public.get_authorized_tenants())) WITH CHECK (tenant_id IN (SELECT public.get_authorized_tenants()));\n')
-        f.write(f'CREATE POLICY "Tenant Delete {t}" ON public."{t}" FOR DELETE TO authenticated USING (tenant_id IN (SELECT public.get_authorized_tenants()));\n\n')
-
+core = IncrementalMigration('phase2_004_core_rls_v3.sql', code_version,
+                            header='-- Phase 2 - 004 - Core RLS V3\n-- Replaces insecure JWT and subquery explosion policies with strict get_authorized_tenants() check.\n\n')
+for t in core_tables:
+    t_pols = [p for p in table_policies[t] if p.name != 'null']
+    # Only the names of the existing policies end up in the SQL
+    core.fragment(t, [p.name for p in t_pols], lambda: core_sql(t, t_pols))
+changed = core.write()
+print(f"Generated phase2_004_core_rls_v3.sql ({len(core.rendered)} of {len(core.fragments)} tables rendered), "
+      f"delta: {', '.join(changed) or 'nothing changed'}")
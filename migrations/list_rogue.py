@@ -1,5 +1,10 @@
-import csv
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_catalog import load_live
 
 with open('migrations/phase5b_rbac_migration.sql', 'r') as f:
     sql = f.read()
@@ -17,22 +22,18 @@ tables = [
 ]
 
 rogue = []
-with open('migrations/live_policies.csv', 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        t = row['tablename']
-        pn = row['policyname']
-        cmd = row['operation']
-        if t in tables and cmd in ('INSERT', 'UPDATE'):
-            is_excluded = (
-                pn in ('Tenant Isolation Insert', 'Tenant Isolation Update',
-                       'Users can insert election results for their tenant',
-                       'Users can update election results for their tenant')
-                or (t == 'survey_responses' and pn in ('Enable insert for authenticated users', 'Enable insert for public'))
-            )
-            if not is_excluded:
-                if (t, pn) not in dropped_set:
-                    rogue.append((t, pn, cmd, row['roles'], row['condition'] or '', row['check_condition'] or ''))
+for p in load_live().select(tables=tables, operations=('INSERT', 'UPDATE')):
+    t = p.table
+    pn = p.name
+    is_excluded = (
+        pn in ('Tenant Isolation Insert', 'Tenant Isolation Update',
+               'Users can insert election results for their tenant',
+               'Users can update election results for their tenant')
+        or (t == 'survey_responses' and pn in ('Enable insert for authenticated users', 'Enable insert for public'))
+    )
+    if not is_excluded:
+        if (t, pn) not in dropped_set:
+            rogue.append((t, pn, p.operation, p.roles_text, p.condition, p.check_condition))
 
 print(f'Found {len(rogue)} rogue policies:')
 for r in rogue:
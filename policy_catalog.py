@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+In-memory catalog of RLS policies, loaded once and indexed.
+
+The audit, check and simulate scripts all read the same export of
+pg_policies (migrations/live_policies.csv, or the older
+phase4_baseline_dump.json) and filter it row by row. This module parses an
+export once into Policy records and indexes them by table, operation, role
+and policy name, so a script asks for what it needs:
+
+    from policy_catalog import load_live
+
+    catalog = load_live()
+    for policy in catalog.select(tables=TARGET_TABLES, operations=('INSERT', 'UPDATE')):
+        ...
+    catalog.get('staff', 'Tenant Isolation Insert')
+
+A generated migration (migrations/phase5b_rbac_migration.sql, ...) loads
+the same way with load_migration(): its catalog holds the policies the
+script leaves behind after its CREATE / DROP POLICY statements.
+
+Parsed catalogs are pickled to .policy_cache/ next to this file, keyed by
+the SHA-256 of the export, and reused until the export changes. Within a
+process each export is only loaded once.
+
+Policy fields follow pg_policies: qual and with_check are None where the
+export says "null", roles is a tuple of role names. condition,
+check_condition and roles_text give the text exactly as exported.
+
+Usage:
+    python policy_catalog.py
+    python policy_catalog.py --table staff --operation INSERT
+    python policy_catalog.py --baseline --role anon
+    python policy_catalog.py --migration migrations/phase5b_rbac_migration.sql
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import pickle
+import re
+import tempfile
+from dataclasses import dataclass
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LIVE_POLICIES_CSV = os.path.join(ROOT_DIR, 'migrations', 'live_policies.csv')
+BASELINE_DUMP_JSON = os.path.join(ROOT_DIR, 'phase4_baseline_dump.json')
+
+DEFAULT_CACHE_DIR = os.path.join(ROOT_DIR, '.policy_cache')
+
+# Bump when Policy or PolicyCatalog change shape, so old snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+NULL = 'null'
+
+
+def _nullable(text):
+    return None if text in (None, '', NULL) else text
+
+
+def parse_roles(text):
+    """'{public,anon}' -> ('public', 'anon')"""
+    text = _nullable(text)
+    if text is None:
+        return ()
+    return tuple(role.strip() for role in text.strip('{}').split(',') if role.strip())
+
+
+@dataclass(frozen=True, slots=True)
+class Policy:
+    """One row of pg_policies"""
+
+    table: str
+    name: str
+    operation: str
+    roles: tuple
+    qual: str | None
+    with_check: str | None
+    rls_enabled: bool = True
+
+    @property
+    def condition(self):
+        """USING expression as exported ('null' when absent)"""
+        return NULL if self.qual is None else self.qual
+
+    @property
+    def check_condition(self):
+        """WITH CHECK expression as exported ('null' when absent)"""
+        return NULL if self.with_check is None else self.with_check
+
+    @property
+    def roles_text(self):
+        return '{' + ','.join(self.roles) + '}' if self.roles else NULL
+
+    def applies_to(self, operation):
+        """True if the policy covers operation (ALL covers every operation)"""
+        return self.operation in (operation, 'ALL')
+
+
+class PolicyCatalog:
+    """Policies in export order plus lookup indexes"""
+
+    def __init__(self, policies, tables=None, source=None):
+        self.policies = tuple(policies)
+        self.source = source
+        self.by_table = {}
+        self.by_operation = {}
+        self.by_role = {}
+        self.by_name = {}
+        self.by_key = {}
+        for i, policy in enumerate(self.policies):
+            self.by_table.setdefault(policy.table, []).append(i)
+            self.by_operation.setdefault(policy.operation, []).append(i)
+            for role in policy.roles:
+                self.by_role.setdefault(role, []).append(i)
+            self.by_name.setdefault(policy.name, []).append(i)
+            self.by_key[(policy.table, policy.name)] = policy
+        # Tables without any policy (possible in the baseline dump) are kept too
+        self.tables = list(dict.fromkeys(list(tables or ()) + list(self.by_table)))
+
+    def __len__(self):
+        return len(self.policies)
+
+    def __iter__(self):
+        return iter(self.policies)
+
+    def _pick(self, positions):
+        return [self.policies[i] for i in positions]
+
+    def table(self, table):
+        return self._pick(self.by_table.get(table, ()))
+
+    def operation(self, operation):
+        return self._pick(self.by_operation.get(operation, ()))
+
+    def role(self, role):
+        """Policies granted to role by name (a {public} policy is not listed under anon)"""
+        return self._pick(self.by_role.get(role, ()))
+
+    def named(self, name):
+        """Policies called name, on any table"""
+        return self._pick(self.by_name.get(name, ()))
+
+    def get(self, table, name):
+        """The policy called name on table, or None"""
+        return self.by_key.get((table, name))
+
+    def select(self, tables=None, operations=None, roles=None, names=None):
+        """
+        Policies matching every given filter (each an iterable of accepted
+        values), in export order. Only the indexes are consulted.
+        """
+        positions = None
+        for index, wanted in ((self.by_table, tables), (self.by_operation, operations),
+                              (self.by_role, roles), (self.by_name, names)):
+            if wanted is None:
+                continue
+            hits = set()
+            for value in wanted:
+                hits.update(index.get(value, ()))
+            positions = hits if positions is None else positions & hits
+            if not positions:
+                return []
+        if positions is None:
+            return list(self.policies)
+        return self._pick(sorted(positions))
+
+
+def parse_live_csv(data):
+    """Policies from a live_policies.csv export (bytes)"""
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8-sig')))
+    return [
+        Policy(
+            table=row['tablename'],
+            name=row['policyname'],
+            operation=row['operation'],
+            roles=parse_roles(row['roles']),
+            qual=_nullable(row['condition']),
+            with_check=_nullable(row['check_condition']),
+            rls_enabled=row.get('rls_enabled', 'true') == 'true',
+        )
+        for row in reader
+    ], ()
+
+
+def parse_baseline_json(data):
+    """Policies from a {table: [{policy, cmd, roles, qual, with_check}]} dump (bytes)"""
+    # The phase 4 dump was saved by PowerShell as UTF-16
+    if data[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        text = data.decode('utf-16')
+    else:
+        text = data.decode('utf-8-sig')
+    policies = []
+    tables = []
+    for table, entries in json.loads(text).items():
+        tables.append(table)
+        for entry in entries:
+            # A table without policies is dumped as one all-null entry
+            if _nullable(entry['policy']) is None:
+                continue
+            policies.append(Policy(
+                table=table,
+                name=entry['policy'],
+                operation=entry['cmd'],
+                roles=parse_roles(entry['roles']),
+                qual=_nullable(entry['qual']),
+                with_check=_nullable(entry['with_check']),
+            ))
+    return policies, tables
+
+
+_DOLLAR_QUOTE_RE = re.compile(r'\$[A-Za-z_0-9]*\$')
+
+_IDENT = r'(?:"(?:[^"]|"")*"|[A-Za-z_][A-Za-z_0-9$]*)'
+
+_CREATE_POLICY_RE = re.compile(rf"""
+    CREATE\s+POLICY\s+(?P<name>{_IDENT})\s+
+    ON\s+(?P<table>(?:{_IDENT}\.)?{_IDENT})
+    (?:\s+AS\s+(?:PERMISSIVE|RESTRICTIVE))?
+    (?:\s+FOR\s+(?P<operation>ALL|SELECT|INSERT|UPDATE|DELETE))?
+    (?:\s+TO\s+(?P<roles>.+?))?
+    \s*(?=\bUSING\b|\bWITH\s+CHECK\b|$)
+""", re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+_DROP_POLICY_RE = re.compile(rf"DROP\s+POLICY\s+(?:IF\s+EXISTS\s+)?(?P<name>{_IDENT})\s+ON\s+(?P<table>(?:{_IDENT}\.)?{_IDENT})",
+                             re.IGNORECASE)
+
+_ROW_SECURITY_RE = re.compile(rf"ALTER\s+TABLE\s+(?:ONLY\s+)?(?:IF\s+EXISTS\s+)?(?P<table>(?:{_IDENT}\.)?{_IDENT})\s+"
+                              r"(?P<action>ENABLE|DISABLE)\s+ROW\s+LEVEL\s+SECURITY", re.IGNORECASE)
+
+
+def _quoted_end(text, start):
+    """End of the quoted string or identifier opening at start ('' / "" escapes included)"""
+    quote = text[start]
+    pos = start + 1
+    while True:
+        pos = text.find(quote, pos)
+        if pos < 0:
+            return len(text)
+        if text.startswith(quote * 2, pos):
+            pos += 2
+            continue
+        return pos + 1
+
+
+def split_sql(text):
+    """Statements of a SQL script without comments; quotes and dollar quotes are respected"""
+    statements = []
+    current = []
+    pos = 0
+    chunk_start = 0
+    while pos < len(text):
+        char = text[pos]
+        if char in '-/' and text.startswith(('--', '/*'), pos):
+            current.append(text[chunk_start:pos])
+            end = text.find('\n' if char == '-' else '*/', pos + 2)
+            pos = len(text) if end < 0 else end + (0 if char == '-' else 2)
+            current.append(' ')
+            chunk_start = pos
+        elif char in '\'"':
+            pos = _quoted_end(text, pos)
+        elif char == '$' and _DOLLAR_QUOTE_RE.match(text, pos):
+            tag = _DOLLAR_QUOTE_RE.match(text, pos).group()
+            end = text.find(tag, pos + len(tag))
+            pos = len(text) if end < 0 else end + len(tag)
+        elif char == ';':
+            current.append(text[chunk_start:pos])
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            pos += 1
+            chunk_start = pos
+        else:
+            pos += 1
+    current.append(text[chunk_start:])
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _unquote(name):
+    """'public."voters"' -> 'voters'"""
+    name = name.split('.')[-1] if not name.endswith('"') else re.split(r'\.(?=")', name)[-1]
+    if name.startswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name
+
+
+def _parenthesised(text, start):
+    """Text inside the parentheses opening at start (quotes respected), and the end position"""
+    depth = 0
+    pos = start
+    while pos < len(text):
+        char = text[pos]
+        if char in '\'"':
+            pos = _quoted_end(text, pos)
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:pos].strip(), pos + 1
+        pos += 1
+    raise ValueError(f"Unbalanced parentheses in {text[start:start + 80]!r}")
+
+
+def _policy_clauses(text):
+    """(USING expression, WITH CHECK expression) of the rest of a CREATE POLICY statement"""
+    qual = with_check = None
+    pos = 0
+    while pos < len(text):
+        match = re.compile(r'\s*(USING|WITH\s+CHECK)\s*(?=\()', re.IGNORECASE).match(text, pos)
+        if not match:
+            break
+        expression, pos = _parenthesised(text, match.end())
+        if match.group(1).upper() == 'USING':
+            qual = expression
+        else:
+            with_check = expression
+    return qual, with_check
+
+
+def parse_migration_sql(data):
+    """Policies a migration script creates (and does not drop again), from its bytes"""
+    policies = {}
+    tables = {}
+    for statement in split_sql(data.decode('utf-8-sig')):
+        match = _CREATE_POLICY_RE.match(statement)
+        if match:
+            table = _unquote(match['table'])
+            qual, with_check = _policy_clauses(statement[match.end():])
+            roles = tuple(_unquote(role.strip()) for role in (match['roles'] or 'public').split(','))
+            policies[(table, _unquote(match['name']))] = Policy(
+                table=table,
+                name=_unquote(match['name']),
+                operation=(match['operation'] or 'ALL').upper(),
+                roles=roles,
+                qual=qual,
+                with_check=with_check,
+            )
+            tables.setdefault(table, True)
+            continue
+        match = _DROP_POLICY_RE.match(statement)
+        if match:
+            policies.pop((_unquote(match['table']), _unquote(match['name'])), None)
+            continue
+        match = _ROW_SECURITY_RE.match(statement)
+        if match:
+            tables[_unquote(match['table'])] = match['action'].upper() == 'ENABLE'
+    return [
+        Policy(p.table, p.name, p.operation, p.roles, p.qual, p.with_check, rls_enabled=tables[p.table])
+        for p in policies.values()
+    ], list(tables)
+
+
+_loaded = {}
+
+
+def load_catalog(path, parse, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Catalog of the export at path, parsed with parse(bytes) -> (policies, tables).
+    Reuses this process's copy, then the pickled snapshot, and only parses
+    the export when it changed.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    key = (SNAPSHOT_VERSION, os.path.abspath(path), digest)
+
+    catalog = _loaded.get(key)
+    if catalog is not None:
+        return catalog
+
+    snapshot = None
+    if cache_dir:
+        name = os.path.splitext(os.path.basename(path))[0]
+        snapshot = os.path.join(cache_dir, f'{name}-{SNAPSHOT_VERSION}-{digest[:16]}.pickle')
+        try:
+            with open(snapshot, 'rb') as f:
+                catalog = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            catalog = None
+
+    if catalog is None:
+        policies, tables = parse(data)
+        catalog = PolicyCatalog(policies, tables, source=path)
+        if snapshot:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, snapshot)
+
+    _loaded[key] = catalog
+    return catalog
+
+
+def load_live(path=LIVE_POLICIES_CSV, cache_dir=DEFAULT_CACHE_DIR):
+    """Catalog of migrations/live_policies.csv"""
+    return load_catalog(path, parse_live_csv, cache_dir)
+
+
+def load_baseline(path=BASELINE_DUMP_JSON, cache_dir=DEFAULT_CACHE_DIR):
+    """Catalog of phase4_baseline_dump.json"""
+    return load_catalog(path, parse_baseline_json, cache_dir)
+
+
+def load_migration(path, cache_dir=DEFAULT_CACHE_DIR):
+    """Catalog of the policies a migration script creates"""
+    return load_catalog(path, parse_migration_sql, cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List RLS policies from the live or baseline export')
+    parser.add_argument('--baseline', action='store_true', help='Read phase4_baseline_dump.json instead of live_policies.csv')
+    parser.add_argument('--migration', help='Read the policies this migration script creates instead')
+    parser.add_argument('--path', help='Export to read (defaults to the live or baseline export)')
+    parser.add_argument('--table', action='append', help='Only this table (repeatable)')
+    parser.add_argument('--operation', action='append', help='Only this operation, e.g. INSERT (repeatable)')
+    parser.add_argument('--role', action='append', help='Only policies granted to this role (repeatable)')
+    parser.add_argument('--name', action='append', help='Only policies with this name (repeatable)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the pickled snapshot')
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_cache else DEFAULT_CACHE_DIR
+    if args.migration:
+        catalog = load_migration(args.migration, cache_dir)
+    elif args.baseline:
+        catalog = load_baseline(args.path or BASELINE_DUMP_JSON, cache_dir)
+    else:
+        catalog = load_live(args.path or LIVE_POLICIES_CSV, cache_dir)
+
+    policies = catalog.select(tables=args.table, operations=args.operation,
+                              roles=args.role, names=args.name)
+    for policy in policies:
+        print(f"{policy.table} | {policy.name} | {policy.operation} | {policy.roles_text}")
+    print(f"{len(policies)} of {len(catalog)} policies on {len(catalog.tables)} tables")
+
+
+if __name__ == '__main__':
+    main()
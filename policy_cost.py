@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""
+Cost model and planner-risk analyzer for RLS policy expressions.
+
+phase9a_database_scalability_audit.md found that at 10,000 tenants the
+CPU goes into the RLS predicates themselves: tenant_id IN (SELECT
+get_authorized_tenants()) over a sequential scan, and plpgsql calls such
+as has_member_feature_access(...) made once per row. This script scores
+every policy of live_policies.csv and of the generated migrations
+(loaded with policy_catalog) by how much work Postgres does to evaluate
+it, and prints the hottest policies first.
+
+A query is assumed to rely on RLS alone (SELECT * FROM voters), as the
+app does. Each USING / WITH CHECK expression is parsed with policy_expr
+and costed in abstract units (1 = filtering one row) as
+
+    once + rows * (1 + per_row)
+
+    rows     rows the expression is evaluated on: tenants x rows per
+             tenant for a sequential scan, one tenant's rows when an
+             index drives the scan, --write-rows for a WITH CHECK
+    per_row  function calls and subplans run for every row
+    once     InitPlans and hashed SubPlans, run once per statement
+
+The planner rules are the ones Postgres 16 follows for RLS quals
+(verified with EXPLAIN):
+
+- col = <constant, stable call or uncorrelated scalar subquery> and
+  col = ANY (ARRAY(SELECT ...)) become index conditions, evaluated once;
+  an OR is indexable only if every branch is
+- col IN (SELECT ...) is a hashed SubPlan: the subquery runs once, but
+  the table is read sequentially
+- a correlated EXISTS whose only correlation is inner.col = outer.col is
+  turned into a hashed SubPlan as well; any other correlated subquery
+  runs once per row
+- a stable function outside an index condition (auth.uid() = user_id) is
+  called once per row; plpgsql and SECURITY DEFINER functions are never
+  inlined
+
+Findings per expression:
+
+    PER_ROW_FUNCTION     plpgsql / querying function called with row values
+    VOLATILE_FUNCTION    function without a cost model (treated as VOLATILE)
+    INITPLAN_CANDIDATE   auth.uid() & co. evaluated per row; (SELECT auth.uid())
+                         would run once
+    CORRELATED_SUBQUERY  subquery re-run for every row
+    HASHED_SUBPLAN       IN (SELECT ...) forces a sequential scan;
+                         = ANY (ARRAY(SELECT ...)) can use an index
+    MISSING_INDEX        no btree index leading with a column the policy
+                         looks up, per scratch/all_indexes.json
+
+Usage:
+    python policy_cost.py
+    python policy_cost.py --top 40 --details 10
+    python policy_cost.py --with-indexes phase9a_production_migration.sql
+    python policy_cost.py --source migrations/phase5b_rbac_migration.sql --json policy_cost.json
+"""
+
+import argparse
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+from policy_catalog import LIVE_POLICIES_CSV, ROOT_DIR, load_live, load_migration, split_sql
+from policy_expr import (
+    ArraySubquery, BinOp, BoolOp, Cast, Exists, Func, In, Literal, Name, Paren, PolicyExprError, Quantified, Select, Tuple,
+    parse_policy_expr, unwrap, walk,
+)
+
+INDEXES_JSON = os.path.join(ROOT_DIR, 'scratch', 'all_indexes.json')
+GENERATED_MIGRATIONS = (
+    os.path.join(ROOT_DIR, 'migrations', 'phase2_004_core_rls_v3.sql'),
+    os.path.join(ROOT_DIR, 'migrations', 'phase5b_rbac_migration.sql'),
+)
+
+# Indexes outside the public schema, which all_indexes.json does not cover
+BUILTIN_INDEXES = (
+    'CREATE UNIQUE INDEX users_pkey ON auth.users USING btree (id)',
+)
+
+# Cost of one index lookup (descent plus heap fetch), in rows
+INDEX_PROBE = 4
+# Fixed overhead of calling a function that is not inlined
+CALL_OVERHEAD = 10
+USERS_PER_TENANT = 5
+# Rows per tenant where a table is known to be larger than --rows
+ROWS_PER_TENANT = {
+    'voters': 50_000,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionCost:
+    language: str
+    volatility: str
+    # Cost of one call, in rows
+    cost: float
+    # Depends on the request only (JWT, settings); (SELECT f()) turns it into an InitPlan
+    request_only: bool = False
+    # Number of queries the body runs
+    queries: int = 0
+
+
+# After get_authorized_tenants.txt, has_feature_access_full.txt and
+# has_member_feature_access.txt; the auth.* functions are Supabase's SQL
+# wrappers around current_setting('request.jwt.claim...')
+FUNCTION_COSTS = {
+    'auth.uid': FunctionCost('sql', 'STABLE', 2, request_only=True),
+    'auth.role': FunctionCost('sql', 'STABLE', 2, request_only=True),
+    'auth.jwt': FunctionCost('sql', 'STABLE', 2, request_only=True),
+    'current_setting': FunctionCost('internal', 'STABLE', 1, request_only=True),
+    'upper': FunctionCost('internal', 'IMMUTABLE', 1),
+    'lower': FunctionCost('internal', 'IMMUTABLE', 1),
+    'public.get_authorized_tenants': FunctionCost(
+        'sql', 'STABLE', CALL_OVERHEAD + INDEX_PROBE, request_only=True, queries=1),
+    'public.has_feature_access': FunctionCost('plpgsql', 'STABLE', CALL_OVERHEAD + 6 * INDEX_PROBE, queries=6),
+    # Two lookups of its own plus has_feature_access()
+    'public.has_member_feature_access': FunctionCost(
+        'plpgsql', 'STABLE', 2 * CALL_OVERHEAD + 8 * INDEX_PROBE, queries=8),
+    # has_member_feature_access() for each of the current user's tenants (generate_phase5b.py --initplan)
+    'public.member_feature_tenants': FunctionCost(
+        'sql', 'STABLE', 3 * CALL_OVERHEAD + 9 * INDEX_PROBE, request_only=True, queries=9),
+}
+UNKNOWN_FUNCTION = FunctionCost('unknown', 'VOLATILE', 100)
+
+
+def function_cost(name):
+    """Cost model of a function, by qualified name (public. may be left out)"""
+    return FUNCTION_COSTS.get(name) or FUNCTION_COSTS.get(f'public.{name}', UNKNOWN_FUNCTION)
+
+
+def table_key(name):
+    """'public."voters"' / 'public.voters' -> 'voters'; other schemas stay qualified"""
+    parts = [part.strip('"') for part in name.split('.')]
+    if len(parts) > 1 and parts[0] == 'public':
+        parts = parts[1:]
+    return '.'.join(parts)
+
+
+def estimated_rows(table, tenants, rows_per_tenant):
+    if table == 'tenants':
+        return tenants
+    if table in ('user_tenant_mapping', 'users', 'auth.users', 'staff'):
+        return tenants * USERS_PER_TENANT
+    return tenants * ROWS_PER_TENANT.get(table, rows_per_tenant)
+
+
+# ---------------------------------------------------------------------------
+# Indexes
+# ---------------------------------------------------------------------------
+
+_CREATE_INDEX_RE = re.compile(r"""
+    CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(?P<name>\S+)\s+
+    ON\s+(?:ONLY\s+)?(?P<table>\S+)\s*(?:USING\s+(?P<method>\w+)\s*)?\(
+""", re.IGNORECASE | re.VERBOSE)
+
+
+def _index_columns(text, start):
+    """Key columns of the column list starting after its '(' at start"""
+    columns = []
+    depth = 1
+    current = start
+    pos = start
+    while pos < len(text) and depth:
+        char = text[pos]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if depth == 0 or (char == ',' and depth == 1):
+            columns.append(text[current:pos].strip())
+            current = pos + 1
+        pos += 1
+    return columns
+
+
+class IndexCatalog:
+    """btree indexes by table, from CREATE INDEX statements"""
+
+    def __init__(self):
+        self.by_table = {}
+
+    def add(self, statement, source=None):
+        match = _CREATE_INDEX_RE.match(statement.strip())
+        if not match or (match['method'] or 'btree').lower() != 'btree':
+            return False
+        columns = _index_columns(statement.strip(), match.end())
+        # An expression index (lower(name)) cannot serve a plain column lookup
+        keys = tuple(c.split()[0].strip('"') if re.match(r'^"?\w+"?(\s|$)', c) else None for c in columns)
+        entries = self.by_table.setdefault(table_key(match['table']), [])
+        entries.append((match['name'].strip('"'), keys, source))
+        return True
+
+    def add_sql(self, text, source=None):
+        """Indexes created by a migration script; returns how many were added"""
+        return sum(self.add(statement, source) for statement in split_sql(text))
+
+    def leading(self, table, column):
+        """Name of an index whose first key column is column, else None"""
+        for name, keys, _ in self.by_table.get(table, ()):
+            if keys and keys[0] == column:
+                return name
+        return None
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.by_table.values())
+
+
+def load_indexes(path=INDEXES_JSON, extra_sql=()):
+    """Indexes of scratch/all_indexes.json (UTF-16) plus those created by the extra_sql scripts"""
+    catalog = IndexCatalog()
+    for statement in BUILTIN_INDEXES:
+        catalog.add(statement, 'builtin')
+    with open(path, 'rb') as f:
+        data = f.read()
+    text = data.decode('utf-16') if data[:2] in (b'\xff\xfe', b'\xfe\xff') else data.decode('utf-8-sig')
+    for statements in json.loads(text).values():
+        for statement in statements:
+            catalog.add(statement, os.path.basename(path))
+    for script in extra_sql:
+        with open(script, 'rb') as f:
+            catalog.add_sql(f.read().decode('utf-8-sig'), os.path.basename(script))
+    return catalog
+
+
+# ---------------------------------------------------------------------------
+# Expression analysis
+# ---------------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Finding:
+    kind: str
+    detail: str
+
+
+@dataclass(slots=True)
+class ExpressionCost:
+    """Cost of one USING or WITH CHECK expression of a policy"""
+
+    source: str
+    table: str
+    policy: str
+    operation: str
+    clause: str
+    expression: str
+    rows: int = 0
+    # Index driving the scan, or None for a sequential scan / a write check
+    index: str | None = None
+    once: float = 0
+    per_row: float = 0
+    findings: list = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def total(self):
+        return self.once + self.rows * (1 + self.per_row)
+
+    @property
+    def scan(self):
+        if self.clause == 'WITH CHECK':
+            return 'write'
+        return f'index {self.index}' if self.index else 'seq'
+
+    def flags(self):
+        return sorted({f.kind for f in self.findings})
+
+
+class _Scope:
+    """A FROM level: the policy's table (outermost) or a subquery"""
+
+    def __init__(self, tables, names):
+        self.tables = tables
+        self.names = names
+
+    @classmethod
+    def of_select(cls, select):
+        tables = [table_key('.'.join(item.name)) for item in select.from_items]
+        names = set()
+        for item in select.from_items:
+            names.add(item.name[-1].strip('"'))
+            if item.alias:
+                names.add(item.alias.strip('"'))
+        return cls(tables, names)
+
+
+def _conjuncts(node):
+    node = unwrap(node)
+    if isinstance(node, BoolOp) and node.op == 'AND':
+        return [c for operand in node.operands for c in _conjuncts(operand)]
+    return [node]
+
+
+def _strip_casts(node):
+    node = unwrap(node)
+    while isinstance(node, Cast):
+        node = unwrap(node.operand)
+    return node
+
+
+def _outer_nodes(node):
+    """Nodes of node without descending into subqueries"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        if not isinstance(current, Select):
+            stack.extend(current.parts())
+
+
+def _subquery(node):
+    """The Select of a ( SELECT ... ) or ARRAY( SELECT ... ) node, else None"""
+    node = unwrap(node) if isinstance(node, Paren) else node
+    if isinstance(node, ArraySubquery):
+        node = unwrap(node.subquery)
+    return node if isinstance(node, Select) else None
+
+
+class _Analysis:
+    """Walks one expression, accumulating once-per-statement cost and findings"""
+
+    def __init__(self, table, indexes, tenants, rows_per_tenant, scans=True):
+        self.table = table
+        # False for a WITH CHECK, which tests the written rows without reading the table
+        self.scans = scans
+        self.indexes = indexes
+        self.tenants = tenants
+        self.rows_per_tenant = rows_per_tenant
+        self.once = 0.0
+        self.findings = []
+        self._seen = set()
+
+    def flag(self, kind, detail):
+        if (kind, detail) not in self._seen:
+            self._seen.add((kind, detail))
+            self.findings.append(Finding(kind, detail))
+
+    # -- name resolution -------------------------------------------------
+
+    def depth_of(self, name, scopes):
+        """Index in scopes of the FROM level a column reference belongs to"""
+        if len(name.path) == 1:
+            return len(scopes) - 1
+        qualifier = name.path[-2].strip('"')
+        for depth in range(len(scopes) - 1, -1, -1):
+            if qualifier in scopes[depth].names:
+                return depth
+        return len(scopes) - 1
+
+    def depths(self, node, scopes):
+        """FROM levels (indexes into scopes) that node references, subqueries included"""
+        found = set()
+        stack = [(node, scopes)]
+        while stack:
+            current, current_scopes = stack.pop()
+            if isinstance(current, Name):
+                found.add(self.depth_of(current, current_scopes))
+            elif isinstance(current, Select):
+                inner = current_scopes + [_Scope.of_select(current)]
+                for part in current.parts():
+                    stack.append((part, inner))
+                continue
+            for part in current.parts():
+                stack.append((part, current_scopes))
+        return {d for d in found if d < len(scopes)}
+
+    def row_dependent(self, node, scopes):
+        """True if node's value changes with the row of the innermost FROM level"""
+        return len(scopes) - 1 in self.depths(node, scopes)
+
+    def column_of(self, node, scopes):
+        """Column name if node is a (possibly cast-free) column of the innermost FROM level"""
+        node = unwrap(node)
+        if isinstance(node, Name) and self.depth_of(node, scopes) == len(scopes) - 1:
+            return node.name.strip('"')
+        return None
+
+    # -- costs -----------------------------------------------------------
+
+    def cost(self, node, scopes):
+        """Cost of evaluating node once, for one row of the innermost FROM level"""
+        node = unwrap(node)
+        if isinstance(node, (Literal, Name)):
+            return 0.0
+        if isinstance(node, Func):
+            return self.call(node, scopes)
+        if isinstance(node, Exists):
+            return self.subplan(_subquery(node.subquery), scopes, 'EXISTS')
+        if isinstance(node, In) and _subquery(node.target) is not None:
+            return self.cost(node.operand, scopes) + self.subplan(_subquery(node.target), scopes, 'IN')
+        if isinstance(node, Quantified) and _subquery(node.inner) is not None:
+            return self.subplan(_subquery(node.inner), scopes, 'ANY')
+        if isinstance(node, Select):
+            return self.subplan(node, scopes, 'scalar')
+        return sum(self.cost(part, scopes) for part in node.parts())
+
+    def call(self, node, scopes):
+        model = function_cost(node.qualified_name)
+        total = sum(self.cost(arg, scopes) for arg in node.args) + model.cost
+        name = f'{node.qualified_name}()'
+        if model is UNKNOWN_FUNCTION:
+            self.flag('VOLATILE_FUNCTION', f'{name} has no cost model; assumed VOLATILE, called for every row')
+        elif model.volatility == 'IMMUTABLE' and not self.row_dependent(node, scopes):
+            return 0.0  # folded at plan time
+        if len(scopes) == 1:
+            if any(self.row_dependent(arg, scopes) for arg in node.args):
+                if model.queries or model.language in ('plpgsql', 'unknown'):
+                    self.flag('PER_ROW_FUNCTION', f'{name} ({model.language}, {model.queries} queries) '
+                                                  f'is called with the values of every row')
+            elif model.request_only:
+                self.flag('INITPLAN_CANDIDATE', f'{name} runs for every row; (SELECT {name}) runs once')
+        return total
+
+    def access(self, select, scopes, skip=()):
+        """Cost of one execution of a subquery's scan, given the outer rows"""
+        inner = scopes + [_Scope.of_select(select)]
+        if len(select.from_items) != 1:
+            # No FROM (SELECT f()) or a join: cost the expressions only
+            return sum(self.cost(t, inner) for t in select.targets) + (
+                self.cost(select.where, inner) if select.where is not None else 0.0)
+        table = inner[-1].tables[0]
+        conjuncts = [c for c in (_conjuncts(select.where) if select.where is not None else []) if c not in skip]
+        index_condition = lookup_column = None
+        for conjunct in conjuncts:
+            if not (isinstance(conjunct, BinOp) and conjunct.op == '='):
+                continue
+            for column_side, value_side in ((conjunct.left, conjunct.right), (conjunct.right, conjunct.left)):
+                column = self.column_of(column_side, inner)
+                if column and not self.row_dependent(value_side, inner):
+                    lookup_column = lookup_column or column
+                    if index_condition is None and self.indexes.leading(table, column):
+                        index_condition = conjunct
+        if index_condition is None:
+            rows = estimated_rows(table, self.tenants, self.rows_per_tenant)
+            if lookup_column:
+                self.flag('MISSING_INDEX', f'{table}({lookup_column}): subquery scans all of {table}')
+            setup = 0.0
+        else:
+            rows = INDEX_PROBE
+            # The index condition's value is computed once per execution
+            setup = self.cost(index_condition, inner)
+        filters = sum(self.cost(c, inner) for c in conjuncts if c is not index_condition)
+        return setup + rows * (1 + filters) + sum(self.cost(t.expr, inner) for t in select.targets)
+
+    def correlation(self, select, scopes):
+        """
+        (correlated, conjuncts) of a subquery: whether it references an outer
+        row, and its WHERE conjuncts of the form inner.col = outer.col if
+        those are the only references (else None)
+        """
+        inner = scopes + [_Scope.of_select(select)]
+        own = len(scopes)
+        # depths() drops the subquery's own level, so anything left is an outer reference
+        if not self.depths(select, scopes):
+            return False, []
+        equalities = []
+        for conjunct in _conjuncts(select.where) if select.where is not None else []:
+            if isinstance(conjunct, BinOp) and conjunct.op == '=':
+                left, right = _strip_casts(conjunct.left), _strip_casts(conjunct.right)
+                if isinstance(left, Name) and isinstance(right, Name):
+                    sides = {self.depth_of(left, inner), self.depth_of(right, inner)}
+                    if own in sides and len(sides) == 2:
+                        equalities.append(conjunct)
+                        continue
+            if any(d < own for d in self.depths(conjunct, inner)):
+                return True, None
+        if any(any(d < own for d in self.depths(t, inner)) for t in select.targets):
+            return True, None
+        return True, equalities
+
+    def subplan(self, select, scopes, kind):
+        correlated, equalities = self.correlation(select, scopes)
+        if not correlated:
+            cost = self.access(select, scopes)
+            if len(scopes) == 1:
+                self.once += cost
+                # IN / EXISTS probe a hash of the result; a scalar becomes an InitPlan parameter
+                return 1.0 if kind in ('IN', 'ANY') else 0.0
+            return cost
+        if kind == 'EXISTS' and equalities:
+            # Turned into outer.col = ANY (hashed SubPlan) over the uncorrelated rest
+            cost = self.access(select, scopes, skip=equalities)
+            if len(scopes) == 1:
+                self.once += cost
+                for conjunct in equalities:
+                    for side in (conjunct.left, conjunct.right):
+                        column = self.column_of(side, scopes)
+                        if column:
+                            self.check_index(column, 'hashed EXISTS')
+                return 1.0
+            return cost
+        if len(scopes) == 1:
+            text = select.sql()
+            self.flag('CORRELATED_SUBQUERY', f'({text[:70]}{"..." if len(text) > 70 else ""}) '
+                                             f'runs for every row')
+        return self.access(select, scopes)
+
+    # -- outer scan ------------------------------------------------------
+
+    def check_index(self, column, why):
+        index = self.indexes.leading(self.table, column)
+        if index is None and self.scans:
+            self.flag('MISSING_INDEX', f'{self.table}({column}): no index for the {why} on {column}')
+        return index
+
+    def index_columns(self, node, scopes):
+        """Columns whose indexes could drive a scan for node (all of them needed), or None"""
+        node = unwrap(node)
+        if isinstance(node, BoolOp) and node.op == 'OR':
+            columns = []
+            for operand in node.operands:
+                branch = self.index_columns(operand, scopes)
+                if branch is None:
+                    return None
+                columns.extend(branch)
+            return columns
+        if isinstance(node, BoolOp) and node.op == 'AND':
+            for conjunct in node.operands:
+                columns = self.index_columns(conjunct, scopes)
+                if columns is not None:
+                    return columns
+            return None
+        if isinstance(node, In) and not node.negated and isinstance(unwrap(node.target), Tuple):
+            column = self.column_of(node.operand, scopes)
+            return [column] if column and not self.row_dependent(node.target, scopes) else None
+        if isinstance(node, BinOp) and node.op == '=':
+            for column_side, value_side in ((node.left, node.right), (node.right, node.left)):
+                column = self.column_of(column_side, scopes)
+                if column and not self.row_dependent(value_side, scopes) and self.indexable_value(value_side):
+                    return [column]
+        return None
+
+    def indexable_value(self, node):
+        """Value side of an index condition: constant, stable call, InitPlan or ANY (array)"""
+        node = _strip_casts(node)
+        if isinstance(node, Quantified):
+            return node.quantifier == 'ANY'
+        if isinstance(node, Select):
+            return True
+        return not any(isinstance(n, Func) and function_cost(n.qualified_name) is UNKNOWN_FUNCTION
+                       for n in walk(node))
+
+    def key_columns(self, node, scopes):
+        """Columns node filters on by equality or IN (SELECT ...), for the index check"""
+        columns = []
+        for current in _outer_nodes(node):
+            if isinstance(current, BinOp) and current.op == '=':
+                for column_side, value_side in ((current.left, current.right), (current.right, current.left)):
+                    column = self.column_of(column_side, scopes)
+                    if column and not self.row_dependent(value_side, scopes):
+                        columns.append((column, 'equality condition'))
+            elif isinstance(current, In) and _subquery(current.target) is not None:
+                column = self.column_of(current.operand, scopes)
+                if column:
+                    columns.append((column, 'IN (SELECT ...)'))
+                    text = current.sql()
+                    self.flag('HASHED_SUBPLAN', f'{text[:60]}{"..." if len(text) > 60 else ""} reads '
+                                                f'{self.table} sequentially; {column} = ANY (ARRAY(SELECT ...)) '
+                                                f'can use an index')
+        return columns
+
+
+def analyze_expression(expression, table, clause, indexes, tenants, rows_per_tenant, write_rows):
+    """(rows, index, once, per_row, findings) of one policy expression"""
+    node = parse_policy_expr(expression)
+    if node is None:
+        return 0, None, 0.0, 0.0, []
+    analysis = _Analysis(table, indexes, tenants, rows_per_tenant, scans=clause != 'WITH CHECK')
+    scopes = [_Scope([table], {table})]
+    per_row = analysis.cost(node, scopes)
+
+    index = None
+    if clause == 'WITH CHECK':
+        rows = write_rows
+    else:
+        rows = estimated_rows(table, tenants, rows_per_tenant)
+        columns = analysis.index_columns(node, scopes)
+        if columns:
+            names = [analysis.check_index(column, 'equality condition') for column in columns]
+            if all(names):
+                index = '+'.join(dict.fromkeys(names))
+                # One tenant's (or user's) rows
+                rows = max(1, rows // tenants) * len(names)
+        for column, why in analysis.key_columns(node, scopes):
+            analysis.check_index(column, why)
+    return rows, index, analysis.once, per_row, analysis.findings
+
+
+def analyze_catalog(catalog, source, indexes, tenants=10_000, rows_per_tenant=1000, write_rows=1000, tables=None):
+    """ExpressionCost of every USING and WITH CHECK expression in catalog"""
+    results = []
+    for policy in catalog:
+        if tables and policy.table not in tables:
+            continue
+        for clause, expression in (('USING', policy.qual), ('WITH CHECK', policy.with_check)):
+            if expression is None:
+                continue
+            item = ExpressionCost(source, policy.table, policy.name, policy.operation, clause, expression)
+            try:
+                item.rows, item.index, item.once, item.per_row, item.findings = analyze_expression(
+                    expression, policy.table, clause, indexes, tenants, rows_per_tenant, write_rows)
+            except PolicyExprError as e:
+                item.error = str(e)
+            results.append(item)
+    return results
+
+
+def _number(value):
+    for unit, size in (('G', 1e9), ('M', 1e6), ('k', 1e3)):
+        if value >= size:
+            return f'{value / size:.1f}{unit}'
+    return f'{value:.0f}'
+
+
+def print_report(results, top, details):
+    ranked = sorted((r for r in results if r.error is None), key=lambda r: -r.total)
+    print(f"{'rank':>4}  {'cost':>8}  {'rows':>7}  {'scan':<28} {'source':<26} {'table':<24} "
+          f"{'op':<6} {'clause':<10} policy / flags")
+    for rank, item in enumerate(ranked[:top], 1):
+        print(f"{rank:>4}  {_number(item.total):>8}  {_number(item.rows):>7}  {item.scan[:28]:<28} "
+              f"{item.source[:26]:<26} {item.table[:24]:<24} {item.operation:<6} {item.clause:<10} "
+              f"{item.policy}  [{', '.join(item.flags())}]")
+
+    for rank, item in enumerate(ranked[:details], 1):
+        print(f"\n#{rank} {item.table} | {item.policy} | {item.operation} {item.clause} ({item.source})")
+        print(f"  {item.expression[:300]}{'...' if len(item.expression) > 300 else ''}")
+        print(f"  {_number(item.rows)} rows x (1 + {item.per_row:.0f} per row) + {_number(item.once)} once"
+              f" = {_number(item.total)}")
+        for finding in item.findings:
+            print(f"  {finding.kind}: {finding.detail}")
+
+    errors = [r for r in results if r.error is not None]
+    counts = {}
+    for item in results:
+        for kind in item.flags():
+            counts[kind] = counts.get(kind, 0) + 1
+    print(f"\nExpressions: {len(results)} ({len(errors)} not parsed)")
+    for kind in sorted(counts):
+        print(f"  {kind}: {counts[kind]}")
+    for item in errors:
+        print(f"  unparsed: {item.source} | {item.table} | {item.policy} | {item.error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank RLS policies by estimated evaluation cost')
+    parser.add_argument('--source', action='append',
+                        help='live_policies.csv export or migration script (repeatable; defaults to the live '
+                             'export plus the generated migrations)')
+    parser.add_argument('--indexes', default=INDEXES_JSON, help='Index dump (default scratch/all_indexes.json)')
+    parser.add_argument('--with-indexes', action='append', default=[],
+                        help='Also count the indexes this migration creates (repeatable)')
+    parser.add_argument('--table', action='append', help='Only this table (repeatable)')
+    parser.add_argument('--tenants', type=int, default=10_000, help='Tenants (default 10000)')
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per tenant and table (default 1000)')
+    parser.add_argument('--write-rows', type=int, default=1000, help='Rows checked per write (default 1000)')
+    parser.add_argument('--top', type=int, default=25, help='Policies in the ranking (default 25)')
+    parser.add_argument('--details', type=int, default=5, help='Policies explained in detail (default 5)')
+    parser.add_argument('--json', help='Also write every expression cost to this JSON file')
+    args = parser.parse_args()
+
+    indexes = load_indexes(args.indexes, args.with_indexes)
+    sources = args.source or [LIVE_POLICIES_CSV, *GENERATED_MIGRATIONS]
+    results = []
+    for path in sources:
+        catalog = load_live(path) if path.endswith('.csv') else load_migration(path)
+        results.extend(analyze_catalog(catalog, os.path.basename(path), indexes, args.tenants, args.rows,
+                                       args.write_rows, args.table))
+
+    print(f"{len(indexes)} indexes, {args.tenants} tenants x {args.rows} rows per table "
+          f"(voters {ROWS_PER_TENANT['voters']}); {len(results)} expressions from {len(sources)} sources\n")
+    print_report(results, args.top, args.details)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([{
+                'source': r.source, 'table': r.table, 'policy': r.policy, 'operation': r.operation,
+                'clause': r.clause, 'cost': r.total, 'rows': r.rows, 'scan': r.scan, 'once': r.once,
+                'per_row': r.per_row, 'error': r.error,
+                'findings': [{'kind': f.kind, 'detail': f.detail} for f in r.findings],
+            } for r in sorted(results, key=lambda r: -r.total)], f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
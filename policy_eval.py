@@ -0,0 +1,900 @@
+#!/usr/bin/env python3
+"""
+Offline evaluator for RLS policies: which rows can each user actually
+SELECT, INSERT, UPDATE and DELETE?
+
+The simulate_test_* scripts only count policy names in the export. Here
+the USING / WITH CHECK expressions of a PolicyCatalog are parsed with
+policy_expr and evaluated in process against a synthetic Scenario:
+tenants with plans and features, users with a database role (anon,
+authenticated, service_role) and user_tenant_mapping rows, staff
+permissions, and a block of rows per tenant for every table.
+
+Evaluation is vectorised with numpy over all users x all rows at once.
+Every string (uuid, role, plan) is interned to an integer code, a column
+is an array of codes, and a predicate is an array of truth values in
+SQL's three-valued logic (FALSE < UNKNOWN < TRUE, so AND is a minimum
+and OR a maximum). A subquery adds an axis over the rows of its FROM
+table, which EXISTS / IN / a scalar comparison reduces away again. A
+table's policies are evaluated once, on the distinct combinations of the
+row columns they reference (tenant_id, category, ...), and the counts are
+weighted by how many rows share each combination; 200 users x 200,000
+rows per table take seconds.
+
+auth.uid(), auth.role(), auth.jwt(), current_setting(), upper(), lower()
+and public.get_authorized_tenants(), has_feature_access(),
+has_member_feature_access() and member_feature_tenants() are modelled
+after their definitions (get_authorized_tenants.txt,
+has_feature_access_full.txt, has_member_feature_access.txt,
+generate_phase5b.py).
+
+The result is an access matrix per table, operation and user, each cell
+split by row class:
+
+    own     rows of a tenant the user is mapped to
+    other   rows of any other tenant; a leak (!) unless the user is a
+            super_admin or service_role
+    null    rows whose tenant_id is NULL
+
+A scalar subquery returning more than one row (tenant_id = (SELECT
+tenant_id FROM user_tenant_mapping ...) for a user in two tenants) raises
+in Postgres and shows as ERR. A policy outside the supported expression
+subset (functions without a model, comparisons other than = and <>,
+joins) is skipped and its cells are marked ?.
+
+Usage:
+    python policy_eval.py
+    python policy_eval.py --table voters --table staff --operation SELECT
+    python policy_eval.py --tenants 20 --rows 5000 --leaks-only
+    python policy_eval.py --baseline --json policy_eval.json
+    python policy_eval.py --migration migrations/phase5b_rbac_migration_initplan.sql
+"""
+
+import argparse
+import json
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from functools import reduce
+
+import numpy as np
+
+from policy_catalog import load_baseline, load_live, load_migration
+from policy_expr import (
+    Array, ArraySubquery, BinOp, BoolOp, Cast, Exists, Func, In, Literal, Name, Not, NullTest, Paren,
+    PolicyExprError, Quantified, Select, Tuple, parse_policy_expr, string_value, to_sql, unwrap,
+)
+
+OPERATIONS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+# Truth values; AND is np.minimum and OR np.maximum over these
+FALSE, UNKNOWN, TRUE = 0, 1, 2
+
+# Code of SQL NULL. Lookup tables over codes have one extra slot at the
+# end, so indexing them with NULL_CODE picks that slot.
+NULL_CODE = -1
+
+# Upper bound on users x rows x subquery rows materialised at once
+CHUNK_CELLS = 1 << 22
+
+# Mapping roles that are meant to see every tenant's rows
+CROSS_TENANT_ROLES = ('super_admin',)
+
+# Database role that bypasses RLS in Supabase
+BYPASS_ROLE = 'service_role'
+
+
+class PolicyEvalError(ValueError):
+    """Expression outside what the evaluator models"""
+
+
+def _uuid(*parts):
+    """Stable uuid for a synthetic entity"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, 'policy-eval/' + '/'.join(map(str, parts))))
+
+
+# ---------------------------------------------------------------------------
+# Scenario
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class Tenant:
+    id: str
+    name: str
+    plan: str
+    tier: str
+    # Features has_feature_access() grants; None means every feature
+    features: frozenset | None = None
+
+
+@dataclass(slots=True)
+class User:
+    name: str
+    # Database role the request runs as: anon, authenticated or service_role
+    role: str
+    uid: str | None = None
+    # {tenant id: role}, the user's user_tenant_mapping rows in order
+    tenants: dict = field(default_factory=dict)
+    # {tenant id: staff permissions}; None means every feature
+    permissions: dict = field(default_factory=dict)
+    # Extra JWT claims, and settings visible to current_setting()
+    claims: dict = field(default_factory=dict)
+    settings: dict = field(default_factory=dict)
+
+    @property
+    def cross_tenant(self):
+        """True if the user may legitimately see other tenants' rows"""
+        return self.role == BYPASS_ROLE or any(r in CROSS_TENANT_ROLES for r in self.tenants.values())
+
+    @property
+    def jwt_claims(self):
+        claims = {'role': self.role}
+        if self.uid is not None:
+            claims['sub'] = self.uid
+        claims.update(self.claims)
+        return claims
+
+    def setting(self, name):
+        """current_setting(name) as PostgREST sets it for this request, or None"""
+        if name in self.settings:
+            return self.settings[name]
+        if name == 'request.jwt.claims':
+            return json.dumps(self.jwt_claims, sort_keys=True)
+        if name.startswith('request.jwt.claim.'):
+            value = self.jwt_claims.get(name.removeprefix('request.jwt.claim.'))
+            return None if value is None else str(value)
+        if name == 'role':
+            return self.role
+        return None
+
+
+@dataclass(slots=True)
+class Scenario:
+    tenants: list
+    users: list
+    rows_per_tenant: int = 1000
+    # Rows with tenant_id NULL, per table
+    null_rows: int = 100
+
+    @classmethod
+    def default(cls, num_tenants=3, rows_per_tenant=1000, null_rows=100):
+        """
+        An admin and a staff member per tenant, plus a super_admin, an admin
+        of the first two tenants, a signed-in user without tenant, anon and
+        service_role. Every third tenant has no features enabled and every
+        second tenant's staff has no permissions.
+        """
+        tenants = [
+            Tenant(id=_uuid('tenant', i), name=f't{i + 1}',
+                   plan=('pro', 'basic')[i % 2], tier=('gold', 'silver')[i % 2],
+                   features=None if i % 3 != 2 else frozenset())
+            for i in range(num_tenants)
+        ]
+        users = []
+        for i, tenant in enumerate(tenants):
+            users.append(User(f'{tenant.name}_admin', 'authenticated', _uuid('user', tenant.name, 'admin'),
+                              tenants={tenant.id: 'admin'}))
+            users.append(User(f'{tenant.name}_staff', 'authenticated', _uuid('user', tenant.name, 'staff'),
+                              tenants={tenant.id: 'staff'},
+                              permissions={tenant.id: None if i % 2 == 0 else frozenset()}))
+        users.append(User('super_admin', 'authenticated', _uuid('user', 'super_admin'),
+                          tenants={tenants[0].id: 'super_admin'} if tenants else {}))
+        if len(tenants) > 1:
+            users.append(User('multi_admin', 'authenticated', _uuid('user', 'multi_admin'),
+                              tenants={tenants[0].id: 'admin', tenants[1].id: 'admin'}))
+        users.append(User('outsider', 'authenticated', _uuid('user', 'outsider')))
+        users.append(User('anon', 'anon'))
+        users.append(User(BYPASS_ROLE, BYPASS_ROLE))
+        return cls(tenants, users, rows_per_tenant, null_rows)
+
+
+# ---------------------------------------------------------------------------
+# Interned values
+# ---------------------------------------------------------------------------
+
+class Symbols:
+    """Strings interned to dense integer codes; None is NULL_CODE"""
+
+    def __init__(self):
+        self.codes = {}
+        self.texts = []
+        self._tables = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def code(self, text):
+        if text is None:
+            return NULL_CODE
+        code = self.codes.get(text)
+        if code is None:
+            code = self.codes[text] = len(self.texts)
+            self.texts.append(text)
+        return code
+
+    def array(self, texts):
+        return np.array([self.code(t) for t in texts], dtype=np.int64)
+
+    def lookup(self, key, fn):
+        """
+        Array mapping every code to the code of fn(text) (NULL stays NULL),
+        for use as table[codes]. Rebuilt once new strings were interned.
+        """
+        entry = self._tables.setdefault(key, ([], None))
+        mapped, table = entry
+        if table is None or len(table) != len(self.texts) + 1:
+            # Only codes interned since the last call are mapped; fn's
+            # results are interned too, and mapped in turn
+            while len(mapped) < len(self.texts):
+                mapped.append(self.code(fn(self.texts[len(mapped)])))
+            table = np.array(mapped + [NULL_CODE], dtype=np.int64)
+            self._tables[key] = (mapped, table)
+        return table
+
+    def positions(self, key, texts):
+        """Array mapping the code of texts[i] to i and every other code (and NULL) to -1"""
+        table = self._tables.get(key)
+        if table is None or len(table) != len(self.texts) + 1:
+            table = np.full(len(self.texts) + 1, -1, dtype=np.int64)
+            for i, text in enumerate(texts):
+                if text in self.codes:
+                    table[self.codes[text]] = i
+            self._tables[key] = table
+        return table
+
+
+def _json_field(text, op, key):
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(value, dict):
+        return None
+    value = value.get(key)
+    if value is None:
+        return None
+    if op == '->>' and isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+# ---------------------------------------------------------------------------
+# Vectorised evaluation
+# ---------------------------------------------------------------------------
+
+def _lift(array, ndim):
+    """array with trailing axes of length 1 up to ndim"""
+    return array.reshape(array.shape + (1,) * (ndim - array.ndim))
+
+
+def _truth(condition):
+    return np.where(condition, TRUE, FALSE).astype(np.int8)
+
+
+def _equal(left, right):
+    unknown = (left == NULL_CODE) | (right == NULL_CODE)
+    return np.where(unknown, UNKNOWN, _truth(left == right)).astype(np.int8)
+
+
+def _member(operand, values, mask):
+    """operand IN (values where mask) with SQL NULL semantics; values has one more axis"""
+    operand = operand[..., None]
+    hit = (mask & (values != NULL_CODE) & (values == operand)).any(-1)
+    unknown = (mask & ((values == NULL_CODE) | (operand == NULL_CODE))).any(-1)
+    return np.where(hit, TRUE, np.where(unknown, UNKNOWN, FALSE)).astype(np.int8)
+
+
+class _Frame:
+    """Columns in scope at one nesting level: the policy's table or a subquery's FROM item"""
+
+    __slots__ = ('names', 'columns')
+
+    def __init__(self, names, columns):
+        self.names = names
+        self.columns = columns
+
+
+class _Evaluation:
+    """
+    One expression over a chunk of rows. Arrays have the axes (users, rows,
+    subquery rows...), one per open frame, with length 1 where a value does
+    not depend on that axis.
+    """
+
+    def __init__(self, evaluator, table, rows):
+        self.ev = evaluator
+        self.frames = [_Frame({table, f'public.{table}'},
+                              {column: codes[None, :] for column, codes in rows.items()})]
+        num_rows = len(next(iter(rows.values())))
+        self.errors = np.zeros((len(evaluator.users), num_rows), dtype=bool)
+
+    def fail(self, condition):
+        """Record the (user, row) cells where Postgres would raise"""
+        while condition.ndim > 2:
+            condition = condition.any(-1)
+        self.errors |= np.broadcast_to(condition, self.errors.shape)
+
+    def truth(self, node, frames):
+        ndim = len(frames) + 1
+        node = unwrap(node)
+        if isinstance(node, BoolOp):
+            combine = np.minimum if node.op == 'AND' else np.maximum
+            return reduce(combine, [self.truth(o, frames) for o in node.operands])
+        if isinstance(node, Not):
+            return TRUE - self.truth(node.operand, frames)
+        if isinstance(node, Literal) and node.value in ('TRUE', 'FALSE', 'NULL'):
+            value = {'TRUE': TRUE, 'FALSE': FALSE, 'NULL': UNKNOWN}[node.value]
+            return np.full((1,) * ndim, value, dtype=np.int8)
+        if isinstance(node, NullTest):
+            is_null = self.value(node.operand, frames) == NULL_CODE
+            return _truth(is_null != bool(node.negated))
+        if isinstance(node, BinOp) and node.op in ('=', '<>', '!='):
+            left = self.value(node.left, frames)
+            right = unwrap(node.right)
+            if isinstance(right, Quantified):
+                if right.quantifier != 'ANY' or node.op != '=':
+                    raise PolicyEvalError(f"Unsupported comparison: {to_sql(node)}")
+                return _member(left, *self.candidates(right.inner, frames))
+            result = _equal(left, self.value(node.right, frames))
+            return result if node.op == '=' else TRUE - result
+        if isinstance(node, In):
+            result = _member(self.value(node.operand, frames), *self.candidates(node.target, frames))
+            return TRUE - result if node.negated else result
+        if isinstance(node, Exists):
+            _, mask = self.subquery(unwrap(node.subquery), frames)
+            return _truth(mask.any(-1))
+        if isinstance(node, Func):
+            return self.predicate(node, frames)
+        raise PolicyEvalError(f"Unsupported predicate: {to_sql(node)}")
+
+    def value(self, node, frames):
+        ndim = len(frames) + 1
+        if isinstance(node, Paren):
+            inner = unwrap(node)
+            if isinstance(inner, Select):
+                return self.scalar(inner, frames)
+            return self.value(inner, frames)
+        if isinstance(node, Literal):
+            code = NULL_CODE if node.value == 'NULL' else self.ev.symbols.code(node.value)
+            return np.full((1,) * ndim, code, dtype=np.int64)
+        if isinstance(node, Name):
+            return self.column(node.path, frames)
+        if isinstance(node, Cast):
+            # text, uuid and json values are all kept as their text
+            return self.value(node.operand, frames)
+        if isinstance(node, Func):
+            return self.call(node, frames)
+        if isinstance(node, BinOp) and node.op in ('->>', '->'):
+            key = string_value(node.right)
+            if key is None:
+                raise PolicyEvalError(f"Unsupported JSON path: {to_sql(node)}")
+            table = self.ev.symbols.lookup((node.op, key), lambda text: _json_field(text, node.op, key))
+            return table[self.value(node.left, frames)]
+        raise PolicyEvalError(f"Unsupported expression: {to_sql(node)}")
+
+    def column(self, path, frames):
+        qualifier = '.'.join(path[:-1])
+        for frame in reversed(frames):
+            if qualifier and qualifier not in frame.names:
+                continue
+            if path[-1] in frame.columns:
+                return _lift(frame.columns[path[-1]], len(frames) + 1)
+            if qualifier:
+                break
+        raise PolicyEvalError(f"Unknown column {'.'.join(path)}")
+
+    def candidates(self, node, frames):
+        """(values, mask) of the right side of IN / = ANY, with one more axis"""
+        ndim = len(frames) + 2
+        inner = unwrap(node)
+        if isinstance(inner, ArraySubquery):
+            inner = unwrap(inner.subquery)
+        if isinstance(inner, Select):
+            return self.subquery(inner, frames)
+        items = inner.items if isinstance(inner, (Tuple, Array)) else [inner]
+        values = np.concatenate(
+            np.broadcast_arrays(*[_lift(self.value(item, frames), ndim) for item in items]), axis=-1)
+        return values, np.ones(values.shape, dtype=bool)
+
+    def subquery(self, select, frames):
+        """(values, mask): the first target and which subquery rows qualify, on a new last axis"""
+        ndim = len(frames) + 2
+        if len(select.targets) != 1 or len(select.from_items) > 1:
+            raise PolicyEvalError(f"Unsupported subquery: {to_sql(select)}")
+        target = unwrap(select.targets[0].expr)
+        if select.from_items:
+            item = select.from_items[0]
+            table = self.ev.tables.get(item.name[-1])
+            if table is None:
+                raise PolicyEvalError(f"No synthetic rows for {'.'.join(item.name)}")
+            names = {item.alias} if item.alias else {'.'.join(item.name), item.name[-1]}
+            shape = (1,) * (ndim - 1) + (-1,)
+            inner = frames + [_Frame(names, {column: codes.reshape(shape) for column, codes in table.items()})]
+            values = self.value(target, inner)
+            mask = np.ones((1,) * ndim, dtype=bool)
+        else:
+            inner = frames + [_Frame(set(), {})]
+            function = target.qualified_name.removeprefix('public.') if isinstance(target, Func) else None
+            if function == 'get_authorized_tenants':
+                values, mask = self.authorized_tenants(ndim)
+            elif function == 'member_feature_tenants' and len(target.args) == 1:
+                values, mask = self.member_feature_tenants(self.feature(target.args[0]), ndim)
+            else:
+                values = self.value(target, inner)
+                mask = np.ones((1,) * ndim, dtype=bool)
+        if select.where is not None:
+            mask = mask & (self.truth(select.where, inner) == TRUE)
+        if select.limit is not None:
+            mask = mask & (np.cumsum(mask, axis=-1) <= int(select.limit))
+        return np.broadcast_arrays(values, mask)
+
+    def scalar(self, select, frames):
+        """Value of a scalar subquery: NULL for no row, an error for more than one"""
+        values, mask = self.subquery(select, frames)
+        count = mask.sum(-1)
+        self.fail(count > 1)
+        first = np.take_along_axis(values, mask.argmax(-1)[..., None], axis=-1)[..., 0]
+        return np.where(count == 0, NULL_CODE, first)
+
+    # Functions
+
+    def call(self, node, frames):
+        ndim = len(frames) + 1
+        name = node.qualified_name.removeprefix('public.')
+        if name == 'auth.uid':
+            return _lift(self.ev.uid, ndim)
+        if name == 'auth.role':
+            return _lift(self.ev.db_role, ndim)
+        if name == 'auth.jwt':
+            return _lift(self.ev.claims, ndim)
+        if name == 'current_setting':
+            setting = string_value(node.args[0]) if node.args else None
+            if setting is None:
+                raise PolicyEvalError(f"Unsupported setting: {to_sql(node)}")
+            missing_ok = len(node.args) > 1 and getattr(unwrap(node.args[1]), 'value', None) == 'TRUE'
+            values = self.ev.setting(setting)
+            if not missing_ok:
+                # unrecognized configuration parameter
+                self.fail(values == NULL_CODE)
+            return _lift(values, ndim)
+        if name in ('upper', 'lower') and len(node.args) == 1:
+            fn = str.upper if name == 'upper' else str.lower
+            return self.ev.symbols.lookup(name, fn)[self.value(node.args[0], frames)]
+        raise PolicyEvalError(f"No model for {node.qualified_name}()")
+
+    def predicate(self, node, frames):
+        ndim = len(frames) + 1
+        name = node.qualified_name.removeprefix('public.')
+        if name == 'has_feature_access' and len(node.args) == 2:
+            tenant = self.value(node.args[0], frames)
+            return _truth(self.feature_access(tenant, self.feature(node.args[1]), ndim))
+        if name == 'has_member_feature_access' and len(node.args) == 3:
+            tenant = self.value(node.args[0], frames)
+            uid = self.value(node.args[1], frames)
+            return _truth(self.member_feature_access(tenant, uid, self.feature(node.args[2]), ndim))
+        raise PolicyEvalError(f"No model for {node.qualified_name}()")
+
+    @staticmethod
+    def feature(node):
+        feature = string_value(node)
+        if feature is None:
+            raise PolicyEvalError(f"Feature key is not a constant: {to_sql(node)}")
+        return feature
+
+    def feature_access(self, tenant, feature, ndim):
+        """has_feature_access(): the current user is in the tenant (or super_admin) and the feature is on"""
+        ev = self.ev
+        t = ev.tenant_positions()[tenant]
+        users = np.arange(len(ev.users)).reshape((-1,) + (1,) * (ndim - 1))
+        authorised = ev.member[users, t] | _lift(ev.is_super, ndim)
+        return authorised & ev.feature_enabled(feature)[t]
+
+    def member_feature_access(self, tenant, uid, feature, ndim):
+        """has_member_feature_access(): an admin of the tenant, or staff with the permission, and the feature is on"""
+        ev = self.ev
+        t = ev.tenant_positions()[tenant]
+        u = ev.user_positions()[uid]
+        role = ev.mapping_role[u, t]
+        allowed = self.feature_access(tenant, feature, ndim)
+        admin = np.isin(role, ev.symbols.array(['admin', 'super_admin']))
+        staff = (role == ev.symbols.code('staff')) & ev.staff_permission(feature)[u, t]
+        return allowed & (admin | staff) & (uid != NULL_CODE)
+
+    def member_feature_tenants(self, feature, ndim):
+        """public.member_feature_tenants(): the current user's tenants where has_member_feature_access() holds"""
+        tenants, mask = self.authorized_tenants(ndim)
+        uid = _lift(self.ev.uid, ndim)
+        return tenants, mask & self.member_feature_access(tenants, uid, feature, ndim)
+
+    def authorized_tenants(self, ndim):
+        """public.get_authorized_tenants(): the current user's user_tenant_mapping tenants"""
+        mapping = self.ev.tables['user_tenant_mapping']
+        shape = (1,) * (ndim - 1) + (-1,)
+        uid = _lift(self.ev.uid, ndim)
+        mask = (mapping['user_id'].reshape(shape) == uid) & (uid != NULL_CODE)
+        return mapping['tenant_id'].reshape(shape), mask
+
+
+# ---------------------------------------------------------------------------
+# Evaluator
+# ---------------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Access:
+    """What one user can do to one table's synthetic rows, by row class"""
+
+    table: str
+    operation: str
+    user: str
+    own: int
+    other: int
+    null: int
+    own_total: int
+    other_total: int
+    null_total: int
+    errors: int = 0
+    unsupported: bool = False
+    cross_tenant: bool = False
+
+    @property
+    def leak(self):
+        return self.other > 0 and not self.cross_tenant
+
+    def label(self):
+        if self.errors:
+            return 'ERR' + ('?' if self.unsupported else '')
+        parts = []
+        for name, count, total in (('own', self.own, self.own_total),
+                                   ('other', self.other, self.other_total),
+                                   ('null', self.null, self.null_total)):
+            if count:
+                parts.append(name if count == total else f"{name} {100 * count // total}%")
+        return ('+'.join(parts) or '-') + ('!' if self.leak else '') + ('?' if self.unsupported else '')
+
+
+class Evaluator:
+    """The policies of a catalog evaluated against one Scenario"""
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.users = scenario.users
+        self.symbols = symbols = Symbols()
+        self._parsed = {}
+        # evaluate() results of the table being evaluated
+        self._results = {}
+        self._distinct = {}
+        # Policies that could not be evaluated: {(table, policy name): reason}
+        self.unsupported = {}
+
+        tenants = scenario.tenants
+        self.tenant_ids = [t.id for t in tenants]
+        self.user_ids = [u.uid for u in self.users]
+
+        # User axis values, shape (users, 1)
+        self.uid = symbols.array(self.user_ids)[:, None]
+        self.db_role = symbols.array([u.role for u in self.users])[:, None]
+        self.claims = symbols.array([json.dumps(u.jwt_claims, sort_keys=True) for u in self.users])[:, None]
+        self._settings = {}
+
+        # Per user and tenant; the extra last row / column answers for
+        # unknown users and tenants (and NULL)
+        positions = {tid: i for i, tid in enumerate(self.tenant_ids)}
+        self.member = np.zeros((len(self.users), len(tenants) + 1), dtype=bool)
+        self.mapping_role = np.full((len(self.users) + 1, len(tenants) + 1), NULL_CODE, dtype=np.int64)
+        for u, user in enumerate(self.users):
+            for tid, role in user.tenants.items():
+                self.member[u, positions[tid]] = True
+                self.mapping_role[u, positions[tid]] = symbols.code(role)
+        self.is_super = np.array([any(r == 'super_admin' for r in u.tenants.values()) for u in self.users])[:, None]
+
+        self.tables = {name: {column: symbols.array(values) for column, values in columns.items()}
+                       for name, columns in self._subquery_tables().items()}
+        self._rows = self._row_columns()
+        self.num_rows = len(self._rows['id'])
+        self.max_subquery_rows = max([len(next(iter(t.values()))) for t in self.tables.values()] + [1])
+
+    def _subquery_tables(self):
+        mapping = [(user.uid, tid, role) for user in self.users for tid, role in user.tenants.items()]
+        staff = [(user.uid, tid) for user in self.users for tid, role in user.tenants.items() if role == 'staff']
+        tenants = self.scenario.tenants
+        return {
+            'user_tenant_mapping': {
+                'user_id': [m[0] for m in mapping],
+                'tenant_id': [m[1] for m in mapping],
+                'role': [m[2] for m in mapping],
+            },
+            'tenants': {
+                'id': [t.id for t in tenants],
+                'name': [t.name for t in tenants],
+                'plan': [t.plan for t in tenants],
+                'tier': [t.tier for t in tenants],
+            },
+            'users': {
+                'id': [u.uid for u in self.users if u.uid is not None],
+                'email': [f'{u.name}@example.test' for u in self.users if u.uid is not None],
+                'role': [u.role for u in self.users if u.uid is not None],
+            },
+            'staff': {
+                'id': [s[0] for s in staff],
+                'tenant_id': [s[1] for s in staff],
+            },
+        }
+
+    def _row_columns(self):
+        """
+        The synthetic rows every table is evaluated on: rows_per_tenant rows
+        per tenant, owned in turn by the tenant's members, half of them in
+        the tenant's category / plan, and null_rows rows without tenant.
+        """
+        scenario = self.scenario
+        columns = {'id': [], 'tenant_id': [], 'user_id': [], 'uploaded_by': [], 'category': [], 'plan': []}
+        for tenant in scenario.tenants:
+            members = [u.uid for u in self.users if tenant.id in u.tenants]
+            for i in range(scenario.rows_per_tenant):
+                owner = members[i % len(members)] if members else None
+                in_plan = (i // 2) % 2 == 0
+                columns['id'].append(_uuid('row', tenant.name, i))
+                columns['tenant_id'].append(tenant.id)
+                columns['user_id'].append(owner)
+                columns['uploaded_by'].append(owner)
+                columns['category'].append(tenant.tier.upper() if in_plan else 'OTHER')
+                columns['plan'].append(tenant.plan.upper() if in_plan else 'OTHER')
+        for i in range(scenario.null_rows):
+            columns['id'].append(_uuid('row', 'null', i))
+            for name in ('tenant_id', 'user_id', 'uploaded_by', 'category', 'plan'):
+                columns[name].append(None)
+        return {name: self.symbols.array(values) for name, values in columns.items()}
+
+    def rows(self, table):
+        """Column codes of table's synthetic rows; the tenants table's ids are the tenant ids"""
+        if table == 'tenants':
+            return dict(self._rows, id=self._rows['tenant_id'])
+        return self._rows
+
+    # Lookups used by the function models
+
+    def tenant_positions(self):
+        return self.symbols.positions('tenant', self.tenant_ids)
+
+    def user_positions(self):
+        return self.symbols.positions('user', self.user_ids)
+
+    def setting(self, name):
+        values = self._settings.get(name)
+        if values is None:
+            values = self._settings[name] = self.symbols.array([u.setting(name) for u in self.users])[:, None]
+        return values
+
+    def feature_enabled(self, feature):
+        return np.array([t.features is None or feature in t.features for t in self.scenario.tenants] + [False])
+
+    def staff_permission(self, feature):
+        granted = np.zeros((len(self.users) + 1, len(self.tenant_ids) + 1), dtype=bool)
+        for u, user in enumerate(self.users):
+            for t, tid in enumerate(self.tenant_ids):
+                if tid in user.permissions:
+                    permissions = user.permissions[tid]
+                    granted[u, t] = permissions is None or feature in permissions
+        return granted
+
+    # Policies
+
+    def parsed(self, text):
+        if text not in self._parsed:
+            try:
+                self._parsed[text] = parse_policy_expr(text)
+            except PolicyExprError as e:
+                self._parsed[text] = PolicyEvalError(f"Unparseable expression: {e}")
+        node = self._parsed[text]
+        if isinstance(node, PolicyEvalError):
+            raise node
+        return node
+
+    @staticmethod
+    def expressions(policy, operation):
+        """USING / WITH CHECK expressions a row must pass for operation (ALL policies reuse USING)"""
+        if operation in ('SELECT', 'DELETE'):
+            return [policy.qual]
+        check = policy.with_check if policy.with_check is not None else policy.qual
+        if operation == 'INSERT':
+            return [check]
+        return [policy.qual, check]
+
+    def distinct_rows(self, table, columns):
+        """
+        ({column: codes} of the distinct combinations of columns among
+        table's rows, number of rows with each combination)
+        """
+        key = (table == 'tenants', columns)
+        if key not in self._distinct:
+            rows = self.rows(table)
+            distinct, counts = np.unique(np.stack([rows[c] for c in columns], axis=1), axis=0, return_counts=True)
+            self._distinct[key] = ({column: distinct[:, i] for i, column in enumerate(columns)}, counts)
+        return self._distinct[key]
+
+    def referenced_columns(self, table, policies):
+        """Row columns the table's (parseable) policies reference, plus tenant_id"""
+        columns = {'tenant_id'}
+        for policy in policies:
+            for text in (policy.qual, policy.with_check):
+                try:
+                    expr = None if text is None else self.parsed(text)
+                except PolicyEvalError:
+                    continue
+                if expr is not None:
+                    columns.update(self._outer_names(expr, table, frozenset()))
+        return tuple(sorted(columns & self.rows(table).keys()))
+
+    def _outer_names(self, node, table, hidden):
+        """Columns of node that refer to table's row rather than to a subquery's FROM table"""
+        if isinstance(node, Name):
+            qualifier = '.'.join(node.path[:-1])
+            if qualifier in (table, f'public.{table}') or (not qualifier and node.name not in hidden):
+                yield node.name
+            return
+        if isinstance(node, Select):
+            for item in node.from_items:
+                hidden = hidden | self.tables.get(item.name[-1], {}).keys()
+        for child in node.parts():
+            yield from self._outer_names(child, table, hidden)
+
+    def evaluate(self, table, text, rows):
+        """(passed, errors) of one expression over rows ({column: codes}), each (users, rows)"""
+        key = (table, text)
+        if key in self._results:
+            return self._results[key]
+        expr = self.parsed(text)
+        num_rows = len(rows['tenant_id'])
+        passed = np.zeros((len(self.users), num_rows), dtype=bool)
+        errors = np.zeros_like(passed)
+        chunk = max(1, CHUNK_CELLS // (len(self.users) * self.max_subquery_rows))
+        for start in range(0, num_rows, chunk):
+            run = _Evaluation(self, table, {column: codes[start:start + chunk] for column, codes in rows.items()})
+            truth = run.truth(expr, run.frames)
+            passed[:, start:start + chunk] = np.broadcast_to(truth, run.errors.shape) == TRUE
+            errors[:, start:start + chunk] = run.errors
+        result = self._results[key] = (passed, errors)
+        return result
+
+    def access(self, policies, operation, table, rows):
+        """
+        (allowed, errors, unsupported) for operation on rows of table:
+        (users, rows) booleans and a per-user flag for skipped policies.
+        Permissive policies are OR-ed; an error in any applicable policy
+        fails the query.
+        """
+        shape = (len(self.users), len(rows['tenant_id']))
+        allowed = np.zeros(shape, dtype=bool)
+        errors = np.zeros(shape, dtype=bool)
+        unsupported = np.zeros(len(self.users), dtype=bool)
+
+        bypass = np.array([u.role == BYPASS_ROLE for u in self.users])
+        if policies and not policies[0].rls_enabled:
+            bypass[:] = True
+        allowed[bypass] = True
+
+        for policy in policies:
+            if not policy.applies_to(operation):
+                continue
+            applies = np.array([('public' in policy.roles or u.role in policy.roles) for u in self.users]) & ~bypass
+            if not applies.any():
+                continue
+            texts = self.expressions(policy, operation)
+            # A policy without the expression this operation needs grants nothing
+            if None in texts:
+                continue
+            try:
+                results = [self.evaluate(table, text, rows) for text in texts]
+            except PolicyEvalError as e:
+                self.unsupported[(table, policy.name)] = str(e)
+                unsupported |= applies
+                continue
+            passed = reduce(np.logical_and, [r[0] for r in results])
+            failed = reduce(np.logical_or, [r[1] for r in results])
+            allowed |= passed & applies[:, None]
+            errors |= failed & applies[:, None]
+        return allowed, errors, unsupported
+
+    def matrix(self, catalog, tables=None, operations=OPERATIONS):
+        """
+        Access cells for every table (in catalog order), operation and user.
+        A table's policies are evaluated once on the distinct combinations
+        of the row columns they reference; counts are weighted by how many
+        rows share each combination.
+        """
+        cells = []
+        for table in tables or catalog.tables:
+            policies = catalog.table(table)
+            rows, weights = self.distinct_rows(table, self.referenced_columns(table, policies))
+            tenant = rows['tenant_id']
+            own = self.member[:, self.tenant_positions()[tenant]]
+            null = np.broadcast_to(tenant == NULL_CODE, own.shape)
+            other = ~own & ~null
+            totals = [(rows_in_class * weights).sum(1) for rows_in_class in (own, other, null)]
+            for operation in operations:
+                allowed, errors, unsupported = self.access(policies, operation, table, rows)
+                counts = [(allowed & rows_in_class) @ weights for rows_in_class in (own, other, null)]
+                num_errors = errors @ weights
+                for u, user in enumerate(self.users):
+                    cells.append(Access(
+                        table=table, operation=operation, user=user.name,
+                        own=int(counts[0][u]), other=int(counts[1][u]), null=int(counts[2][u]),
+                        own_total=int(totals[0][u]), other_total=int(totals[1][u]), null_total=int(totals[2][u]),
+                        errors=int(num_errors[u]),
+                        unsupported=bool(unsupported[u]),
+                        cross_tenant=user.cross_tenant,
+                    ))
+            self._results.clear()
+        return cells
+
+
+def print_matrix(cells, users, operations, leaks_only=False):
+    width = max(len(u.name) for u in users) + 2
+    by_table = {}
+    for cell in cells:
+        by_table.setdefault(cell.table, {})[(cell.user, cell.operation)] = cell
+    for table, table_cells in by_table.items():
+        if leaks_only and not any(c.leak or c.errors for c in table_cells.values()):
+            continue
+        print(f"\n{table}")
+        print('  ' + 'user'.ljust(width) + ''.join(op.ljust(18) for op in operations))
+        for user in users:
+            labels = [table_cells[(user.name, op)].label() for op in operations]
+            print('  ' + user.name.ljust(width) + ''.join(label.ljust(18) for label in labels))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate RLS policies offline against synthetic tenants, users and rows')
+    parser.add_argument('--baseline', action='store_true', help='Read phase4_baseline_dump.json instead of live_policies.csv')
+    parser.add_argument('--migration', help='Evaluate the policies this migration script creates instead')
+    parser.add_argument('--path', help='Export to read (defaults to the live or baseline export)')
+    parser.add_argument('--table', action='append', help='Only this table (repeatable)')
+    parser.add_argument('--operation', action='append', choices=OPERATIONS, help='Only this operation (repeatable)')
+    parser.add_argument('--tenants', type=int, default=3, help='Synthetic tenants (default 3)')
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per tenant and table (default 1000)')
+    parser.add_argument('--null-rows', type=int, default=100, help='Rows without tenant per table (default 100)')
+    parser.add_argument('--leaks-only', action='store_true', help='Only print tables with a leak or error')
+    parser.add_argument('--json', help='Also write every cell to this JSON file')
+    args = parser.parse_args()
+
+    if args.migration:
+        catalog = load_migration(args.migration)
+    elif args.baseline:
+        catalog = load_baseline(args.path) if args.path else load_baseline()
+    else:
+        catalog = load_live(args.path) if args.path else load_live()
+    operations = tuple(args.operation or OPERATIONS)
+
+    scenario = Scenario.default(args.tenants, args.rows, args.null_rows)
+    start = time.perf_counter()
+    evaluator = Evaluator(scenario)
+    cells = evaluator.matrix(catalog, tables=args.table, operations=operations)
+    elapsed = time.perf_counter() - start
+
+    print_matrix(cells, scenario.users, operations, args.leaks_only)
+
+    leaks = [c for c in cells if c.leak]
+    errors = [c for c in cells if c.errors]
+    print(f"\nLeaks (other tenants' rows): {len(leaks)}")
+    for cell in leaks:
+        print(f"  {cell.table} | {cell.operation} | {cell.user} | {cell.other}/{cell.other_total} rows")
+    print(f"Errors (scalar subquery / setting raises): {len(errors)}")
+    for cell in errors:
+        print(f"  {cell.table} | {cell.operation} | {cell.user} | {cell.errors} rows")
+    print(f"Unsupported policies: {len(evaluator.unsupported)}")
+    for (table, name), reason in evaluator.unsupported.items():
+        print(f"  {table} | {name} | {reason}")
+
+    tables = {c.table for c in cells}
+    print(f"\nEvaluated {len(tables)} tables x {len(operations)} operations for {len(scenario.users)} users "
+          f"x {evaluator.num_rows} rows in {elapsed:.2f}s")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([dict(asdict(c), leak=c.leak) for c in cells], f, indent=2)
+
+    print("POLICY EVAL PASS" if not leaks and not errors else "POLICY EVAL FAIL")
+
+
+if __name__ == '__main__':
+    main()
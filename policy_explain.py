@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Before/after EXPLAIN harness for the Phase 5B policies against a local
+Postgres.
+
+generate_phase5b.py writes the policies twice: the standard migration,
+which calls has_member_feature_access(t.tenant_id, auth.uid(), ...) for
+every row, and the --initplan migration, where auth.uid() is wrapped in
+(SELECT ...) and the feature check is a tenant_id = ANY (ARRAY(SELECT
+public.member_feature_tenants(...))) InitPlan. This script proves the
+difference on a real planner:
+
+1. creates a scratch database (dropped again unless --keep) with the
+   Supabase roles, auth.uid() / auth.role() / auth.jwt() as Supabase
+   defines them, the tables the migrations touch (id, tenant_id, note,
+   with a tenant_id index as planned in phase9a_production_migration.sql)
+   and --tenants x --rows rows per table
+2. applies the standard migration and runs, per table and fixture user
+   (admin, staff, super_admin, outsider), as role authenticated:
+
+       EXPLAIN ANALYZE UPDATE t SET note = ...                USING on every row
+       EXPLAIN ANALYZE INSERT INTO t (tenant_id) SELECT ...   WITH CHECK per row
+
+3. applies the --initplan migration on top and runs the same statements
+
+Function calls are read from pg_stat_xact_user_functions with
+track_functions = 'all' inside each statement's transaction (rolled back
+afterwards). has_feature_access() is a stand-in reading a
+tenant_features table, not the plan/override lookup of
+has_feature_access_full.txt; its call count is what matters. auth.uid()
+is an inlinable SQL function, so it never shows as calls; its per-row
+evaluation shows as the Filter of the plan, and its (SELECT ...) form as
+an InitPlan.
+
+Both migrations must allow exactly the same rows for every user, and the
+--initplan one must not call more functions; otherwise the run fails.
+
+Usage:
+    python policy_explain.py --dsn postgresql://postgres@localhost/postgres
+    python policy_explain.py --dsn ... --table voters --tenants 200 --rows 500
+    python policy_explain.py --dsn ... --keep --json policy_explain.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import uuid
+
+import psycopg2
+from psycopg2.extensions import make_dsn
+
+from policy_catalog import ROOT_DIR
+
+BEFORE_MIGRATION = os.path.join(ROOT_DIR, 'migrations', 'phase5b_rbac_migration.sql')
+AFTER_MIGRATION = os.path.join(ROOT_DIR, 'migrations', 'phase5b_rbac_migration_initplan.sql')
+
+# Tables with a fixture of their own
+FIXTURE_TABLES = ('tenants', 'user_tenant_mapping', 'staff', 'tenant_features')
+
+FIXTURE_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        CREATE ROLE anon NOLOGIN;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+        CREATE ROLE authenticated NOLOGIN;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        CREATE ROLE service_role NOLOGIN BYPASSRLS;
+    END IF;
+END
+$$;
+
+CREATE SCHEMA auth;
+GRANT USAGE ON SCHEMA auth TO anon, authenticated, service_role;
+
+CREATE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql STABLE AS $$
+    SELECT coalesce(
+        nullif(current_setting('request.jwt.claim.sub', true), ''),
+        (nullif(current_setting('request.jwt.claims', true), '')::jsonb ->> 'sub')
+    )::uuid
+$$;
+
+CREATE FUNCTION auth.role() RETURNS text LANGUAGE sql STABLE AS $$
+    SELECT coalesce(
+        nullif(current_setting('request.jwt.claim.role', true), ''),
+        (nullif(current_setting('request.jwt.claims', true), '')::jsonb ->> 'role')
+    )::text
+$$;
+
+CREATE FUNCTION auth.jwt() RETURNS jsonb LANGUAGE sql STABLE AS $$
+    SELECT coalesce(
+        nullif(current_setting('request.jwt.claim', true), ''),
+        nullif(current_setting('request.jwt.claims', true), '')
+    )::jsonb
+$$;
+
+CREATE TABLE public.tenants (id uuid PRIMARY KEY, name text);
+CREATE TABLE public.user_tenant_mapping (user_id uuid PRIMARY KEY, tenant_id uuid, role text);
+CREATE TABLE public.staff (id uuid PRIMARY KEY, tenant_id uuid, permissions text[], note text);
+CREATE INDEX idx_staff_tenant_id ON public.staff USING btree (tenant_id);
+CREATE TABLE public.tenant_features (tenant_id uuid, feature_key text, PRIMARY KEY (tenant_id, feature_key));
+
+-- Stand-in for has_feature_access_full.txt: the same membership checks, then one lookup
+CREATE FUNCTION public.has_feature_access(p_tenant_id uuid, p_feature_key text)
+RETURNS boolean
+LANGUAGE plpgsql
+STABLE SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM public.user_tenant_mapping
+        WHERE user_id = auth.uid() AND tenant_id = p_tenant_id
+    ) AND NOT EXISTS (
+        SELECT 1 FROM public.user_tenant_mapping
+        WHERE user_id = auth.uid() AND role = 'super_admin'
+    ) THEN
+        RETURN FALSE;
+    END IF;
+    RETURN EXISTS (
+        SELECT 1 FROM public.tenant_features
+        WHERE tenant_id = p_tenant_id AND feature_key = p_feature_key
+    );
+END;
+$$;
+"""
+
+TABLE_SQL = """
+CREATE TABLE public.{table} (id uuid PRIMARY KEY DEFAULT gen_random_uuid(), tenant_id uuid, note text);
+CREATE INDEX idx_{table}_tenant_id ON public.{table} USING btree (tenant_id);
+"""
+
+GRANTS_SQL = """
+GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO authenticated, service_role;
+"""
+
+
+class FixtureUser:
+    def __init__(self, name, role, tenant, permissions=None):
+        self.name = name
+        self.role = role
+        self.tenant = tenant
+        self.permissions = permissions
+        self.uid = str(uuid.uuid4())
+
+    @property
+    def claims(self):
+        return json.dumps({'sub': self.uid, 'role': 'authenticated'})
+
+
+def migration_tables(*paths):
+    """Tables the migrations create policies or triggers on, in first-seen order"""
+    tables = {}
+    for path in paths:
+        with open(path, encoding='utf-8-sig') as f:
+            for table in re.findall(r'\bON\s+public\."?(\w+)"?', f.read()):
+                tables.setdefault(table, None)
+    return [t for t in tables if t not in FIXTURE_TABLES]
+
+
+def _plan_nodes(plan):
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.get('Plans', ()))
+
+
+class Harness:
+    def __init__(self, dsn, tenants, rows, write_rows):
+        self.dsn = dsn
+        self.tenants = [str(uuid.uuid4()) for _ in range(tenants)]
+        self.rows = rows
+        self.write_rows = write_rows
+        self.database = f'policy_explain_{os.getpid()}'
+        self.conn = None
+
+    def create(self, tables, features, staff_features):
+        admin = psycopg2.connect(self.dsn)
+        admin.autocommit = True
+        with admin.cursor() as cur:
+            cur.execute(f'CREATE DATABASE {self.database}')
+        admin.close()
+        self.conn = psycopg2.connect(make_dsn(self.dsn, dbname=self.database))
+        self.conn.autocommit = True
+
+        self.users = [
+            FixtureUser('admin', 'admin', self.tenants[0]),
+            FixtureUser('staff', 'staff', self.tenants[1 % len(self.tenants)], staff_features),
+            FixtureUser('super_admin', 'super_admin', self.tenants[2 % len(self.tenants)]),
+            FixtureUser('outsider', None, self.tenants[0]),
+        ]
+        with self.conn.cursor() as cur:
+            cur.execute(FIXTURE_SQL)
+            for table in tables:
+                cur.execute(TABLE_SQL.format(table=table))
+            cur.execute(GRANTS_SQL)
+            cur.execute("INSERT INTO public.tenants (id, name) SELECT t, 'tenant' FROM unnest(%s::uuid[]) t",
+                        (self.tenants,))
+            cur.execute("INSERT INTO public.tenant_features (tenant_id, feature_key) "
+                        "SELECT t, f FROM unnest(%s::uuid[]) t, unnest(%s::text[]) f", (self.tenants, features))
+            for user in self.users:
+                if user.role is not None:
+                    cur.execute("INSERT INTO public.user_tenant_mapping (user_id, tenant_id, role) "
+                                "VALUES (%s, %s, %s)", (user.uid, user.tenant, user.role))
+                if user.permissions is not None:
+                    cur.execute("INSERT INTO public.staff (id, tenant_id, permissions) VALUES (%s, %s, %s)",
+                                (user.uid, user.tenant, user.permissions))
+            for table in tables:
+                cur.execute(f"INSERT INTO public.{table} (tenant_id) "
+                            f"SELECT t FROM unnest(%s::uuid[]) t, generate_series(1, %s)", (self.tenants, self.rows))
+                cur.execute(f'ALTER TABLE public.{table} ENABLE ROW LEVEL SECURITY')
+            cur.execute('ANALYZE')
+
+    def apply(self, path):
+        with open(path, encoding='utf-8-sig') as f:
+            sql = f.read()
+        with self.conn.cursor() as cur:
+            cur.execute(sql)
+            cur.execute('ANALYZE')
+
+    @staticmethod
+    def function_calls(cur):
+        """Calls per function counted by this backend and not yet flushed"""
+        cur.execute("SELECT schemaname || '.' || funcname, calls FROM pg_stat_xact_user_functions")
+        return dict(cur.fetchall())
+
+    def explain(self, table, statement, params, user):
+        """Plan summary, rows and function calls of one statement run as user, rolled back"""
+        self.conn.autocommit = False
+        result = {'outcome': 'ok'}
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SET LOCAL track_functions = 'all'")
+                calls_before = self.function_calls(cur)
+                cur.execute("SELECT set_config('request.jwt.claims', %s, true), "
+                            "set_config('request.jwt.claim.sub', %s, true)", (user.claims, user.uid))
+                cur.execute('SET LOCAL ROLE authenticated')
+                cur.execute('SAVEPOINT statement')
+                start = time.perf_counter()
+                try:
+                    cur.execute('EXPLAIN (ANALYZE, VERBOSE, FORMAT JSON) ' + statement, params)
+                    explained = cur.fetchone()[0]
+                except psycopg2.errors.InsufficientPrivilege:
+                    # new row violates row-level security policy
+                    cur.execute('ROLLBACK TO SAVEPOINT statement')
+                    explained = None
+                    result['outcome'] = 'denied'
+                result['ms'] = (time.perf_counter() - start) * 1000
+                cur.execute('RESET ROLE')
+                calls = self.function_calls(cur)
+                result['calls'] = {name: count - calls_before.get(name, 0) for name, count in calls.items()
+                                   if count != calls_before.get(name, 0)}
+            if explained is not None:
+                if isinstance(explained, str):
+                    explained = json.loads(explained)
+                plan = explained[0]['Plan']
+                nodes = list(_plan_nodes(plan))
+                # Rows that reached the UPDATE / INSERT, past the policy's filter
+                outer = [n for n in plan.get('Plans', ()) if n.get('Parent Relationship') == 'Outer']
+                result['rows'] = outer[0]['Actual Rows'] if outer else plan['Actual Rows']
+                result['scan'] = ', '.join(sorted({n['Node Type'] for n in nodes
+                                                   if n.get('Relation Name') == table
+                                                   and n['Node Type'] != 'ModifyTable'})) or '-'
+                result['initplans'] = sum(n.get('Parent Relationship') == 'InitPlan' for n in nodes)
+                result['subplans'] = sum(n.get('Parent Relationship') == 'SubPlan' for n in nodes)
+                result['ms'] = explained[0]['Execution Time']
+            else:
+                result.update(rows=0, scan='-', initplans=0, subplans=0)
+        finally:
+            self.conn.rollback()
+            self.conn.autocommit = True
+        return result
+
+    def measure(self, tables):
+        results = {}
+        for table in tables:
+            for user in self.users:
+                statements = (
+                    ('UPDATE', f"UPDATE public.{table} SET note = 'policy_explain'", None),
+                    ('INSERT', f"INSERT INTO public.{table} (tenant_id) SELECT %s::uuid FROM generate_series(1, %s)",
+                     (user.tenant, self.write_rows)),
+                )
+                for operation, statement, params in statements:
+                    results[(table, operation, user.name)] = self.explain(table, statement, params, user)
+        return results
+
+    def drop(self):
+        if self.conn is not None:
+            self.conn.close()
+        admin = psycopg2.connect(self.dsn)
+        admin.autocommit = True
+        with admin.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS {self.database}')
+        admin.close()
+
+
+def migration_features(path):
+    """{table: feature key} of the has_member_feature_access() calls in the migration's policies"""
+    with open(path, encoding='utf-8-sig') as f:
+        calls = re.findall(r"has_member_feature_access\((\w+)\.tenant_id, auth\.uid\(\), '(\w+)'\)", f.read())
+    return dict(calls)
+
+
+def print_comparison(before, after):
+    print(f"{'table':<22} {'op':<6} {'user':<12} {'rows':>13}  {'scan (before -> after)':<44} "
+          f"{'initplans':>9}  {'function calls':>17}  {'ms':>15}")
+    for key in before:
+        b, a = before[key], after[key]
+        table, operation, user = key
+        rows = f"{b['rows']}/{a['rows']}" if b['outcome'] == a['outcome'] == 'ok' else f"{b['outcome']}/{a['outcome']}"
+        calls = f"{sum(b['calls'].values())} -> {sum(a['calls'].values())}"
+        print(f"{table:<22} {operation:<6} {user:<12} {rows:>13}  {(b['scan'] + ' -> ' + a['scan'])[:44]:<44} "
+              f"{b['initplans']:>4}->{a['initplans']:<4}  {calls:>17}  {b['ms']:>6.1f} -> {a['ms']:<6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN ANALYZE the Phase 5B policies before and after the '
+                                                 'InitPlan rewrite on a local Postgres')
+    parser.add_argument('--dsn', default='postgresql://postgres@localhost/postgres',
+                        help='Postgres to create the scratch database on (needs CREATEDB and CREATEROLE)')
+    parser.add_argument('--before', default=BEFORE_MIGRATION, help='Standard migration')
+    parser.add_argument('--after', default=AFTER_MIGRATION, help='InitPlan migration (generate_phase5b.py --initplan)')
+    parser.add_argument('--table', action='append', help='Only this table (repeatable; default voters and complaints)')
+    parser.add_argument('--tenants', type=int, default=100, help='Tenants (default 100)')
+    parser.add_argument('--rows', type=int, default=100, help='Rows per tenant and table (default 100)')
+    parser.add_argument('--write-rows', type=int, default=100, help='Rows per INSERT (default 100)')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch database')
+    parser.add_argument('--json', help='Also write every measurement to this JSON file')
+    args = parser.parse_args()
+
+    tables = migration_tables(args.before, args.after)
+    measured = args.table or ['voters', 'complaints']
+    unknown = [t for t in measured if t not in tables]
+    if unknown:
+        parser.error(f"No policies for {', '.join(unknown)} in the migrations")
+
+    harness = Harness(args.dsn, args.tenants, args.rows, args.write_rows)
+    try:
+        features = migration_features(args.before)
+        # Staff may use the first measured table's feature only, so their cells differ between tables
+        harness.create(tables, sorted(set(features.values())), [features[measured[0]]])
+        harness.apply(args.before)
+        before = harness.measure(measured)
+        harness.apply(args.after)
+        after = harness.measure(measured)
+    finally:
+        if args.keep:
+            print(f"Kept database {harness.database}")
+        else:
+            harness.drop()
+
+    print(f"{args.tenants} tenants x {args.rows} rows per table, {args.write_rows} rows per INSERT\n")
+    print_comparison(before, after)
+
+    totals = {}
+    for phase, results in (('before', before), ('after', after)):
+        for result in results.values():
+            for function, calls in result['calls'].items():
+                totals.setdefault(function, {'before': 0, 'after': 0})[phase] += calls
+    print("\nFunction calls (before -> after):")
+    for function, counts in sorted(totals.items()):
+        print(f"  {function:<40} {counts['before']:>10} -> {counts['after']}")
+
+    mismatches = [key for key in before
+                  if (before[key]['outcome'], before[key]['rows']) != (after[key]['outcome'], after[key]['rows'])]
+    for table, operation, user in mismatches:
+        print(f"MISMATCH: {table} {operation} as {user} allows different rows")
+    more_calls = sum(sum(r['calls'].values()) for r in after.values()) > \
+        sum(sum(r['calls'].values()) for r in before.values())
+    if more_calls:
+        print("The InitPlan migration calls more functions than the standard one")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([{'table': t, 'operation': o, 'user': u, 'before': before[(t, o, u)], 'after': after[(t, o, u)]}
+                       for t, o, u in before], f, indent=2)
+
+    if mismatches or more_calls:
+        print("POLICY EXPLAIN FAIL")
+        sys.exit(1)
+    print("POLICY EXPLAIN PASS")
+
+
+if __name__ == '__main__':
+    main()
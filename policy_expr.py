@@ -0,0 +1,839 @@
+#!/usr/bin/env python3
+"""
+Parser and rewriter for RLS policy expressions.
+
+pg_policies stores USING / WITH CHECK expressions in Postgres' deparsed
+form, e.g.
+
+    ((tenant_id IN ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping
+      WHERE (user_tenant_mapping.user_id = auth.uid()))) OR (auth.role() = 'service_role'::text))
+
+The migration generators used to rewrite these with regexes and str.replace
+of exact subquery text, which silently did nothing (or cut an expression in
+half) as soon as the text differed by a parenthesis. Here an expression is
+tokenized and parsed into a small tree (boolean operators, comparisons,
+IN / EXISTS subqueries, function calls, casts, arrays) and the rewrites are
+tree transforms.
+
+Printing preserves the source: a subtree that was not rewritten prints as
+its original text, byte for byte, and only rewritten nodes are printed
+from the tree. Unchanged policies therefore round-trip exactly.
+
+    from policy_expr import parse, to_sql, strip_plan_checks
+
+    expr = strip_plan_checks(parse(row['condition']))
+    print(to_sql(expr))
+
+Only the expression subset that shows up in pg_policies is supported; a
+parse error raises PolicyExprError.
+"""
+
+import re
+from functools import lru_cache
+
+
+class PolicyExprError(ValueError):
+    pass
+
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<qident>"(?:[^"]|"")*")
+  | (?P<ident>[A-Za-z_][A-Za-z_0-9$]*)
+  | (?P<op>->>|->|::|<>|!=|<=|>=|\|\||[=<>+\-*/%])
+  | (?P<punct>[(),.\[\]])
+""", re.VERBOSE)
+
+KEYWORDS = {
+    'ALL', 'AND', 'ANY', 'ARRAY', 'AS', 'EXISTS', 'FALSE', 'FROM', 'IN', 'IS',
+    'LIMIT', 'NOT', 'NULL', 'OR', 'SELECT', 'TRUE', 'WHERE',
+}
+
+COMPARISON_OPS = {'=', '<>', '!=', '<', '>', '<=', '>='}
+ARITHMETIC_OPS = {'->>', '->', '||', '+', '-', '*', '/', '%'}
+
+
+class Token:
+    __slots__ = ('kind', 'text', 'start', 'end')
+
+    def __init__(self, kind, text, start, end):
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+
+    @property
+    def keyword(self):
+        """Upper-cased keyword, or None for anything that is not a keyword"""
+        if self.kind == 'ident' and self.text.upper() in KEYWORDS:
+            return self.text.upper()
+        return None
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r})"
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise PolicyExprError(f"Unexpected character {text[pos]!r} at {pos}")
+        if match.lastgroup != 'ws':
+            tokens.append(Token(match.lastgroup, match.group(), pos, match.end()))
+        pos = match.end()
+    return tokens
+
+
+# ---------------------------------------------------------------------------
+# Tree
+# ---------------------------------------------------------------------------
+
+class Node:
+    """
+    Base of all expression nodes. A parsed node remembers its source text and
+    span; nodes built by rewrites have no span and print from their fields.
+    """
+
+    __slots__ = ('source', 'span', 'slots')
+
+    # Fields holding child nodes (a node or a list of nodes), in source order
+    child_fields = ()
+    # Fields holding plain values
+    value_fields = ()
+
+    def __init__(self, **fields):
+        self.source = None
+        self.span = None
+        # Spans of the original children of a rewritten node (None if pristine)
+        self.slots = None
+        for name in self.child_fields + self.value_fields:
+            setattr(self, name, fields.get(name))
+
+    def parts(self):
+        """Child nodes in source order"""
+        for name in self.child_fields:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                yield from value
+            elif value is not None:
+                yield value
+
+    def replace(self, **changes):
+        """Copy with some fields changed; unchanged text around the children is kept"""
+        fields = {name: getattr(self, name) for name in self.child_fields + self.value_fields}
+        fields.update(changes)
+        node = type(self)(**fields)
+        if self.span is not None and all(getattr(self, v) == fields[v] for v in self.value_fields):
+            slots = self.slots if self.slots is not None else tuple(c.span for c in self.parts())
+            if None not in slots and len(slots) == len(list(node.parts())):
+                node.source, node.span, node.slots = self.source, self.span, slots
+        return node
+
+    def format(self, render):
+        raise NotImplementedError
+
+    def sql(self):
+        return to_sql(self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.sql()!r})"
+
+
+class Literal(Node):
+    """String, number, TRUE, FALSE or NULL"""
+    value_fields = ('text',)
+
+    @property
+    def value(self):
+        if self.text.startswith("'"):
+            return self.text[1:-1].replace("''", "'")
+        return self.text.upper() if self.text.isalpha() else self.text
+
+    def format(self, render):
+        return self.text
+
+
+class Name(Node):
+    """Column reference, possibly qualified: tenant_id, user_tenant_mapping.user_id"""
+    value_fields = ('path',)
+
+    @property
+    def name(self):
+        return self.path[-1]
+
+    def format(self, render):
+        return '.'.join(self.path)
+
+
+class Func(Node):
+    child_fields = ('args',)
+    value_fields = ('name',)
+
+    @property
+    def qualified_name(self):
+        return '.'.join(self.name)
+
+    def format(self, render):
+        return f"{self.qualified_name}({', '.join(render(a) for a in self.args)})"
+
+
+class Cast(Node):
+    child_fields = ('operand',)
+    value_fields = ('type_name',)
+
+    def format(self, render):
+        return f"{render(self.operand)}::{self.type_name}"
+
+
+class Paren(Node):
+    child_fields = ('inner',)
+
+    def format(self, render):
+        return f"({render(self.inner)})"
+
+
+class Tuple(Node):
+    """Parenthesised list, e.g. the right side of IN ('a', 'b')"""
+    child_fields = ('items',)
+
+    def format(self, render):
+        return f"({', '.join(render(i) for i in self.items)})"
+
+
+class Array(Node):
+    child_fields = ('items',)
+
+    def format(self, render):
+        return f"ARRAY[{', '.join(render(i) for i in self.items)}]"
+
+
+class ArraySubquery(Node):
+    """ARRAY( SELECT ... ): the subquery's rows as one array"""
+    child_fields = ('subquery',)
+
+    def format(self, render):
+        return f"ARRAY{render(self.subquery)}"
+
+
+class Not(Node):
+    child_fields = ('operand',)
+
+    def format(self, render):
+        return f"NOT {render(self.operand)}"
+
+
+class BinOp(Node):
+    """Comparison or other binary operator"""
+    child_fields = ('left', 'right')
+    value_fields = ('op',)
+
+    def format(self, render):
+        return f"{render(self.left)} {self.op} {render(self.right)}"
+
+
+class BoolOp(Node):
+    """AND / OR chain"""
+    child_fields = ('operands',)
+    value_fields = ('op',)
+
+    def format(self, render):
+        return f" {self.op} ".join(render(o) for o in self.operands)
+
+
+class NullTest(Node):
+    child_fields = ('operand',)
+    value_fields = ('negated',)
+
+    def format(self, render):
+        return f"{render(self.operand)} IS {'NOT ' if self.negated else ''}NULL"
+
+
+class In(Node):
+    """operand [NOT] IN (subquery or list)"""
+    child_fields = ('operand', 'target')
+    value_fields = ('negated',)
+
+    def format(self, render):
+        return f"{render(self.operand)} {'NOT ' if self.negated else ''}IN {render(self.target)}"
+
+
+class Quantified(Node):
+    """ANY (...) / ALL (...) on the right of a comparison"""
+    child_fields = ('inner',)
+    value_fields = ('quantifier',)
+
+    def format(self, render):
+        return f"{self.quantifier} {render(self.inner)}"
+
+
+class Exists(Node):
+    child_fields = ('subquery',)
+
+    def format(self, render):
+        return f"EXISTS {render(self.subquery)}"
+
+
+class Target(Node):
+    child_fields = ('expr',)
+    value_fields = ('alias',)
+
+    def format(self, render):
+        return render(self.expr) + (f" AS {self.alias}" if self.alias else '')
+
+
+class FromItem(Node):
+    value_fields = ('name', 'alias')
+
+    def format(self, render):
+        return '.'.join(self.name) + (f" {self.alias}" if self.alias else '')
+
+
+class Select(Node):
+    child_fields = ('targets', 'from_items', 'where')
+    value_fields = ('limit',)
+
+    def format(self, render):
+        text = "SELECT " + ', '.join(render(t) for t in self.targets)
+        if self.from_items:
+            text += " FROM " + ', '.join(render(f) for f in self.from_items)
+        if self.where is not None:
+            text += " WHERE " + render(self.where)
+        if self.limit is not None:
+            text += f" LIMIT {self.limit}"
+        return text
+
+
+def to_sql(node):
+    """Print node; untouched subtrees come out exactly as they were parsed"""
+    if node.span is None:
+        return node.format(to_sql)
+    start, end = node.span
+    if node.slots is None:
+        return node.source[start:end]
+    out = []
+    pos = start
+    for child, (child_start, child_end) in zip(node.parts(), node.slots):
+        out.append(node.source[pos:child_start])
+        out.append(to_sql(child))
+        pos = child_end
+    out.append(node.source[pos:end])
+    return ''.join(out)
+
+
+# ---------------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------------
+
+class Parser:
+    """Recursive descent parser over the tokens of one expression"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def at(self, *texts):
+        token = self.peek()
+        return token is not None and (token.keyword or token.text) in texts
+
+    def take(self, *texts):
+        token = self.peek()
+        if token is None:
+            raise PolicyExprError(f"Unexpected end of expression, expected {' or '.join(texts)}")
+        if texts and (token.keyword or token.text) not in texts:
+            raise PolicyExprError(f"Expected {' or '.join(texts)} at {token.start}, got {token.text!r}")
+        self.pos += 1
+        return token
+
+    def finish(self, node, first):
+        """Attach the source span from token index first up to the last consumed token"""
+        node.source = self.text
+        node.span = (self.tokens[first].start, self.tokens[self.pos - 1].end)
+        return node
+
+    def parse(self):
+        if not self.tokens:
+            raise PolicyExprError("Empty expression")
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            token = self.tokens[self.pos]
+            raise PolicyExprError(f"Unexpected {token.text!r} at {token.start}")
+        return node
+
+    def expr(self):
+        return self.bool_chain('OR', self.conjunction)
+
+    def conjunction(self):
+        return self.bool_chain('AND', self.negation)
+
+    def bool_chain(self, op, operand):
+        first = self.pos
+        operands = [operand()]
+        while self.at(op):
+            self.take()
+            operands.append(operand())
+        if len(operands) == 1:
+            return operands[0]
+        return self.finish(BoolOp(op=op, operands=operands), first)
+
+    def negation(self):
+        if self.at('NOT'):
+            first = self.pos
+            self.take()
+            return self.finish(Not(operand=self.negation()), first)
+        return self.predicate()
+
+    def predicate(self):
+        first = self.pos
+        left = self.additive()
+        if self.at('IS'):
+            self.take()
+            negated = self.at('NOT')
+            if negated:
+                self.take()
+            self.take('NULL')
+            return self.finish(NullTest(operand=left, negated=negated), first)
+        if self.at('IN') or (self.at('NOT') and self.peek(1) and self.peek(1).keyword == 'IN'):
+            negated = self.take().keyword == 'NOT'
+            if negated:
+                self.take('IN')
+            return self.finish(In(operand=left, target=self.paren_or_tuple(), negated=negated), first)
+        if self.peek() is not None and self.peek().kind == 'op' and self.peek().text in COMPARISON_OPS:
+            op = self.take().text
+            if self.at('ANY', 'ALL'):
+                quant_first = self.pos
+                quantifier = self.take().keyword
+                right = self.finish(Quantified(quantifier=quantifier, inner=self.paren_or_tuple()), quant_first)
+            else:
+                right = self.additive()
+            return self.finish(BinOp(op=op, left=left, right=right), first)
+        return left
+
+    def additive(self):
+        first = self.pos
+        left = self.postfix()
+        while self.peek() is not None and self.peek().kind == 'op' and self.peek().text in ARITHMETIC_OPS:
+            op = self.take().text
+            left = self.finish(BinOp(op=op, left=left, right=self.postfix()), first)
+        return left
+
+    def postfix(self):
+        first = self.pos
+        node = self.primary()
+        while self.at('::'):
+            self.take()
+            type_name = self.take().text
+            while self.at('.'):
+                self.take()
+                type_name += '.' + self.take().text
+            if self.at('['):
+                self.take()
+                self.take(']')
+                type_name += '[]'
+            node = self.finish(Cast(operand=node, type_name=type_name), first)
+        return node
+
+    def paren_or_tuple(self):
+        """( subquery ), ( expr ) or ( expr, expr, ... )"""
+        first = self.pos
+        self.take('(')
+        if self.at('SELECT'):
+            inner = self.select()
+            self.take(')')
+            return self.finish(Paren(inner=inner), first)
+        items = [self.expr()]
+        while self.at(','):
+            self.take()
+            items.append(self.expr())
+        self.take(')')
+        if len(items) == 1:
+            return self.finish(Paren(inner=items[0]), first)
+        return self.finish(Tuple(items=items), first)
+
+    def primary(self):
+        first = self.pos
+        token = self.peek()
+        if token is None:
+            raise PolicyExprError("Unexpected end of expression")
+        if token.text == '(':
+            return self.paren_or_tuple()
+        keyword = token.keyword
+        if keyword == 'EXISTS':
+            self.take()
+            subquery = self.paren_or_tuple()
+            if not isinstance(subquery, Paren) or not isinstance(subquery.inner, Select):
+                raise PolicyExprError(f"EXISTS without a subquery at {token.start}")
+            return self.finish(Exists(subquery=subquery), first)
+        if keyword == 'ARRAY':
+            self.take()
+            if self.at('('):
+                subquery = self.paren_or_tuple()
+                if not isinstance(subquery, Paren) or not isinstance(subquery.inner, Select):
+                    raise PolicyExprError(f"ARRAY( without a subquery at {token.start}")
+                return self.finish(ArraySubquery(subquery=subquery), first)
+            self.take('[')
+            items = []
+            if not self.at(']'):
+                items.append(self.expr())
+                while self.at(','):
+                    self.take()
+                    items.append(self.expr())
+            self.take(']')
+            return self.finish(Array(items=items), first)
+        if keyword in ('TRUE', 'FALSE', 'NULL') or token.kind in ('string', 'number'):
+            self.take()
+            return self.finish(Literal(text=token.text), first)
+        if token.kind in ('ident', 'qident') and keyword is None:
+            name = self.dotted_name()
+            if self.at('('):
+                self.take()
+                args = []
+                if not self.at(')'):
+                    args.append(self.expr())
+                    while self.at(','):
+                        self.take()
+                        args.append(self.expr())
+                self.take(')')
+                return self.finish(Func(name=name, args=args), first)
+            return self.finish(Name(path=name), first)
+        raise PolicyExprError(f"Unexpected {token.text!r} at {token.start}")
+
+    def dotted_name(self):
+        parts = [self.take().text]
+        while self.at('.'):
+            self.take()
+            parts.append(self.take().text)
+        return tuple(parts)
+
+    def alias(self):
+        """Optional [AS] alias after a select target or FROM item"""
+        if self.at('AS'):
+            self.take()
+            return self.take().text
+        token = self.peek()
+        if token is not None and token.kind in ('ident', 'qident') and token.keyword is None:
+            return self.take().text
+        return None
+
+    def select(self):
+        first = self.pos
+        self.take('SELECT')
+        targets = [self.target()]
+        while self.at(','):
+            self.take()
+            targets.append(self.target())
+        from_items = []
+        if self.at('FROM'):
+            self.take()
+            from_items.append(self.from_item())
+            while self.at(','):
+                self.take()
+                from_items.append(self.from_item())
+        where = None
+        if self.at('WHERE'):
+            self.take()
+            where = self.expr()
+        limit = None
+        if self.at('LIMIT'):
+            self.take()
+            limit = self.take().text
+        return self.finish(Select(targets=targets, from_items=from_items, where=where, limit=limit), first)
+
+    def target(self):
+        first = self.pos
+        expr = self.expr()
+        return self.finish(Target(expr=expr, alias=self.alias()), first)
+
+    def from_item(self):
+        first = self.pos
+        name = self.dotted_name()
+        return self.finish(FromItem(name=name, alias=self.alias()), first)
+
+
+def parse(text):
+    """Expression tree of a policy expression"""
+    try:
+        return Parser(text).parse()
+    except RecursionError:
+        raise PolicyExprError("Expression is nested too deeply") from None
+
+
+def parse_policy_expr(text):
+    """parse() for a pg_policies column: None for a missing or 'null' expression"""
+    if not text or text == 'null':
+        return None
+    return parse(text)
+
+
+# ---------------------------------------------------------------------------
+# Traversal
+# ---------------------------------------------------------------------------
+
+def walk(node):
+    """All nodes of the tree, parents first"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(list(current.parts())))
+
+
+def transform(node, rule):
+    """
+    Rebuild the tree bottom-up, replacing every node by rule(node). rule
+    returns the node itself to keep it. Each node is visited once.
+    """
+    changes = {}
+    for name in node.child_fields:
+        value = getattr(node, name)
+        if isinstance(value, list):
+            new = [transform(item, rule) for item in value]
+            if any(a is not b for a, b in zip(new, value)):
+                changes[name] = new
+        elif value is not None:
+            new = transform(value, rule)
+            if new is not value:
+                changes[name] = new
+    if changes:
+        node = node.replace(**changes)
+    return rule(node)
+
+
+def unwrap(node):
+    """node without its redundant outer parentheses"""
+    while isinstance(node, Paren):
+        node = node.inner
+    return node
+
+
+def is_name(node, *names):
+    """True for a column reference spelled as one of names (e.g. 'tenant_id', 'utm.tenant_id')"""
+    return isinstance(node, Name) and '.'.join(node.path) in names
+
+
+def is_call(node, *names):
+    return isinstance(node, Func) and node.qualified_name in names
+
+
+def string_value(node):
+    """The string of a (possibly cast) string literal, else None"""
+    node = unwrap(node)
+    if isinstance(node, Cast):
+        node = unwrap(node.operand)
+    if isinstance(node, Literal) and node.text.startswith("'"):
+        return node.value
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Rewrite rules for the tenant isolation policies
+# ---------------------------------------------------------------------------
+
+def _is_plan_check(node):
+    """(category = ( SELECT upper(tenants.tier) ...)) or the same for plan"""
+    node = unwrap(node)
+    if not (isinstance(node, BinOp) and node.op == '=' and is_name(node.left, 'category', 'plan')):
+        return False
+    select = unwrap(node.right)
+    return (isinstance(select, Select)
+            and any(item.name[-1] == 'tenants' for item in select.from_items))
+
+
+def strip_plan_checks(node):
+    """Drop the category / plan entitlement conjuncts of the Phase 4 policies"""
+    def rule(current):
+        if isinstance(current, BoolOp) and current.op == 'AND':
+            kept = [o for o in current.operands if not _is_plan_check(o)]
+            if len(kept) == len(current.operands):
+                return current
+            if len(kept) == 1:
+                return kept[0]
+            return current.replace(operands=kept)
+        return current
+    return transform(node, rule)
+
+
+def _membership_where(select):
+    """Predicates of the WHERE of a subquery over user_tenant_mapping, or None"""
+    if [item.name[-1] for item in select.from_items] != ['user_tenant_mapping'] or select.where is None:
+        return None
+    where = unwrap(select.where)
+    if isinstance(where, BoolOp) and where.op == 'AND':
+        return [unwrap(o) for o in where.operands]
+    return [where]
+
+
+def _is_current_user(predicate):
+    return (isinstance(predicate, BinOp) and predicate.op == '='
+            and is_name(predicate.left, 'user_tenant_mapping.user_id', 'user_id')
+            and is_call(predicate.right, 'auth.uid'))
+
+
+def is_tenant_membership(node):
+    """tenant_id = / IN ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE user_id = auth.uid())"""
+    node = unwrap(node)
+    if isinstance(node, In) and not node.negated:
+        operand, subquery = node.operand, node.target
+    elif isinstance(node, BinOp) and node.op == '=':
+        operand, subquery = node.left, node.right
+    else:
+        return False
+    select = unwrap(subquery)
+    if not (is_name(operand, 'tenant_id') and isinstance(select, Select) and len(select.targets) == 1):
+        return False
+    if not is_name(select.targets[0].expr, 'user_tenant_mapping.tenant_id'):
+        return False
+    predicates = _membership_where(select)
+    return predicates is not None and len(predicates) == 1 and _is_current_user(predicates[0])
+
+
+def is_super_admin_check(node):
+    """EXISTS ( SELECT 1 FROM user_tenant_mapping WHERE user_id = auth.uid() AND role = 'super_admin')"""
+    node = unwrap(node)
+    if not isinstance(node, Exists):
+        return False
+    predicates = _membership_where(unwrap(node.subquery))
+    if predicates is None or len(predicates) != 2 or not _is_current_user(predicates[0]):
+        return False
+    role = predicates[1]
+    return (isinstance(role, BinOp) and role.op == '='
+            and is_name(role.left, 'user_tenant_mapping.role', 'role')
+            and string_value(role.right) == 'super_admin')
+
+
+@lru_cache(maxsize=None)
+def tenant_exists(table):
+    """EXISTS check that the current user is a member of the row's tenant"""
+    return parse("EXISTS (SELECT 1 FROM public.user_tenant_mapping utm "
+                 f"WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id)")
+
+
+@lru_cache(maxsize=None)
+def super_admin_exists():
+    return parse("EXISTS (SELECT 1 FROM public.user_tenant_mapping utm "
+                 "WHERE utm.user_id = auth.uid() AND utm.role = 'super_admin')")
+
+
+@lru_cache(maxsize=None)
+def tenant_or_super_admin(table):
+    """The canonical Phase 5B tenant isolation predicate"""
+    return BoolOp(op='OR', operands=[tenant_exists(table), super_admin_exists()])
+
+
+def upgrade_membership_checks(node, table, parenthesize=False, super_admin=True):
+    """
+    Replace tenant membership subqueries (tenant_id = / IN (SELECT ...)) with
+    EXISTS correlated on table.tenant_id, and optionally the super_admin
+    EXISTS with its utm-aliased form. With parenthesize the parentheses
+    around a replaced check are kept, otherwise they are dropped.
+    """
+    def replacement(current):
+        if is_tenant_membership(current):
+            return tenant_exists(table)
+        if super_admin and is_super_admin_check(current):
+            return super_admin_exists()
+        return None
+
+    def rule(current):
+        if isinstance(current, Paren):
+            new = replacement(current.inner)
+            if new is not None:
+                return current.replace(inner=new) if parenthesize else new
+            return current
+        if isinstance(current, (In, BinOp, Exists)):
+            return replacement(current) or current
+        return current
+
+    return transform(node, rule)
+
+
+def auth_role_checks(node):
+    """Roles compared against auth.role() anywhere in the tree"""
+    roles = set()
+    for current in walk(node):
+        if isinstance(current, BinOp) and current.op == '=' and is_call(unwrap(current.left), 'auth.role'):
+            role = string_value(current.right)
+            if role is not None:
+                roles.add(role)
+    return roles
+
+
+def has_tenant_null_test(node, negated=False):
+    """True if the tree tests tenant_id IS NULL (or IS NOT NULL with negated)"""
+    return any(isinstance(current, NullTest) and current.negated == negated
+               and isinstance(current.operand, Name) and current.operand.name == 'tenant_id'
+               for current in walk(node))
+
+
+def mentions_literal(node, value):
+    """True if any string literal in the tree equals value"""
+    return any(isinstance(current, Literal) and current.text.startswith("'") and current.value == value
+               for current in walk(node))
+
+
+@lru_cache(maxsize=None)
+def member_feature_access(table, feature):
+    return parse(f"public.has_member_feature_access({table}.tenant_id, auth.uid(), '{feature}')")
+
+
+def and_member_access(node, table, feature):
+    """((node) AND public.has_member_feature_access(table.tenant_id, auth.uid(), feature))"""
+    return Paren(inner=BoolOp(op='AND', operands=[Paren(inner=unwrap(node)),
+                                                  member_feature_access(table, feature)]))
+
+
+# ---------------------------------------------------------------------------
+# InitPlan rewrites
+# ---------------------------------------------------------------------------
+
+# Functions of the request only (JWT claims), the same for every row
+INITPLAN_FUNCTIONS = ('auth.uid', 'auth.role', 'auth.jwt')
+
+
+def cache_member_access(node):
+    """
+    Replace per-row has_member_feature_access(t.tenant_id, auth.uid(), 'feature')
+    calls with t.tenant_id = ANY (ARRAY(SELECT public.member_feature_tenants('feature'))):
+    the tenants the current user may use the feature in are computed once per
+    statement (an InitPlan) and matched against tenant_id, which an index can
+    drive.
+    """
+    def rule(current):
+        if not (is_call(current, 'public.has_member_feature_access', 'has_member_feature_access')
+                and len(current.args) == 3):
+            return current
+        tenant, user, feature = current.args
+        if not (isinstance(unwrap(tenant), Name) and is_call(unwrap(user), 'auth.uid')
+                and string_value(feature) is not None):
+            return current
+        return parse(f"{to_sql(tenant)} = ANY (ARRAY(SELECT public.member_feature_tenants({to_sql(feature)})))")
+    return transform(node, rule)
+
+
+def _initplan_wrapped(node):
+    """Calls that already are the only target of a FROM-less SELECT: ( SELECT auth.uid())"""
+    wrapped = set()
+    for current in walk(node):
+        if (isinstance(current, Select) and not current.from_items and current.where is None
+                and len(current.targets) == 1 and is_call(unwrap(current.targets[0].expr), *INITPLAN_FUNCTIONS)):
+            wrapped.add(id(unwrap(current.targets[0].expr)))
+    return wrapped
+
+
+def initplan_auth_calls(node):
+    """Wrap auth.uid() / auth.role() / auth.jwt() in (SELECT ...), which Postgres runs once as an InitPlan"""
+    wrapped = _initplan_wrapped(node)
+
+    def rule(current):
+        if is_call(current, *INITPLAN_FUNCTIONS) and not current.args and id(current) not in wrapped:
+            return parse(f"(SELECT {current.qualified_name}())")
+        return current
+    return transform(node, rule)
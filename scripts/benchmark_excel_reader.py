@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Excel reader used by parse_ward_excel.
+
+Compares the legacy access pattern (full workbook load, then one
+iter_rows() call per candidate row) against the single-pass read-only
+reader (read_ward_sheet). Every measurement runs in a fresh subprocess so
+the peak RSS reported for one mode is not polluted by another.
+
+Usage:
+    python scripts/benchmark_excel_reader.py                  # final excels/*.xlsx
+    python scripts/benchmark_excel_reader.py result/27A.xlsx  # specific files
+"""
+
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+
+MODES = ('legacy', 'read-only')
+
+
+def read_legacy(excel_path):
+    """The pre-streaming access pattern of parse_ward_excel"""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(excel_path)
+    sheet = wb.active
+    header_row = list(sheet.iter_rows(min_row=9, max_row=9, values_only=True))[0]
+    candidate_rows = []
+    for row_idx in range(10, min(21, sheet.max_row + 1)):
+        candidate_rows.append(list(sheet.iter_rows(min_row=row_idx, max_row=row_idx, values_only=True))[0])
+    wb.close()
+    return header_row, candidate_rows
+
+
+def read_streaming(excel_path):
+    from parse_excel_election_data import read_ward_sheet
+    return read_ward_sheet(excel_path)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def run_child(mode, excel_path):
+    """Measure one (mode, file) pair inside this process and print JSON"""
+    sys.path.insert(0, SCRIPTS_DIR)
+    import openpyxl  # noqa: F401 - imported up front so it is not timed
+
+    baseline_rss = peak_rss_mb()
+    reader = read_legacy if mode == 'legacy' else read_streaming
+
+    start = time.perf_counter()
+    header_row, candidate_rows = reader(excel_path)
+    seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        'mode': mode,
+        'file': excel_path,
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'baseline_rss_mb': baseline_rss,
+        'rows': 1 + len(candidate_rows),
+    }))
+
+
+def measure(mode, excel_path):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, excel_path],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], sys.argv[3])
+        return
+
+    files = sys.argv[1:] or sorted(glob.glob(os.path.join(REPO_ROOT, 'final excels', '*.xlsx')))
+    if not files:
+        print("❌ ERROR: No .xlsx files to benchmark")
+        return
+
+    print(f"{'File':40} {'Mode':10} {'Load (s)':>10} {'Peak RSS (MB)':>14} {'Δ RSS (MB)':>11}")
+    print('-' * 89)
+
+    for excel_path in files:
+        results = {mode: measure(mode, excel_path) for mode in MODES}
+        for mode in MODES:
+            r = results[mode]
+            print(f"{os.path.basename(excel_path)[:40]:40} {mode:10} {r['seconds']:10.3f} "
+                  f"{r['peak_rss_mb']:14.1f} {r['peak_rss_mb'] - r['baseline_rss_mb']:11.1f}")
+
+        legacy, streaming = results['legacy'], results['read-only']
+        speedup = legacy['seconds'] / streaming['seconds'] if streaming['seconds'] else float('inf')
+        print(f"{'':40} {'speedup':10} {speedup:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Throughput and accuracy benchmark for the election result parsers.
+
+Runs every parser over the sources it understands:
+
+    parse_ward_excel             result/*.xlsx and synthetic scaled-up workbooks
+    extract_booth_data_from_pdf  result/*.pdf and synthetic PDFs
+    extract_booth_data_better    result/*.pdf (generate_booth_sql.py)
+
+and reports pages/sec, booths/sec, peak RSS and accuracy against a golden
+booth file. Like benchmark_excel_reader.py, every measurement runs in a fresh
+subprocess so peak memory belongs to that parser alone.
+
+Golden files live in scripts/golden/ and are matched to sources by file stem
+(27A.pdf and 27A.xlsx both use golden/ward27a_booths.json), or sit next to
+the source as <stem>.golden.json. Synthetic workbooks and PDFs come from
+generate_synthetic_results.py with the Ward 27 candidates and carry their
+own golden file. A golden file names the file its values were read from in
+"derived_from"; scoring that same file is not an independent check, so
+those accuracies are marked with * in the report.
+
+A run whose parsed booths do not carry exactly the golden file's candidates
+(a parser that stopped early, picked up a total row or found no booths at
+all) is reported as an accuracy failure and makes the benchmark exit 1, so
+throughput is never reported for output that is incomplete.
+
+Results are appended to scripts/.benchmarks/ingestion.jsonl and every run is
+compared with the previous one, flagging slowdowns and accuracy drops.
+
+Usage:
+    python scripts/benchmark_ingestion.py
+    python scripts/benchmark_ingestion.py result/27A.pdf --synthetic 500,5000
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+
+GOLDEN_DIR = os.path.join(SCRIPTS_DIR, 'golden')
+GOLDEN_FILES = {
+    '27A': os.path.join(GOLDEN_DIR, 'ward27a_booths.json'),
+}
+
+DEFAULT_RESULTS = os.path.join(SCRIPTS_DIR, '.benchmarks', 'ingestion.jsonl')
+
+PARSERS = {
+    'parse_ward_excel': ('.xlsx', '.xls', '.csv'),
+    'extract_booth_data_from_pdf': ('.pdf',),
+    'extract_booth_data_better': ('.pdf',),
+}
+
+# A run is flagged when booths/sec drops by more than this fraction
+SLOWDOWN_THRESHOLD = 0.25
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def seat_of(source):
+    """'27A.pdf' -> ('27', 'A'); anything else falls back to Ward 27-A"""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    if len(stem) >= 2 and stem[:-1].isdigit():
+        return stem[:-1], stem[-1]
+    return '27', 'A'
+
+
+def run_parser(parser_name, source, candidates=None):
+    """
+    Run one parser over one source and return (booths, pages).
+    candidates (e.g. from the golden file) replace the PDF parser's built-in list.
+    """
+    if parser_name == 'parse_ward_excel':
+        from parse_excel_election_data import parse_ward_excel
+        ward, suffix = seat_of(source)
+        return parse_ward_excel(source, suffix, ward), 1
+
+    from parallel_extraction import page_count
+    pages = page_count(source)
+
+    if parser_name == 'extract_booth_data_from_pdf':
+        from candidate_matcher import CandidateMatcher
+        from extract_complete_election_data import extract_booth_data_from_pdf
+        ward, suffix = seat_of(source)
+        matcher = CandidateMatcher(candidates) if candidates else None
+        return extract_booth_data_from_pdf(source, suffix, ward=ward, matcher=matcher), pages
+
+    if parser_name == 'extract_booth_data_better':
+        from generate_booth_sql import extract_booth_data_better, manual_booth_records
+        with tempfile.TemporaryDirectory() as tmp:
+            extract_booth_data_better(source, sql_file=os.path.join(tmp, 'sample.sql'))
+        return manual_booth_records(), pages
+
+    raise ValueError(f"Unknown parser: {parser_name}")
+
+
+def load_golden(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def golden_for(source):
+    """Golden file for a source: a sibling <stem>.golden.json or one of GOLDEN_FILES"""
+    stem, _ = os.path.splitext(source)
+    if os.path.exists(stem + '.golden.json'):
+        return stem + '.golden.json'
+    return GOLDEN_FILES.get(os.path.basename(stem))
+
+
+def score(booths, golden):
+    """Compare parsed booths against a golden file; candidate names are matched fuzzily"""
+    from candidate_matcher import CandidateMatcher
+
+    candidates = golden['candidates']
+    matcher = CandidateMatcher(candidates)
+    parsed = {}
+    for booth in booths:
+        votes = {}
+        for name, count in booth['candidate_votes'].items():
+            match = matcher.match(name)
+            if match:
+                votes[match.candidate] = count
+        parsed[str(booth['booth_number'])] = votes
+
+    found = exact = cells_ok = cells = 0
+    for booth_num, expected in golden['booths'].items():
+        cells += len(expected)
+        if booth_num not in parsed:
+            continue
+        found += 1
+        ok = sum(1 for cand, count in zip(candidates, expected) if parsed[booth_num].get(cand) == count)
+        cells_ok += ok
+        exact += ok == len(expected)
+
+    total = len(golden['booths'])
+    # Candidates per parsed booth, unmatched names (e.g. a total row) included
+    candidate_counts = sorted({len(booth['candidate_votes']) for booth in booths})
+    failures = []
+    if total and not booths:
+        failures.append("no booths parsed")
+    elif candidate_counts and candidate_counts != [len(candidates)]:
+        failures.append(f"{'/'.join(map(str, candidate_counts))} candidates per booth, "
+                        f"golden has {len(candidates)}")
+    return {
+        'golden_booths': total,
+        'booths_found': found,
+        'booths_exact': exact,
+        'booth_accuracy': exact / total if total else None,
+        'cell_accuracy': cells_ok / cells if cells else None,
+        'candidate_counts': candidate_counts,
+        'accuracy_failures': failures,
+    }
+
+
+def run_child(parser_name, source):
+    """Measure one (parser, source) pair inside this process and print JSON"""
+    sys.path.insert(0, SCRIPTS_DIR)
+    import pdfplumber  # noqa: F401 - imported up front so it is not timed
+    import openpyxl  # noqa: F401
+
+    golden_path = golden_for(source)
+    golden = load_golden(golden_path) if golden_path else None
+
+    baseline_rss = peak_rss_mb()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        booths, pages = run_parser(parser_name, source, golden['candidates'] if golden else None)
+        seconds = time.perf_counter() - start
+
+    result = {
+        'parser': parser_name,
+        'source': source,
+        'seconds': seconds,
+        'pages': pages,
+        'booths': len(booths),
+        'pages_per_sec': pages / seconds if seconds else None,
+        'booths_per_sec': len(booths) / seconds if seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'baseline_rss_mb': baseline_rss,
+    }
+
+    if golden:
+        result['golden'] = os.path.relpath(golden_path, REPO_ROOT)
+        result['golden_independent'] = golden.get('derived_from') != os.path.relpath(source, REPO_ROOT)
+        result.update(score(booths, golden))
+
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def measure(parser_name, source):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', parser_name, source],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {'parser': parser_name, 'source': source,
+                'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def load_history(results_path):
+    if not os.path.exists(results_path):
+        return []
+    with open(results_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def result_key(result):
+    return result['parser'], result['source_label']
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result, previous):
+    """Return a list of regression warnings for result against the previous run"""
+    warnings = []
+    if previous is None or 'error' in result or 'error' in previous:
+        return warnings
+
+    old_rate, new_rate = previous.get('booths_per_sec'), result.get('booths_per_sec')
+    if old_rate and new_rate and new_rate < old_rate * (1 - SLOWDOWN_THRESHOLD):
+        warnings.append(f"booths/sec {old_rate:.1f} -> {new_rate:.1f}")
+
+    for metric in ('booth_accuracy', 'cell_accuracy'):
+        old, new = previous.get(metric), result.get(metric)
+        if old is not None and new is not None and new < old:
+            warnings.append(f"{metric} {old:.1%} -> {new:.1%}")
+
+    if previous.get('booths') and result.get('booths') is not None and result['booths'] < previous['booths']:
+        warnings.append(f"booths {previous['booths']} -> {result['booths']}")
+    return warnings
+
+
+def fmt(value, spec):
+    if value is None:
+        return '-'.rjust(int(spec.split('.')[0]))
+    return format(value, spec)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark election result parsers")
+    parser.add_argument('sources', nargs='*',
+                        help="PDF / workbook files (default: result/*.pdf and result/*.xlsx)")
+    parser.add_argument('--parsers', default=','.join(PARSERS),
+                        help="comma separated subset of: " + ', '.join(PARSERS))
+    parser.add_argument('--synthetic', default='400',
+                        help="comma separated booth counts of synthetic workbooks and PDFs ('' for none)")
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help="JSONL history of benchmark runs")
+    parser.add_argument('--no-save', action='store_true', help="do not append this run to the history")
+    args = parser.parse_args()
+
+    sources = args.sources or sorted(glob.glob(os.path.join(REPO_ROOT, 'result', '*.pdf')) +
+                                     glob.glob(os.path.join(REPO_ROOT, 'result', '*.xlsx')))
+    sources = [(os.path.abspath(s), os.path.relpath(os.path.abspath(s), REPO_ROOT)) for s in sources]
+    parsers = [p.strip() for p in args.parsers.split(',') if p.strip()]
+
+    history = load_history(args.results)
+    previous = {}
+    for result in history:
+        previous[result_key(result)] = result
+
+    run = {
+        'run_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        from generate_synthetic_results import generate_seat
+
+        candidates = load_golden(GOLDEN_FILES['27A'])['candidates']
+        for size in [int(s) for s in args.synthetic.split(',') if s.strip()]:
+            out_dir = os.path.join(tmp, f'synthetic_{size}')
+            os.makedirs(out_dir)
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                paths = generate_seat(out_dir, '27', 'A', candidates, size, {'xlsx', 'pdf'}, random.Random(size))
+            for path in paths:
+                if not path.endswith('.golden.json'):
+                    sources.append((path, f'synthetic:{size}{os.path.splitext(path)[1]}'))
+
+        print(f"{'Parser':28} {'Source':24} {'Pages/s':>8} {'Booths':>7} {'Booths/s':>9} "
+              f"{'Peak MB':>8} {'Booth acc':>9} {'Cell acc':>9}")
+        print('-' * 110)
+
+        results = []
+        failed = False
+        self_scored = False
+        for parser_name in parsers:
+            for source, label in sources:
+                if not source.lower().endswith(PARSERS[parser_name]):
+                    continue
+                result = measure(parser_name, source)
+                result.update(run)
+                result['source_label'] = label
+                results.append(result)
+
+                if 'error' in result:
+                    print(f"{parser_name:28} {label[:24]:24} ❌ {result['error'][:50]}")
+                    continue
+                mark = '*' if result.get('golden_independent') is False else ''
+                print(f"{parser_name:28} {label[:24]:24} {fmt(result['pages_per_sec'], '8.1f')} "
+                      f"{result['booths']:7} {fmt(result['booths_per_sec'], '9.1f')} "
+                      f"{result['peak_rss_mb']:8.1f} {fmt(result.get('booth_accuracy'), '9.1%')} "
+                      f"{fmt(result.get('cell_accuracy'), '9.1%')}{mark}")
+                if mark:
+                    self_scored = True
+                for failure in result.get('accuracy_failures', ()):
+                    print(f"{'':28} ❌ ACCURACY: {failure}")
+                    failed = True
+                for warning in compare(result, previous.get(result_key(result))):
+                    print(f"{'':28} ⚠ REGRESSION since {previous[result_key(result)]['commit']}: {warning}")
+
+    if self_scored:
+        print("\n* scored against a golden file derived from this same source, not an independent check")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.results), exist_ok=True)
+        with open(args.results, 'a', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + '\n')
+        print(f"\nResults appended to {args.results}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Vectorized winner / margin computation for all booths of a ward.
+
+Votes are held as a candidate x booth matrix, so totals, winner, runner-up,
+margin and NOTA share for every booth come out of a handful of NumPy array
+operations instead of a dict rebuild, max() and full sort per booth.
+
+Tie-breaking matches the per-booth code it replaces: the winner is the first
+candidate (in candidate order) with the highest vote count, and NOTA never
+wins or finishes runner-up.
+
+Booths come out as booth_model.BoothResult: vote arrays in the order of a
+shared CandidateTable, winner and runner-up as candidate indexes.
+
+Run this file directly to validate the vectorized results against the
+per-booth reference on random wards and on the workbooks in result/.
+"""
+
+import os
+import sys
+
+from array import array
+
+import numpy as np
+
+from booth_model import NOTA, VOTE_TYPECODE, BoothResult, CandidateTable
+
+
+def aggregate_booths(candidate_names, votes):
+    """
+    Aggregate a ward given votes[candidate, booth].
+
+    Returns a dict of per-booth arrays:
+        totals       total votes (NOTA included)
+        winner       candidate index of the winner, -1 if nobody but NOTA stood
+        runner_up    candidate index of the runner-up, -1 if there is none
+        margin       winner votes - runner-up votes (0 without a runner-up)
+        nota_share   NOTA votes / total votes (0 for empty booths)
+    """
+    votes = np.asarray(votes, dtype=np.int64).reshape(len(candidate_names), -1)
+    num_booths = votes.shape[1]
+
+    totals = votes.sum(axis=0)
+
+    contest_idx = np.array([i for i, name in enumerate(candidate_names) if name != NOTA], dtype=np.int64)
+    nota_idx = [i for i, name in enumerate(candidate_names) if name == NOTA]
+
+    winner = np.full(num_booths, -1, dtype=np.int64)
+    runner_up = np.full(num_booths, -1, dtype=np.int64)
+    margin = np.zeros(num_booths, dtype=np.int64)
+
+    if len(contest_idx):
+        contest = votes[contest_idx]
+        booths = np.arange(num_booths)
+
+        # argmax returns the first maximum, i.e. the earliest candidate on ties
+        top = contest.argmax(axis=0)
+        winner = contest_idx[top]
+
+        if len(contest_idx) > 1:
+            masked = contest.copy()
+            masked[top, booths] = np.iinfo(np.int64).min
+            second = masked.argmax(axis=0)
+            runner_up = contest_idx[second]
+            margin = contest[top, booths] - contest[second, booths]
+
+    if nota_idx:
+        nota_votes = votes[nota_idx[0]]
+    else:
+        nota_votes = np.zeros(num_booths, dtype=np.int64)
+    nota_share = np.divide(nota_votes, totals, out=np.zeros(num_booths), where=totals > 0)
+
+    return {
+        'totals': totals,
+        'winner': winner,
+        'runner_up': runner_up,
+        'margin': margin,
+        'nota_share': nota_share,
+    }
+
+
+def iter_booth_records(booth_numbers, candidate_names, votes, skip_empty=False):
+    """
+    Yield a BoothResult per booth of a ward from votes[candidate, booth].
+    skip_empty drops booths without any votes.
+    """
+    table = CandidateTable.of(candidate_names)
+    agg = aggregate_booths(table.names, votes)
+    # One contiguous row of votes per booth, ready to copy into its array
+    booth_votes = np.ascontiguousarray(
+        np.asarray(votes, dtype=np.int64).reshape(len(table), -1).T, dtype=np.dtype(VOTE_TYPECODE))
+    totals = agg['totals'].tolist()
+    winners = agg['winner'].tolist()
+    runners_up = agg['runner_up'].tolist()
+
+    for booth_idx, booth_num in enumerate(booth_numbers):
+        if skip_empty and totals[booth_idx] <= 0:
+            continue
+
+        booth_array = array(VOTE_TYPECODE)
+        booth_array.frombytes(booth_votes[booth_idx].tobytes())
+        yield BoothResult(
+            booth_number=booth_num,
+            candidates=table,
+            votes=booth_array,
+            winner_index=winners[booth_idx],
+            runner_up_index=runners_up[booth_idx],
+        )
+
+
+def reference_booth_summary(booth_votes):
+    """The original per-booth computation: (total, winner, margin)"""
+    total_votes = sum(booth_votes.values())
+    non_nota_votes = {k: v for k, v in booth_votes.items() if k != NOTA}
+    if non_nota_votes:
+        winner = max(non_nota_votes, key=non_nota_votes.get)
+        sorted_votes = sorted(non_nota_votes.values(), reverse=True)
+        margin = sorted_votes[0] - sorted_votes[1] if len(sorted_votes) > 1 else 0
+    else:
+        winner = 'Unknown'
+        margin = 0
+    return total_votes, winner, margin
+
+
+def validate_ward(candidate_names, votes, booth_numbers=None):
+    """Compare iter_booth_records() with the per-booth reference; returns mismatches"""
+    votes = np.asarray(votes, dtype=np.int64).reshape(len(candidate_names), -1)
+    if booth_numbers is None:
+        booth_numbers = [str(i + 1) for i in range(votes.shape[1])]
+
+    mismatches = []
+    for booth in iter_booth_records(booth_numbers, candidate_names, votes):
+        expected = reference_booth_summary(booth['candidate_votes'])
+        actual = (booth['total_votes'], booth['winner'], booth['margin'])
+        if expected != actual:
+            mismatches.append((booth['booth_number'], expected, actual))
+    return mismatches
+
+
+def _validate_random(rng, wards=500):
+    failures = 0
+    for _ in range(wards):
+        num_candidates = int(rng.integers(1, 26))
+        num_booths = int(rng.integers(1, 400))
+        names = [f"Candidate {i}" for i in range(num_candidates - 1)] + [NOTA]
+        rng.shuffle(names)
+        # Small vote ranges force plenty of ties
+        votes = rng.integers(0, int(rng.choice([3, 20, 600])), size=(num_candidates, num_booths))
+        failures += len(validate_ward(names, votes))
+    return failures
+
+
+def _validate_workbooks(result_dir):
+    from parse_excel_election_data import iter_ward_excel_booths
+
+    failures = 0
+    checked = 0
+    for name in sorted(os.listdir(result_dir)):
+        if not name.lower().endswith(('.xlsx', '.xls')):
+            continue
+        for booth in iter_ward_excel_booths(os.path.join(result_dir, name), '?'):
+            checked += 1
+            expected = reference_booth_summary(booth['candidate_votes'])
+            if expected != (booth['total_votes'], booth['winner'], booth['margin']):
+                failures += 1
+    return checked, failures
+
+
+def main():
+    rng = np.random.default_rng(27)
+    failures = _validate_random(rng)
+    print(f"Random wards: {failures} mismatches")
+
+    result_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'result')
+    if os.path.isdir(result_dir):
+        checked, wb_failures = _validate_workbooks(result_dir)
+        print(f"result/ workbooks: {checked} booths checked, {wb_failures} mismatches")
+        failures += wb_failures
+
+    if failures:
+        print("❌ Vectorized aggregation disagrees with the per-booth reference")
+        sys.exit(1)
+    print("✅ Vectorized aggregation matches the per-booth reference")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory model of booth results.
+
+A booth record used to be a dict repeating every candidate's (Devanagari)
+name as a key of its candidate_votes dict, plus the winner / runner-up names:
+two dicts and a dozen entries per booth. Here a booth is a slotted dataclass
+holding its votes as a 4-byte integer array, in the order of a CandidateTable
+that every booth of the election shares, and the winner / runner-up as
+indexes into that table.
+
+Lists of booths that are kept around (a parsed ward, a worker's result)
+are BoothBatch objects instead: one flat vote array for all booths and a
+BoothResult view per booth on access.
+
+BoothResult is also a read-only Mapping with the old record keys
+(booth_number, total_votes, candidate_votes, winner, margin, runner_up,
+nota_share), so the sinks, fingerprints and journals that read
+booth['candidate_votes'] keep working and plain dict records (manual data,
+journal replays) can flow through the same pipeline. candidate_votes is
+built on access; nothing keeps it around.
+
+Run this file directly to compare the memory of dict records, BoothResult
+and BoothBatch for a large synthetic batch.
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+NOTA = 'NOTA'
+
+RECORD_KEYS = ('booth_number', 'total_votes', 'candidate_votes', 'winner', 'margin', 'runner_up', 'nota_share')
+
+# Vote arrays: signed 32-bit is plenty for a booth
+VOTE_TYPECODE = 'i'
+
+
+class CandidateTable:
+    """Interned, ordered candidate names of one election; shared by all its booths"""
+
+    __slots__ = ('names', 'positions')
+
+    _tables = {}
+
+    def __init__(self, names):
+        self.names = tuple(sys.intern(str(name)) for name in names)
+        self.positions = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def of(cls, names):
+        """The shared table for this candidate list (created on first use)"""
+        if isinstance(names, cls):
+            return names
+        key = tuple(names)
+        table = cls._tables.get(key)
+        if table is None:
+            table = cls._tables[key] = cls(key)
+        return table
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __getitem__(self, index):
+        return self.names[index]
+
+    def index(self, name):
+        return self.positions[name]
+
+    def __repr__(self):
+        return f"CandidateTable({list(self.names)!r})"
+
+    def __reduce__(self):
+        # Unpickled tables (e.g. from worker processes) are shared again
+        return (CandidateTable.of, (self.names,))
+
+
+@dataclass(slots=True, eq=False)
+class BoothResult(Mapping):
+    """
+    One booth: votes in candidate table order plus winner / runner-up indexes.
+    Totals, margin and NOTA share are derived from the votes on access.
+    """
+
+    booth_number: str
+    candidates: CandidateTable
+    votes: array
+    winner_index: int = -1
+    runner_up_index: int = -1
+
+    @property
+    def total_votes(self):
+        return sum(self.votes)
+
+    @property
+    def margin(self):
+        if self.runner_up_index < 0:
+            return 0
+        return self.votes[self.winner_index] - self.votes[self.runner_up_index]
+
+    @property
+    def nota_share(self):
+        nota = self.candidates.positions.get(NOTA)
+        total = self.total_votes
+        if nota is None or not total:
+            return 0.0
+        return self.votes[nota] / total
+
+    @property
+    def candidate_votes(self):
+        return dict(zip(self.candidates.names, self.votes))
+
+    @property
+    def winner(self):
+        return self.candidates.names[self.winner_index] if self.winner_index >= 0 else 'Unknown'
+
+    @property
+    def runner_up(self):
+        return self.candidates.names[self.runner_up_index] if self.runner_up_index >= 0 else None
+
+    def votes_for(self, name):
+        return self.votes[self.candidates.index(name)]
+
+    # Mapping protocol, with the keys of the old dict records
+
+    def __getitem__(self, key):
+        if key not in RECORD_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(RECORD_KEYS)
+
+    def __len__(self):
+        return len(RECORD_KEYS)
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in RECORD_KEYS}
+
+    @classmethod
+    def from_record(cls, record):
+        """BoothResult for a dict booth record (e.g. replayed from a journal)"""
+        if isinstance(record, cls):
+            return record
+        table = CandidateTable.of(record['candidate_votes'])
+        return cls(
+            booth_number=record['booth_number'],
+            candidates=table,
+            votes=array(VOTE_TYPECODE, record['candidate_votes'].values()),
+            winner_index=table.positions.get(record.get('winner'), -1),
+            runner_up_index=table.positions.get(record.get('runner_up'), -1),
+        )
+
+
+class BoothBatch(Sequence):
+    """
+    Columnar list of booths sharing one CandidateTable, e.g. a parsed ward.
+    Votes of all booths live in one flat array; indexing hands out
+    BoothResult views that are built on access.
+    """
+
+    __slots__ = ('candidates', 'booth_numbers', 'votes', 'winners', 'runners_up')
+
+    def __init__(self, booths=()):
+        self.candidates = None
+        self.booth_numbers = []
+        self.votes = array(VOTE_TYPECODE)
+        self.winners = array('h')
+        self.runners_up = array('h')
+        self.extend(booths)
+
+    def append(self, booth):
+        booth = BoothResult.from_record(booth)
+        if self.candidates is None:
+            self.candidates = booth.candidates
+        elif booth.candidates is not self.candidates:
+            raise ValueError(f"Booth {booth.booth_number} has a different candidate list than the batch")
+        self.booth_numbers.append(booth.booth_number)
+        self.votes.extend(booth.votes)
+        self.winners.append(booth.winner_index)
+        self.runners_up.append(booth.runner_up_index)
+
+    def extend(self, booths):
+        for booth in booths:
+            self.append(booth)
+
+    def __len__(self):
+        return len(self.booth_numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        booth_number = self.booth_numbers[index]
+        if index < 0:
+            index += len(self)
+        width = len(self.candidates)
+        return BoothResult(
+            booth_number=booth_number,
+            candidates=self.candidates,
+            votes=self.votes[index * width:(index + 1) * width],
+            winner_index=self.winners[index],
+            runner_up_index=self.runners_up[index],
+        )
+
+
+def _traced_bytes(build):
+    import tracemalloc
+
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def _compare_memory(num_booths=100_000, num_candidates=10):
+    import random
+
+    from booth_aggregation import iter_booth_records
+
+    rng = random.Random(27)
+    names = [f"उमेदवार क्रमांक {i} पूर्ण नाव" for i in range(num_candidates - 1)] + [NOTA]
+    votes = [[rng.randrange(500) for _ in range(num_booths)] for _ in names]
+    booth_numbers = [str(i + 1) for i in range(num_booths)]
+
+    def booths():
+        return iter_booth_records(booth_numbers, names, votes)
+
+    dict_bytes = _traced_bytes(lambda: [booth.to_dict() for booth in booths()])
+    result_bytes = _traced_bytes(lambda: list(booths()))
+    batch_bytes = _traced_bytes(lambda: BoothBatch(booths()))
+
+    print(f"{num_booths:,} booths x {num_candidates} candidates (booth number strings not counted)")
+    print(f"  dict records:       {dict_bytes / 1e6:8.1f} MB")
+    print(f"  list[BoothResult]:  {result_bytes / 1e6:8.1f} MB ({dict_bytes / result_bytes:.1f}x smaller)")
+    print(f"  BoothBatch:         {batch_bytes / 1e6:8.1f} MB ({dict_bytes / batch_bytes:.1f}x smaller)")
+
+
+if __name__ == '__main__':
+    _compare_memory()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Candidate name matching for election result tables.
+
+A CandidateMatcher is built once per election from its candidate list. It
+normalises names into tokens and keeps a token -> candidates index, so each
+table row is resolved with one pass over the row's own tokens instead of a
+substring scan per candidate.
+
+Normalisation makes the match tolerant of the way PDF text extraction mangles
+Devanagari: (cid:N) glyph placeholders are dropped, text is NFC-composed,
+dependent vowel signs (matras), virama, nukta and anusvara/candrabindu/visarga
+are removed, and punctuation and runs of whitespace collapse to one space.
+
+Candidates sharing a word (e.g. two 'महेश') are told apart by how many of
+their tokens the row contains. A row that scores equally for several
+candidates is reported as ambiguous instead of going to whichever candidate
+happens to be listed first.
+"""
+
+import re
+import unicodedata
+
+NOTA = 'NOTA'
+
+# How NOTA is printed in result sheets besides 'NOTA' itself
+NOTA_ALIASES = ('एकही नाही', 'नोटा')
+
+CID_RE = re.compile(r'\(cid:\d+\)')
+
+# Devanagari signs that PDF extraction frequently drops, reorders or splits:
+# candrabindu/anusvara/visarga, nukta, dependent vowel signs, virama
+DEVANAGARI_SIGNS_RE = re.compile('[\u0900-\u0903\u093a-\u093c\u093e-\u094f\u0955-\u0957\u0962\u0963]')
+
+# Anything that is not a letter or digit separates tokens
+SEPARATOR_RE = re.compile(r'[\W_]+')
+
+
+def normalize_text(text):
+    """Normalise a name or table cell for matching"""
+    text = CID_RE.sub('', str(text))
+    text = unicodedata.normalize('NFC', text)
+    text = DEVANAGARI_SIGNS_RE.sub('', text)
+    text = SEPARATOR_RE.sub(' ', text)
+    return text.strip().lower()
+
+
+def tokenize(text):
+    return normalize_text(text).split()
+
+
+class CandidateMatch:
+    """Result of matching one row: candidate is None when nothing or several candidates matched"""
+
+    __slots__ = ('candidate', 'score', 'tied')
+
+    def __init__(self, candidate, score, tied=()):
+        self.candidate = candidate
+        self.score = score
+        self.tied = tied
+
+    @property
+    def ambiguous(self):
+        return len(self.tied) > 1
+
+    def __bool__(self):
+        return self.candidate is not None
+
+
+class CandidateMatcher:
+    """Token index over one election's candidates"""
+
+    def __init__(self, candidates, nota_aliases=NOTA_ALIASES):
+        self.candidates = list(candidates)
+        self.index = {}
+        self.ambiguous_rows = []
+
+        for cand_idx, cand in enumerate(self.candidates):
+            names = [cand]
+            if cand == NOTA:
+                names.extend(nota_aliases)
+            for name in names:
+                for token in tokenize(name):
+                    # Single-letter tokens are initials or split glyphs, too weak to match on
+                    if len(token) > 1:
+                        self.index.setdefault(token, set()).add(cand_idx)
+
+    def match(self, text):
+        """Resolve the candidate named in text (a cell, a row joined into one string, ...)"""
+        scores = {}
+        for token in set(tokenize(text)):
+            for cand_idx in self.index.get(token, ()):
+                scores[cand_idx] = scores.get(cand_idx, 0) + 1
+
+        if not scores:
+            return CandidateMatch(None, 0)
+
+        best = max(scores.values())
+        tied = tuple(self.candidates[i] for i in sorted(scores) if scores[i] == best)
+        if len(tied) > 1:
+            self.ambiguous_rows.append((str(text), tied))
+            return CandidateMatch(None, best, tied)
+        return CandidateMatch(tied[0], best, tied)
+
+    def match_row(self, row, columns=None):
+        """Match a table row (list of cells), optionally only the given column slice"""
+        cells = row if columns is None else row[columns]
+        return self.match(' '.join(str(cell) for cell in cells if cell))
+
+    def report_ambiguous(self):
+        """Print the rows that matched more than one candidate equally well"""
+        if not self.ambiguous_rows:
+            return
+        print(f"\n⚠ {len(self.ambiguous_rows)} ambiguous candidate rows skipped:")
+        for text, tied in self.ambiguous_rows:
+            print(f"  {text[:60]!r} -> {' / '.join(tied)}")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Columnar (long format) export of election results for dashboards and analysis.
+
+election_results keeps one row per booth with every candidate's votes in a
+candidate_votes jsonb blob, so charting one candidate means fetching and
+reshaping every booth. ColumnarExportSink writes the same booths as one row
+per (booth, candidate):
+
+    tenant_id | ward_name | booth_number | candidate | votes
+
+as Parquet (.parquet) or Arrow IPC (.arrow / .feather), chosen by the output
+file's extension. tenant_id, ward_name and candidate are dictionary encoded,
+so scanning one candidate across thousands of booths reads a few small
+columns instead of parsing JSON per row.
+
+Rows are flushed as a record batch every rows_per_batch rows, so memory
+stays flat like the SQL sinks. The dictionaries only ever grow, which lets
+later batches of an Arrow IPC file add to them as deltas (the IPC file
+format does not allow a dictionary to be replaced). Needs pyarrow
+(pip install pyarrow).
+
+Usage (via the manifest CLI, next to the SQL or database output):
+    python scripts/ingest_elections.py --columnar parquet
+    python scripts/columnar_export.py import_election_results.parquet --candidate "धनंजय विष्णू जाधव"
+"""
+
+import argparse
+import os
+
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+COLUMNAR_EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+}
+
+COLUMNS = ('tenant_id', 'ward_name', 'booth_number', 'candidate', 'votes')
+
+DICTIONARY_COLUMNS = ('tenant_id', 'ward_name', 'candidate')
+
+
+def columnar_schema():
+    import pyarrow as pa
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('tenant_id', text),
+        ('ward_name', text),
+        ('booth_number', pa.string()),
+        ('candidate', text),
+        ('votes', pa.int32()),
+    ])
+
+
+class ColumnarExportSink:
+    """Streams booth records into a long-format Parquet / Arrow IPC file"""
+
+    def __init__(self, output_file, tenant_id, rows_per_batch=65536):
+        ext = os.path.splitext(output_file)[1].lower()
+        if ext not in COLUMNAR_EXTENSIONS:
+            raise ValueError(f"Unknown columnar format for {output_file}: "
+                             f"use one of {', '.join(COLUMNAR_EXTENSIONS)}")
+        self.output_file = output_file
+        self.file_format = COLUMNAR_EXTENSIONS[ext]
+        self.tenant_id = tenant_id
+        self.rows_per_batch = rows_per_batch
+        self.schema = None
+        self.writer = None
+        self.columns = {name: [] for name in COLUMNS}
+        # value -> dictionary index, per dictionary encoded column
+        self.dictionaries = {name: {} for name in DICTIONARY_COLUMNS}
+        self.total_booths = 0
+        self.total_votes = 0
+        self.total_rows = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        import pyarrow as pa
+        self.schema = columnar_schema()
+        if self.file_format == 'parquet':
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(self.output_file, self.schema, compression='zstd')
+        else:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self.writer = pa.ipc.new_file(self.output_file, self.schema, options=options)
+
+    def _code(self, column, value):
+        codes = self.dictionaries[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def write(self, ward_name, booth):
+        booth_number = str(booth['booth_number'])
+        tenant_code = self._code('tenant_id', self.tenant_id)
+        ward_code = self._code('ward_name', ward_name)
+        for candidate, votes in booth['candidate_votes'].items():
+            self.columns['tenant_id'].append(tenant_code)
+            self.columns['ward_name'].append(ward_code)
+            self.columns['booth_number'].append(booth_number)
+            self.columns['candidate'].append(self._code('candidate', candidate))
+            self.columns['votes'].append(votes)
+
+        self.total_booths += 1
+        self.total_votes += booth['total_votes']
+        if len(self.columns['votes']) >= self.rows_per_batch:
+            self.flush()
+
+    def flush(self):
+        import pyarrow as pa
+        if not self.columns['votes']:
+            return
+        arrays = []
+        for field in self.schema:
+            if field.name in DICTIONARY_COLUMNS:
+                # dicts keep insertion order, so codes index straight into the keys
+                dictionary = pa.array(list(self.dictionaries[field.name]), type=pa.string())
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(self.columns[field.name], type=pa.int32()), dictionary))
+            else:
+                arrays.append(pa.array(self.columns[field.name], type=field.type))
+        self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.total_rows += len(self.columns['votes'])
+        self.columns = {name: [] for name in COLUMNS}
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.flush()
+        self.writer.close()
+        self.writer = None
+
+
+def read_columnar(path, columns=None, filters=None):
+    """Read an export back as a pyarrow Table; filters use pyarrow's DNF form"""
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    if COLUMNAR_EXTENSIONS.get(os.path.splitext(path)[1].lower()) == 'parquet':
+        return pq.read_table(path, columns=columns, filters=filters)
+    table = feather.read_table(path, columns=columns)
+    if filters:
+        import pyarrow.compute as pc
+        for name, op, value in filters:
+            if op != '=':
+                raise ValueError(f"Only '=' filters are supported for Arrow IPC files, got {op}")
+            table = table.filter(pc.equal(table[name], value))
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise one candidate from a columnar election results export")
+    parser.add_argument('path', help=".parquet / .arrow file written by ColumnarExportSink")
+    parser.add_argument('--candidate', help="only this candidate (exact name)")
+    parser.add_argument('--ward', help="only this ward, e.g. 'Ward 27-A'")
+    args = parser.parse_args()
+
+    filters = []
+    if args.candidate:
+        filters.append(('candidate', '=', args.candidate))
+    if args.ward:
+        filters.append(('ward_name', '=', args.ward))
+
+    table = read_columnar(args.path, filters=filters or None)
+    totals = table.group_by(['ward_name', 'candidate']).aggregate([('votes', 'sum'), ('booth_number', 'count')])
+    # sort_by() does not take dictionary columns
+    rows = sorted(totals.to_pylist(), key=lambda r: (r['ward_name'], -r['votes_sum']))
+
+    print(f"{table.num_rows} rows in {args.path}")
+    for row in rows:
+        print(f"{row['ward_name']:14} {row['candidate'][:40]:40} "
+              f"{row['votes_sum']:>8,} votes in {row['booth_number_count']} booths")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+-- Create Election Rollup Tables
+-- Ward and candidate totals pre-computed at import time (scripts/election_rollups.py),
+-- so dashboards read one row instead of aggregating election_results booths.
+
+-- One row per ward
+CREATE TABLE IF NOT EXISTS election_ward_rollups (
+    tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+    ward_name TEXT NOT NULL,
+
+    booth_count INTEGER NOT NULL DEFAULT 0,
+    total_votes INTEGER NOT NULL DEFAULT 0,
+
+    winner TEXT,
+    winner_votes INTEGER NOT NULL DEFAULT 0,
+    runner_up TEXT,
+    runner_up_votes INTEGER NOT NULL DEFAULT 0,
+    margin INTEGER NOT NULL DEFAULT 0,
+    nota_votes INTEGER NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, ward_name)
+);
+
+-- One row per ward and candidate
+CREATE TABLE IF NOT EXISTS election_candidate_rollups (
+    tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+    ward_name TEXT NOT NULL,
+    candidate TEXT NOT NULL,
+
+    total_votes INTEGER NOT NULL DEFAULT 0,
+    vote_share NUMERIC(7, 6) NOT NULL DEFAULT 0,
+    vote_rank INTEGER NOT NULL,
+    booths_won INTEGER NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, ward_name, candidate)
+);
+
+-- Booths per ward by winning margin (margin_to is NULL for the open ended bucket)
+CREATE TABLE IF NOT EXISTS election_margin_histograms (
+    tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+    ward_name TEXT NOT NULL,
+    margin_from INTEGER NOT NULL,
+    margin_to INTEGER,
+    booth_count INTEGER NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, ward_name, margin_from)
+);
+
+-- Enable Row Level Security (RLS)
+ALTER TABLE election_ward_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE election_candidate_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE election_margin_histograms ENABLE ROW LEVEL SECURITY;
+
+-- RLS Policies: same tenant visibility as election_results; rows are written by the import script
+DROP POLICY IF EXISTS "Users can view ward rollups for their tenant" ON election_ward_rollups;
+CREATE POLICY "Users can view ward rollups for their tenant"
+    ON election_ward_rollups
+    FOR SELECT
+    USING (
+        tenant_id IN (
+            SELECT tenant_id
+            FROM user_tenant_mapping
+            WHERE user_id = auth.uid()
+        )
+    );
+
+DROP POLICY IF EXISTS "Users can view candidate rollups for their tenant" ON election_candidate_rollups;
+CREATE POLICY "Users can view candidate rollups for their tenant"
+    ON election_candidate_rollups
+    FOR SELECT
+    USING (
+        tenant_id IN (
+            SELECT tenant_id
+            FROM user_tenant_mapping
+            WHERE user_id = auth.uid()
+        )
+    );
+
+DROP POLICY IF EXISTS "Users can view margin histograms for their tenant" ON election_margin_histograms;
+CREATE POLICY "Users can view margin histograms for their tenant"
+    ON election_margin_histograms
+    FOR SELECT
+    USING (
+        tenant_id IN (
+            SELECT tenant_id
+            FROM user_tenant_mapping
+            WHERE user_id = auth.uid()
+        )
+    );
+
+-- Grant necessary permissions
+GRANT SELECT ON election_ward_rollups TO authenticated;
+GRANT SELECT ON election_candidate_rollups TO authenticated;
+GRANT SELECT ON election_margin_histograms TO authenticated;
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE 'Election rollup tables created successfully with RLS policies!';
+END $$;
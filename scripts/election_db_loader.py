@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Load election results straight into PostgreSQL instead of writing a .sql file.
+
+PostgresLoaderSink is a drop-in sink for election_pipeline.run_pipeline. Booths
+are streamed with COPY into a temporary staging table and then merged into
+election_results with one set-based statement per transaction:
+
+    WITH deleted AS (DELETE existing rows of the staged wards),
+         inserted AS (INSERT every staged row)
+
+election_results has no unique key on (tenant, ward, booth), so the merge
+replaces whole wards, exactly like the per-ward DELETEs of the generated
+SQL scripts. A ward of ward_names that produced no booths at all is most
+likely an unreadable source, so it is left in place (see empty_wards)
+unless allow_empty_wards is set, in which case its results are deleted.
+
+Transactions: with batch_size=0 (the default) the whole run is one
+transaction. Otherwise a transaction is committed every time at least
+batch_size booths are staged and a ward ends, so a ward is never split
+across transactions but a failure leaves earlier batches committed. A ward
+fed by several non-contiguous sources can still span batches; only its
+first batch deletes the old rows, later ones just insert.
+
+dry_run performs every COPY and merge and then rolls back, reporting how
+many rows would have been deleted and inserted.
+
+Usage (via the manifest CLI):
+    python scripts/ingest_elections.py --dsn postgresql://postgres@localhost/postgres --dry-run
+"""
+
+import io
+
+import psycopg2
+
+from election_sinks import COPY_COLUMNS, booth_row, copy_text_field
+from import_state import booth_fingerprint
+
+STAGING_TABLE = 'election_results_staging'
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    ward_name TEXT NOT NULL,
+    booth_number TEXT NOT NULL,
+    booth_name TEXT NOT NULL,
+    total_voters INTEGER NOT NULL,
+    total_votes_casted INTEGER NOT NULL,
+    candidate_votes JSONB NOT NULL,
+    winner TEXT,
+    margin INTEGER,
+    tenant_id UUID NOT NULL
+)
+"""
+
+COLUMN_LIST = ', '.join(COPY_COLUMNS)
+
+MERGE_SQL = f"""
+WITH deleted AS (
+    DELETE FROM election_results e
+    USING (SELECT DISTINCT ward_name, tenant_id FROM {STAGING_TABLE}
+           WHERE ward_name <> ALL(%(merged_wards)s)) s
+    WHERE e.ward_name = s.ward_name AND e.tenant_id = s.tenant_id
+    RETURNING 1
+), inserted AS (
+    INSERT INTO election_results ({COLUMN_LIST})
+    SELECT {COLUMN_LIST} FROM {STAGING_TABLE}
+    RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM deleted), (SELECT COUNT(*) FROM inserted)
+"""
+
+
+class PostgresLoaderSink:
+    """Streams booth records into election_results over a psycopg2 connection"""
+
+    def __init__(self, dsn, tenant_id, ward_names=None, batch_size=0, dry_run=False, allow_empty_wards=False):
+        self.dsn = dsn
+        self.tenant_id = tenant_id
+        # As with the SQL sinks: when ward_names is given only those wards are
+        # replaced, otherwise every result for the tenant is.
+        self.ward_names = ward_names
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.allow_empty_wards = allow_empty_wards
+        self.conn = None
+        self.buffer = io.StringIO()
+        self.buffered = 0
+        self.current_ward = None
+        self.seen_wards = []
+        # Wards already merged by an earlier batch: their old rows are gone
+        self.merged_wards = []
+        self.state = {}
+        self.total_booths = 0
+        self.total_votes = 0
+        self.deleted_rows = 0
+        self.inserted_rows = 0
+        self.transactions = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self.conn is not None:
+            self.conn.rollback()
+            self.conn.close()
+            self.conn = None
+
+    def open(self):
+        self.conn = psycopg2.connect(self.dsn)
+        with self.conn.cursor() as cur:
+            cur.execute(CREATE_STAGING_SQL)
+
+    def write(self, ward_name, booth):
+        if ward_name != self.current_ward:
+            # Commit at ward boundaries only, so a ward is replaced atomically
+            if self.batch_size and self.buffered >= self.batch_size:
+                self._merge()
+            self.current_ward = ward_name
+            if ward_name not in self.seen_wards:
+                self.seen_wards.append(ward_name)
+                self.state[ward_name] = {}
+
+        row = booth_row(ward_name, booth, self.tenant_id)
+        self.buffer.write('\t'.join(copy_text_field(v) for v in row) + '\n')
+        self.buffered += 1
+        self.state[ward_name][str(booth['booth_number'])] = booth_fingerprint(ward_name, booth)
+
+        self.total_booths += 1
+        self.total_votes += booth['total_votes']
+
+    @property
+    def empty_wards(self):
+        """Wards of ward_names that produced no booths and were left untouched"""
+        if self.allow_empty_wards:
+            return []
+        return [w for w in self.ward_names or () if w not in self.seen_wards]
+
+    def _delete_unseen_wards(self, cur):
+        """With allow_empty_wards, wards being replaced that produced no booths are emptied too"""
+        if self.ward_names:
+            unseen = [w for w in self.ward_names if w not in self.seen_wards]
+            if unseen and self.allow_empty_wards:
+                print(f"⚠ No booths parsed for {', '.join(unseen)}, deleting their results")
+                cur.execute("DELETE FROM election_results WHERE tenant_id = %s AND ward_name = ANY(%s)",
+                            (self.tenant_id, unseen))
+                self.deleted_rows += cur.rowcount
+        else:
+            cur.execute("DELETE FROM election_results WHERE tenant_id = %s AND NOT (ward_name = ANY(%s))",
+                        (self.tenant_id, self.seen_wards))
+            self.deleted_rows += cur.rowcount
+
+    def _merge(self, final=False):
+        """COPY the buffered booths into staging, merge them and end the transaction"""
+        with self.conn.cursor() as cur:
+            self.buffer.seek(0)
+            cur.copy_expert(f"COPY {STAGING_TABLE} ({COLUMN_LIST}) FROM STDIN", self.buffer)
+
+            cur.execute(MERGE_SQL, {'merged_wards': self.merged_wards})
+            deleted, inserted = cur.fetchone()
+            self.deleted_rows += deleted
+            self.inserted_rows += inserted
+
+            if final:
+                self._delete_unseen_wards(cur)
+            cur.execute(f"TRUNCATE {STAGING_TABLE}")
+
+        if self.dry_run:
+            self.conn.rollback()
+            # The staging table was created in the rolled back transaction
+            with self.conn.cursor() as cur:
+                cur.execute(CREATE_STAGING_SQL)
+        else:
+            self.conn.commit()
+        self.transactions += 1
+
+        self.merged_wards = list(self.seen_wards)
+        self.buffer = io.StringIO()
+        self.buffered = 0
+
+    def close(self):
+        if self.conn is None:
+            return
+        try:
+            self._merge(final=True)
+        finally:
+            self.conn.close()
+            self.conn = None
+
+    def updated_state(self, last_state=None):
+        """Import state (see import_state.py) once this load has been committed"""
+        if self.ward_names:
+            state = {w: b for w, b in (last_state or {}).items()
+                     if w not in self.ward_names or w in self.empty_wards}
+        else:
+            state = {}
+        state.update(self.state)
+        return state
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Streaming pipeline for election results ingestion.
+
+    source (PDF / Excel) -> page / row -> booth record -> sink
+
+Sources are generators: a ward source is a (ward_name, booths) pair where
+booths lazily yields booth records as pages or rows are parsed. Sinks (see
+election_sinks.py) write each record as soon as it arrives, so memory stays
+flat regardless of how many wards or booths are in a batch.
+"""
+
+
+def iter_ward_records(ward_sources):
+    """Flatten (ward_name, booths) sources into a stream of (ward_name, booth)"""
+    for ward_name, booths in ward_sources:
+        for booth in booths:
+            yield ward_name, booth
+
+
+def run_pipeline(ward_sources, sink):
+    """Drain every ward source into the sink and return the closed sink"""
+    with sink:
+        for ward_name, booth in iter_ward_records(ward_sources):
+            sink.write(ward_name, booth)
+    return sink
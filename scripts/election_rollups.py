@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Ward and candidate rollups computed in the same pass as the booth import.
+
+Dashboards otherwise aggregate booth rows (and their candidate_votes jsonb)
+on every read. RollupSink sits next to the booth sink (via TeeSink), keeps
+running totals per ward while the booths stream past, and at the end writes
+SQL that replaces the tenant's rows in three tables
+(see create_election_rollup_tables.sql):
+
+    election_ward_rollups        one row per ward: booths, votes, winner,
+                                 runner-up, margin, NOTA votes
+    election_candidate_rollups   one row per ward and candidate: votes,
+                                 vote share, rank, booths won
+    election_margin_histograms   booths per ward and booth-margin bucket
+
+Winners follow booth_aggregation: the first candidate with the most votes
+wins and NOTA never wins.
+
+Usage (via the manifest CLI):
+    python scripts/ingest_elections.py --rollups
+    python scripts/ingest_elections.py --rollups --dsn postgresql://postgres@localhost/postgres
+
+With a dsn the rollups are written straight to the database (after the
+booths, in their own transaction) instead of to a file.
+"""
+
+from booth_aggregation import NOTA, aggregate_booths
+from election_sinks import sql_literal
+
+# Lower bounds of the booth margin buckets; the last bucket is open ended
+MARGIN_BUCKETS = (0, 10, 25, 50, 100, 250, 500)
+
+ROLLUP_TABLES = ('election_ward_rollups', 'election_candidate_rollups', 'election_margin_histograms')
+
+
+def margin_bucket(margin, buckets=MARGIN_BUCKETS):
+    """Index of the bucket holding margin"""
+    index = 0
+    for i, lower in enumerate(buckets):
+        if margin >= lower:
+            index = i
+    return index
+
+
+class WardRollup:
+    """Running totals of one ward"""
+
+    def __init__(self, ward_name, num_buckets):
+        self.ward_name = ward_name
+        self.booths = 0
+        self.total_votes = 0
+        # Candidates in the order they first appear, like candidate_votes
+        self.candidate_votes = {}
+        self.booths_won = {}
+        self.histogram = [0] * num_buckets
+
+    def add(self, booth, buckets):
+        self.booths += 1
+        self.total_votes += booth['total_votes']
+        for candidate, votes in booth['candidate_votes'].items():
+            self.candidate_votes[candidate] = self.candidate_votes.get(candidate, 0) + votes
+        if booth['winner'] in booth['candidate_votes']:
+            self.booths_won[booth['winner']] = self.booths_won.get(booth['winner'], 0) + 1
+            self.histogram[margin_bucket(booth['margin'], buckets)] += 1
+
+    def result(self):
+        """Ward winner, runner-up and margin over the summed votes"""
+        names = list(self.candidate_votes)
+        summary = aggregate_booths(names, [[v] for v in self.candidate_votes.values()])
+        winner, runner_up = summary['winner'][0], summary['runner_up'][0]
+        return {
+            'winner': names[winner] if winner >= 0 else None,
+            'winner_votes': self.candidate_votes[names[winner]] if winner >= 0 else 0,
+            'runner_up': names[runner_up] if runner_up >= 0 else None,
+            'runner_up_votes': self.candidate_votes[names[runner_up]] if runner_up >= 0 else 0,
+            'margin': int(summary['margin'][0]),
+            'nota_votes': self.candidate_votes.get(NOTA, 0),
+        }
+
+    def candidate_rows(self):
+        """(candidate, votes, share, rank, booths_won) with NOTA ranked last"""
+        ranked = sorted(self.candidate_votes.items(), key=lambda kv: (kv[0] == NOTA, -kv[1]))
+        for rank, (candidate, votes) in enumerate(ranked, 1):
+            share = votes / self.total_votes if self.total_votes else 0
+            yield candidate, votes, share, rank, self.booths_won.get(candidate, 0)
+
+
+class RollupSink:
+    """
+    Accumulates ward / candidate rollups from booth records and writes them
+    as SQL on close. Like the SQL sinks, only ward_names are replaced when
+    given, otherwise every rollup of the tenant is. A ward of ward_names
+    that produced no booths keeps its existing rollups, unless
+    allow_empty_wards is set (as for PostgresLoaderSink, which then deletes
+    its results), in which case its rollups are deleted too.
+    """
+
+    def __init__(self, output_file, tenant_id, ward_names=None, buckets=MARGIN_BUCKETS,
+                 dsn=None, dry_run=False, allow_empty_wards=False):
+        self.output_file = output_file
+        self.tenant_id = tenant_id
+        self.ward_names = ward_names
+        self.buckets = buckets
+        self.dsn = dsn
+        self.dry_run = dry_run
+        self.allow_empty_wards = allow_empty_wards
+        self.wards = {}
+        self.total_booths = 0
+        self.total_votes = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def open(self):
+        self.wards = {}
+
+    def write(self, ward_name, booth):
+        ward = self.wards.get(ward_name)
+        if ward is None:
+            ward = self.wards[ward_name] = WardRollup(ward_name, len(self.buckets))
+        ward.add(booth, self.buckets)
+        self.total_booths += 1
+        self.total_votes += booth['total_votes']
+
+    def _where(self):
+        where = f"tenant_id = '{self.tenant_id}'"
+        if self.ward_names:
+            wards = [w for w in self.ward_names if w in self.wards or self.allow_empty_wards]
+            if not wards:
+                return None
+            where += f" AND ward_name IN ({', '.join(sql_literal(w) for w in wards)})"
+        return where
+
+    def statements(self):
+        """SQL that replaces the rollups of the imported wards"""
+        lines = []
+        where = self._where()
+        if where is not None:
+            for table in ROLLUP_TABLES:
+                lines.append(f"DELETE FROM {table} WHERE {where};")
+            lines.append("")
+
+        for ward in self.wards.values():
+            result = ward.result()
+            ward_name = sql_literal(ward.ward_name)
+            lines.append(f"-- {ward.ward_name}")
+            lines.append(
+                "INSERT INTO election_ward_rollups (tenant_id, ward_name, booth_count, total_votes, "
+                "winner, winner_votes, runner_up, runner_up_votes, margin, nota_votes) VALUES "
+                f"('{self.tenant_id}', {ward_name}, {ward.booths}, {ward.total_votes}, "
+                f"{sql_literal(result['winner'])}, {result['winner_votes']}, "
+                f"{sql_literal(result['runner_up'])}, {result['runner_up_votes']}, "
+                f"{result['margin']}, {result['nota_votes']});"
+            )
+
+            rows = [f"    ('{self.tenant_id}', {ward_name}, {sql_literal(candidate)}, {votes}, "
+                    f"{share:.6f}, {rank}, {won})"
+                    for candidate, votes, share, rank, won in ward.candidate_rows()]
+            if rows:
+                lines.append("INSERT INTO election_candidate_rollups (tenant_id, ward_name, candidate, "
+                             "total_votes, vote_share, vote_rank, booths_won) VALUES")
+                lines.append(',\n'.join(rows) + ';')
+
+            rows = []
+            for i, lower in enumerate(self.buckets):
+                upper = self.buckets[i + 1] - 1 if i + 1 < len(self.buckets) else 'NULL'
+                rows.append(f"    ('{self.tenant_id}', {ward_name}, {lower}, {upper}, {ward.histogram[i]})")
+            lines.append("INSERT INTO election_margin_histograms (tenant_id, ward_name, margin_from, "
+                         "margin_to, booth_count) VALUES")
+            lines.append(',\n'.join(rows) + ';')
+            lines.append("")
+        return '\n'.join(lines)
+
+    def sql(self):
+        """The rollup script, as one transaction"""
+        return '\n'.join([
+            "-- ====================================================================",
+            "-- Election result rollups",
+            f"-- Tenant: {self.tenant_id}",
+            "-- ====================================================================",
+            "",
+            "BEGIN;",
+            "",
+            self.statements(),
+            "COMMIT;",
+        ]) + '\n'
+
+    def close(self):
+        if self.dsn:
+            import psycopg2
+            conn = psycopg2.connect(self.dsn)
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(self.statements())
+                if self.dry_run:
+                    conn.rollback()
+                else:
+                    conn.commit()
+            finally:
+                conn.close()
+        elif self.output_file:
+            with open(self.output_file, 'w', encoding='utf-8') as f:
+                f.write(self.sql())
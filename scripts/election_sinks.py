@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Output sinks for the election results ingestion pipeline.
+
+A sink receives booth records one at a time via write(ward_name, booth) and
+writes them out immediately, so nothing has to hold a whole ward (or a whole
+batch of wards) in memory before the first booth reaches the output file.
+
+Four SQL layouts are available (see make_sql_sink):
+    insert    one INSERT statement per booth (pasteable into the SQL editor)
+    values    multi-row INSERT ... VALUES statements of batch_size booths
+    copy      COPY election_results ... FROM STDIN blocks in text format
+    copy-csv  the same in CSV format
+The COPY layouts must be run with psql (psql -f file.sql).
+
+Every sink also has an incremental mode (previous_state, see import_state.py):
+booths whose fingerprint matches the last import are skipped, and only the
+changed or removed booths of each ward are deleted and re-inserted.
+"""
+
+import csv
+import io
+import json
+
+from import_state import booth_fingerprint
+
+SINK_FORMATS = ('insert', 'values', 'copy', 'copy-csv')
+
+# Columns written by the batched sinks; created_at falls back to its default
+COPY_COLUMNS = (
+    'ward_name', 'booth_number', 'booth_name',
+    'total_voters', 'total_votes_casted', 'candidate_votes',
+    'winner', 'margin', 'tenant_id',
+)
+
+
+def sql_literal(value):
+    """Quote a value as a SQL string literal"""
+    if value is None:
+        return 'NULL'
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def copy_text_field(value):
+    """Escape a value for COPY ... FROM STDIN text format"""
+    if value is None:
+        return '\\N'
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+
+def booth_row(ward_name, booth, tenant_id):
+    """Return the election_results column values for a booth, in COPY_COLUMNS order"""
+    return (
+        ward_name,
+        booth['booth_number'],
+        f"मतदान केंद्र {booth['booth_number']}",
+        0,
+        booth['total_votes'],
+        json.dumps(booth['candidate_votes'], ensure_ascii=False),
+        booth['winner'],
+        booth['margin'],
+        tenant_id,
+    )
+
+
+class SqlFileSink:
+    """
+    Base class for sinks that write an election_results import script.
+
+    Ward banners are written when the first booth of a ward arrives and the
+    ward summary (booth count, total votes) is written after its last booth,
+    because a streaming sink does not know those numbers up front.
+    Subclasses implement write_booth() and, if they buffer, flush().
+
+    With ward_names, each ward is deleted just before its first booth, so a
+    ward that produces no booths (an unreadable source) keeps its existing
+    results; those wards are listed in empty_wards.
+
+    With previous_state ({ward_name: {booth_number: fingerprint}} of the last
+    import) the sink runs incrementally: nothing is deleted up front, unchanged
+    booths are dropped, and changed booths are held until the end of their
+    ward so that one DELETE for them can precede their inserts. Booths that
+    are gone are only deleted on close, once every source is done, because a
+    ward may continue in a later source. Wards missing from previous_state
+    are replaced as a whole. Fingerprints of every booth seen end up in
+    self.state either way.
+    """
+
+    def __init__(self, output_file, tenant_id, title, source_label, ward_names=None,
+                 previous_state=None):
+        self.output_file = output_file
+        self.tenant_id = tenant_id
+        self.title = title
+        self.source_label = source_label
+        # When ward_names is given only those wards are replaced,
+        # otherwise every result for the tenant is deleted first.
+        self.ward_names = ward_names
+        self.previous_state = previous_state
+        self.state = {}
+        self.f = None
+        self.current_ward = None
+        self.ward_booths = 0
+        self.ward_votes = 0
+        self.total_booths = 0
+        self.total_votes = 0
+        # Incremental mode: booths of the current ward waiting for their DELETE
+        self.changed_booths = []
+        self.unchanged_booths = 0
+        self.deleted_booths = 0
+
+    @property
+    def incremental(self):
+        return self.previous_state is not None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        self.f = open(self.output_file, 'w', encoding='utf-8')
+        f = self.f
+        f.write("-- ====================================================================\n")
+        f.write(f"-- {self.title}\n")
+        f.write(f"-- Tenant: {self.tenant_id}\n")
+        f.write(f"-- Generated from {self.source_label}\n")
+        f.write("-- ====================================================================\n\n")
+
+        if self.incremental:
+            f.write("-- Incremental import: only booths that changed since the last import\n\n")
+        elif self.ward_names:
+            f.write("-- Each ward's existing data is deleted right before its booths\n\n")
+        else:
+            f.write("-- Delete all existing data for this tenant first\n")
+            f.write(f"DELETE FROM election_results WHERE tenant_id = '{self.tenant_id}';\n\n")
+
+    def _start_ward(self, ward_name):
+        self._end_ward()
+        self.current_ward = ward_name
+        self.ward_booths = 0
+        self.ward_votes = 0
+
+        self.f.write(f"\n-- {'='*60}\n")
+        self.f.write(f"-- {ward_name}\n")
+        self.f.write(f"-- {'='*60}\n\n")
+
+        if ward_name in self.state:
+            # Ward continues from an earlier source in this run, already cleared
+            return
+        self.state[ward_name] = {}
+        if self.incremental and ward_name not in self.previous_state:
+            self.f.write("-- No previous import of this ward, replacing it\n")
+        elif self.incremental or not self.ward_names:
+            return
+        self.f.write(f"DELETE FROM election_results WHERE ward_name = {sql_literal(ward_name)} "
+                     f"AND tenant_id = '{self.tenant_id}';\n\n")
+
+    def _end_ward(self):
+        if self.current_ward is None:
+            return
+        if self.incremental and self.current_ward in self.previous_state:
+            self._write_ward_changes()
+        self.flush()
+        self.f.write(f"-- {self.current_ward}: {self.ward_booths} booths, {self.ward_votes:,} total votes\n")
+        self.current_ward = None
+
+    def _write_ward_changes(self):
+        """Delete the changed booths of the current ward, then insert them again"""
+        ward_name = self.current_ward
+        if not self.changed_booths:
+            return
+
+        booths = ', '.join(sql_literal(booth['booth_number']) for booth in self.changed_booths)
+        self.f.write(f"-- {len(self.changed_booths)} changed\n")
+        self.f.write(f"DELETE FROM election_results WHERE ward_name = {sql_literal(ward_name)} "
+                     f"AND tenant_id = '{self.tenant_id}' AND booth_number IN ({booths});\n\n")
+
+        for booth in self.changed_booths:
+            self.write_booth(ward_name, booth)
+        self.changed_booths = []
+
+    def _write_removed_booths(self):
+        """Delete the booths of the last import that no source of this run produced"""
+        for ward_name, seen in self.state.items():
+            if ward_name not in self.previous_state:
+                continue
+            removed = [b for b in self.previous_state[ward_name] if b not in seen]
+            if not removed:
+                continue
+            booths = ', '.join(sql_literal(b) for b in removed)
+            self.f.write(f"\n-- {ward_name}: {len(removed)} removed\n")
+            self.f.write(f"DELETE FROM election_results WHERE ward_name = {sql_literal(ward_name)} "
+                         f"AND tenant_id = '{self.tenant_id}' AND booth_number IN ({booths});\n")
+            self.deleted_booths += len(removed)
+
+    def write(self, ward_name, booth):
+        if ward_name != self.current_ward:
+            self._start_ward(ward_name)
+
+        fingerprint = booth_fingerprint(ward_name, booth)
+        self.state[ward_name][str(booth['booth_number'])] = fingerprint
+
+        if self.incremental and ward_name in self.previous_state:
+            if self.previous_state[ward_name].get(str(booth['booth_number'])) == fingerprint:
+                self.unchanged_booths += 1
+                return
+            self.changed_booths.append(booth)
+        else:
+            self.write_booth(ward_name, booth)
+
+        self.ward_booths += 1
+        self.ward_votes += booth['total_votes']
+        self.total_booths += 1
+        self.total_votes += booth['total_votes']
+
+    @property
+    def empty_wards(self):
+        """Wards of ward_names that produced no booths and were left untouched"""
+        return [w for w in self.ward_names or () if w not in self.state]
+
+    def write_booth(self, ward_name, booth):
+        raise NotImplementedError
+
+    def flush(self):
+        """Write out any buffered booths"""
+
+    def updated_state(self, last_state=None):
+        """Import state once this script has run, given the state of the last import"""
+        if self.incremental:
+            state = dict(self.previous_state)
+        elif self.ward_names:
+            state = {w: b for w, b in (last_state or {}).items() if w not in self.state}
+        else:
+            state = {}
+        state.update(self.state)
+        return state
+
+    def close(self):
+        if self.f is None:
+            return
+        self._end_ward()
+        if self.incremental:
+            self._write_removed_booths()
+
+        f = self.f
+        for ward_name in self.empty_wards:
+            f.write(f"\n-- {ward_name}: no booths parsed, existing results left in place\n")
+        f.write(f"\n\n-- ====================================================================\n")
+        f.write(f"-- Verification Query\n")
+        f.write(f"-- ====================================================================\n")
+        f.write(f"SELECT \n")
+        f.write(f"    ward_name, \n")
+        f.write(f"    COUNT(*) as booth_count, \n")
+        f.write(f"    SUM(total_votes_casted) as total_votes\n")
+        f.write(f"FROM election_results\n")
+        f.write(f"WHERE tenant_id = '{self.tenant_id}'\n")
+        f.write(f"GROUP BY ward_name\n")
+        f.write(f"ORDER BY ward_name;\n")
+        f.close()
+        self.f = None
+
+
+class SqlInsertSink(SqlFileSink):
+    """Writes one INSERT INTO election_results statement per booth"""
+
+    def write_booth(self, ward_name, booth):
+        f = self.f
+        votes_json = json.dumps(booth['candidate_votes'], ensure_ascii=False)
+
+        f.write(f"-- Booth {booth['booth_number']}: {booth['total_votes']} votes, Winner: {booth['winner']}\n")
+        f.write(f"INSERT INTO election_results (\n")
+        f.write(f"    ward_name, booth_number, booth_name,\n")
+        f.write(f"    total_voters, total_votes_casted, candidate_votes,\n")
+        f.write(f"    winner, margin, tenant_id, created_at\n")
+        f.write(f") VALUES (\n")
+        f.write(f"    {sql_literal(ward_name)},\n")
+        f.write(f"    {sql_literal(booth['booth_number'])},\n")
+        f.write(f"    {sql_literal('मतदान केंद्र ' + str(booth['booth_number']))},\n")
+        f.write(f"    0,\n")
+        f.write(f"    {booth['total_votes']},\n")
+        f.write(f"    {sql_literal(votes_json)}::jsonb,\n")
+        f.write(f"    {sql_literal(booth['winner'])},\n")
+        f.write(f"    {booth['margin']},\n")
+        f.write(f"    '{self.tenant_id}',\n")
+        f.write(f"    NOW()\n")
+        f.write(f");\n\n")
+
+
+class SqlValuesSink(SqlFileSink):
+    """Writes multi-row INSERT ... VALUES statements of up to batch_size booths"""
+
+    def __init__(self, *args, batch_size=500, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_size = batch_size
+        self.rows = []
+
+    def write_booth(self, ward_name, booth):
+        self.rows.append(booth_row(ward_name, booth, self.tenant_id))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        f = self.f
+        f.write(f"INSERT INTO election_results ({', '.join(COPY_COLUMNS)}) VALUES\n")
+        values = []
+        for ward_name, booth_number, booth_name, voters, votes, votes_json, winner, margin, tenant_id in self.rows:
+            values.append(f"    ({sql_literal(ward_name)}, {sql_literal(booth_number)}, {sql_literal(booth_name)}, "
+                          f"{voters}, {votes}, {sql_literal(votes_json)}::jsonb, "
+                          f"{sql_literal(winner)}, {margin}, '{tenant_id}')")
+        f.write(',\n'.join(values))
+        f.write(";\n\n")
+        self.rows = []
+
+
+class CopySink(SqlFileSink):
+    """
+    Writes one COPY election_results ... FROM STDIN block per ward.
+    csv_format=True uses FORMAT csv instead of the default text format.
+    """
+
+    def __init__(self, *args, csv_format=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.csv_format = csv_format
+        self.in_copy = False
+
+    def write_booth(self, ward_name, booth):
+        f = self.f
+        if not self.in_copy:
+            options = " WITH (FORMAT csv)" if self.csv_format else ""
+            f.write(f"COPY election_results ({', '.join(COPY_COLUMNS)}) FROM STDIN{options};\n")
+            self.in_copy = True
+
+        row = booth_row(ward_name, booth, self.tenant_id)
+        if self.csv_format:
+            buf = io.StringIO()
+            csv.writer(buf, lineterminator='\n').writerow(row)
+            f.write(buf.getvalue())
+        else:
+            f.write('\t'.join(copy_text_field(v) for v in row) + '\n')
+
+    def flush(self):
+        if self.in_copy:
+            self.f.write("\\.\n\n")
+            self.in_copy = False
+
+
+def make_sql_sink(sink_format, output_file, tenant_id, title, source_label,
+                  ward_names=None, batch_size=500, previous_state=None):
+    """
+    Build the SQL sink for one of SINK_FORMATS.
+    Pass previous_state to only write the booths that changed since then.
+    """
+    args = (output_file, tenant_id, title, source_label)
+    kwargs = {'ward_names': ward_names, 'previous_state': previous_state}
+    if sink_format == 'insert':
+        return SqlInsertSink(*args, **kwargs)
+    if sink_format == 'values':
+        return SqlValuesSink(*args, batch_size=batch_size, **kwargs)
+    if sink_format in ('copy', 'copy-csv'):
+        return CopySink(*args, csv_format=sink_format == 'copy-csv', **kwargs)
+    raise ValueError(f"Unknown SQL sink format: {sink_format}")
+
+
+class TeeSink:
+    """
+    Writes every booth to several sinks at once.
+    Attributes such as total_booths or updated_state() come from the first sink.
+    """
+
+    def __init__(self, primary, *others):
+        self.sinks = (primary,) + others
+
+    def __getattr__(self, name):
+        return getattr(self.sinks[0], name)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Every sink gets to clean up even if an earlier one fails
+        error = None
+        for sink in self.sinks:
+            try:
+                sink.__exit__(exc_type, exc, tb)
+            except Exception as e:
+                error = error or e
+        if error is not None and exc_type is None:
+            raise error
+
+    def open(self):
+        for sink in self.sinks:
+            sink.open()
+
+    def write(self, ward_name, booth):
+        for sink in self.sinks:
+            sink.write(ward_name, booth)
@@ -1,28 +1,36 @@
+import os
+
 import pdfplumber
-import json
 
-def extract_complete_booth_data(pdf_path):
-    """Extract all booth-by-booth election data from PDF"""
+from candidate_matcher import CandidateMatcher
+from election_pipeline import run_pipeline
+from election_sinks import SqlInsertSink
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), 'result')
+
+# Candidate names in order
+CANDIDATES = [
+    "अंबेदकर (कांबळे) दिलीप शंकर",
+    "महेश (उर्फ) अमर विलास आवळे",
+    "धनंजय विष्णू जाधव",
+    "भामरे रविराज बाळासाहेब",
+    "विर नंदू काळूराम",
+    "वैभवी संजय शिंदे",
+    "सुरज सोमनाथ सोनवणे",
+    "महेश बलभीम सकट",
+    "नेटके गुलाब गंगाराम",
+    "NOTA"
+]
+
+def iter_page_candidate_votes(pdf_path, candidates):
+    """Yield {candidate: [votes per booth]} for each page of the PDF"""
+    matcher = CandidateMatcher(candidates)
     pdf = pdfplumber.open(pdf_path)
     
-    # Candidate names in order
-    candidates = [
-        "अंबेदकर (कांबळे) दिलीप शंकर",
-        "महेश (उर्फ) अमर विलास आवळे",
-        "धनंजय विष्णू जाधव",
-        "भामरे रविराज बाळासाहेब",
-        "विर नंदू काळूराम",
-        "वैभवी संजय शिंदे",
-        "सुरज सोमनाथ सोनवणे",
-        "महेश बलभीम सकट",
-        "नेटके गुलाब गंगाराम",
-        "NOTA"
-    ]
-    
-    all_booths = {}
-    
     for page_num, page in enumerate(pdf.pages):
         print(f"\n=== Processing Page {page_num + 1} ===")
+        page_votes = {}
         
         # Extract tables
         tables = page.extract_tables()
@@ -37,11 +45,7 @@ def extract_complete_booth_data(pdf_path):
                     # Find candidate rows (they start with "027-अ")
                     if row[0] and '027-अ' in str(row[0]):
                         # Get candidate name
-                        candidate_name = None
-                        for cand in candidates:
-                            if cand in str(row):
-                                candidate_name = cand
-                                break
+                        candidate_name = matcher.match_row(row).candidate
                         
                         if candidate_name:
                             # Extract vote counts (skip first 2 columns which are ward and candidate info)
@@ -58,55 +62,46 @@ def extract_complete_booth_data(pdf_path):
                                 print(f"  {candidate_name[:30]}...: {len(votes)} booths, votes = {votes[:5]}...")
                                 
                                 # Store votes by candidate
-                                if candidate_name not in all_booths:
-                                    all_booths[candidate_name] = []
-                                all_booths[candidate_name].extend(votes)
+                                if candidate_name not in page_votes:
+                                    page_votes[candidate_name] = []
+                                page_votes[candidate_name].extend(votes)
+
+        yield page_num + 1, page_votes
     
     pdf.close()
-    return all_booths, candidates
+    matcher.report_ambiguous()
 
-# Extract data
-pdf_path = '/Users/shreyasjadhav/Desktop/Nagar 2/Nagarsevak-Managment/result/27A.pdf'
-print("Extracting booth data from PDF...")
-booth_data, candidates = extract_complete_booth_data(pdf_path)
+def extract_complete_booth_data(pdf_path, candidates, candidate_totals):
+    """
+    Yield booth-by-booth election records from the PDF, one page at a time.
+    candidate_totals is updated with each candidate's running vote total.
+    """
+    booth_num = 0
 
-# Analyze the data
-print("\n\n=== EXTRACTION SUMMARY ===")
-for candidate, votes in booth_data.items():
-    print(f"{candidate[:40]}: {len(votes)} booth records, Total votes: {sum(votes)}")
+    for page_num, page_votes in iter_page_candidate_votes(pdf_path, candidates):
+        if not page_votes:
+            continue
 
-# Now generate SQL
-print("\n\n=== GENERATING SQL ===")
+        # Check if all candidates on this page have the same number of booths
+        booth_counts = [len(votes) for votes in page_votes.values()]
+        if len(set(booth_counts)) != 1:
+            print(f"ERROR: Inconsistent booth counts across candidates on page {page_num}: {booth_counts}")
+            print("PDF parsing may have failed. Manual verification needed.")
+            continue
 
-# Check if all candidates have the same number of booths
-booth_counts = [len(votes) for votes in booth_data.values()]
-if len(set(booth_counts)) == 1:
-    num_booths = booth_counts[0]
-    print(f"All candidates have {num_booths} booth records - GOOD!")
+        for candidate, votes in page_votes.items():
+            candidate_totals[candidate] = candidate_totals.get(candidate, 0) + sum(votes)
     
-    # Generate SQL for each booth
-    tenant_id = 'bf1a3e36-464e-4eff-b21d-dc71f5a5a582'
-    ward_name = 'Ward 27-A'
+        for page_booth in range(booth_counts[0]):
+            booth_num += 1
     
-    sql_file = '/Users/shreyasjadhav/Desktop/Nagar 2/Nagarsevak-Managment/scripts/import_all_booths_ward27a.sql'
-    
-    with open(sql_file, 'w', encoding='utf-8') as f:
-        f.write(f"-- Complete Booth-by-Booth Results for Ward 27-A\n")
-        f.write(f"-- Total Booths: {num_booths}\n")
-        f.write(f"-- Tenant: {tenant_id}\n\n")
-        
-        f.write(f"-- Delete existing Ward 27-A data first\n")
-        f.write(f"DELETE FROM election_results WHERE ward_name = '{ward_name}' AND tenant_id = '{tenant_id}';\n\n")
-        
-        # Generate INSERT for each booth
-        for booth_num in range(num_booths):
             # Get votes for this booth from each candidate
             candidate_votes_dict = {}
             total_votes = 0
             
             for candidate in candidates:
-                if candidate in booth_data and booth_num < len(booth_data[candidate]):
-                    votes = booth_data[candidate][booth_num]
+                if candidate in page_votes:
+                    votes = page_votes[candidate][page_booth]
                     candidate_votes_dict[candidate] = votes
                     total_votes += votes
             
@@ -115,36 +110,36 @@ if len(set(booth_counts)) == 1:
             sorted_votes = sorted(candidate_votes_dict.values(), reverse=True)
             margin = sorted_votes[0] - sorted_votes[1] if len(sorted_votes) > 1 else 0
             
-            # Generate JSON for candidate_votes
-            votes_json = json.dumps(candidate_votes_dict, ensure_ascii=False, indent=2)
+            yield {
+                'booth_number': str(booth_num),
+                'total_votes': total_votes,
+                'candidate_votes': candidate_votes_dict,
+                'winner': winner,
+                'margin': margin
+            }
             
-            f.write(f"-- Booth {booth_num + 1}\n")
-            f.write(f"INSERT INTO election_results (\n")
-            f.write(f"    ward_name, booth_number, booth_name, \n")
-            f.write(f"    total_voters, total_votes_casted, candidate_votes, \n")
-            f.write(f"    winner, margin, tenant_id, created_at\n")
-            f.write(f") VALUES (\n")
-            f.write(f"    '{ward_name}',\n")
-            f.write(f"    '{booth_num + 1}',\n")
-            f.write(f"    'मतदान केंद्र {booth_num + 1}',\n")
-            f.write(f"    0,\n")
-            f.write(f"    {total_votes},\n")
-            f.write(f"    '{votes_json}'::jsonb,\n")
-            f.write(f"    '{winner}',\n")
-            f.write(f"    {margin},\n")
-            f.write(f"    '{tenant_id}',\n")
-            f.write(f"    NOW()\n")
-            f.write(f");\n\n")
+if __name__ == '__main__':
+    # Extract data and stream it into SQL
+    pdf_path = os.path.join(RESULT_DIR, '27A.pdf')
+    tenant_id = 'bf1a3e36-464e-4eff-b21d-dc71f5a5a582'
+    ward_name = 'Ward 27-A'
+    sql_file = os.path.join(SCRIPTS_DIR, 'import_all_booths_ward27a.sql')
         
-        f.write(f"\n-- Verify import\n")
-        f.write(f"SELECT COUNT(*) as total_booths, SUM(total_votes_casted) as total_votes\n")
-        f.write(f"FROM election_results\n")
-        f.write(f"WHERE ward_name = '{ward_name}' AND tenant_id = '{tenant_id}';\n")
+    print("Extracting booth data from PDF...")
+    candidate_totals = {}
+    booths = extract_complete_booth_data(pdf_path, CANDIDATES, candidate_totals)
+    
+    sink = SqlInsertSink(sql_file, tenant_id,
+                         title="Complete Booth-by-Booth Results for Ward 27-A",
+                         source_label="27A.pdf",
+                         ward_names=[ward_name])
+    run_pipeline([(ward_name, booths)], sink)
     
+    # Analyze the data
+    print("\n\n=== EXTRACTION SUMMARY ===")
+    for candidate, total in candidate_totals.items():
+        print(f"{candidate[:40]}: Total votes: {total}")
+
     print(f"\n✅ SQL file created: {sql_file}")
-    print(f"   Total booths: {num_booths}")
+    print(f"   Total booths: {sink.total_booths}")
     print(f"   Ready to import into database!")
-    
-else:
-    print(f"ERROR: Inconsistent booth counts across candidates: {booth_counts}")
-    print("PDF parsing may have failed. Manual verification needed.")
@@ -4,10 +4,20 @@ Extract complete booth-by-booth election data from all Ward 27 PDFs (A, B, C, D)
 and generate comprehensive SQL import script.
 """
 
-import pdfplumber
-import json
+import argparse
 import os
 
+from booth_aggregation import iter_booth_records
+from booth_model import BoothBatch
+from candidate_matcher import CandidateMatcher
+from election_pipeline import run_pipeline
+from election_sinks import SINK_FORMATS, make_sql_sink
+from page_journal import DEFAULT_JOURNAL_DIR, PageJournal, source_fingerprint
+from parallel_extraction import (SKIPPED_PAGE, PageError, default_workers, iter_pdf_page_tables,
+                                 iter_serial_page_tables, retry_page_tables)
+from pdf_text_grid import VALID_VOTES_MARKER
+from table_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, TableCache
+
 # Candidate names (same across all wards)
 CANDIDATES = [
     "अंबेदकर (कांबळे) दिलीप शंकर",
@@ -22,209 +32,269 @@ CANDIDATES = [
     "NOTA"
 ]
 
+# Built once: resolves table rows to CANDIDATES
+CANDIDATE_MATCHER = CandidateMatcher(CANDIDATES)
+
 TENANT_ID = 'bf1a3e36-464e-4eff-b21d-dc71f5a5a582'
 
-def extract_booth_data_from_pdf(pdf_path, ward_suffix):
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), 'result')
+
+# Modules whose code decides which booths a page parses to; editing any of
+# them invalidates the page journals
+PARSER_SOURCES = [os.path.join(SCRIPTS_DIR, name) for name in (
+    'extract_complete_election_data.py', 'booth_aggregation.py', 'booth_model.py',
+    'candidate_matcher.py', 'pdf_text_grid.py',
+)]
+
+def parse_booth_table(tables, page_num, matcher=None, ward='27'):
     """
-    Extract all booth data from a single PDF using table extraction.
-    Returns list of booth records.
+    Turn the extract_tables() output of one page into booth records.
+    matcher holds the election's candidates (defaults to CANDIDATES).
+    Returns list of booth records found on the page.
     """
-    print(f"\n{'='*60}")
-    print(f"Processing: {pdf_path}")
-    print(f"Ward: 27-{ward_suffix}")
-    print('='*60)
-    
-    pdf = pdfplumber.open(pdf_path)
+    print(f"\nPage {page_num}:")
     booths = []
+    matcher = matcher or CANDIDATE_MATCHER
+    candidates = matcher.candidates
     
-    for page_num, page in enumerate(pdf.pages, 1):
-        print(f"\nPage {page_num}:")
-        
-        # Extract tables
-        tables = page.extract_tables()
-        
-        if not tables:
-            print(f"  No tables found on page {page_num}")
-            continue
-        
-        # Process first table on the page (main election results table)
-        table = tables[0]
-        
-        # Find header row with booth numbers (म.क.क्र.:)
-        booth_numbers = []
-        header_row_idx = None
-        
-        for idx, row in enumerate(table):
-            if row and any('म.क' in str(cell) for cell in row if cell):
-                # This is likely the header row
-                # Extract booth numbers
-                for cell in row:
-                    if cell and 'क्र.:' in str(cell):
-                        # Extract numbers after क्र.:
-                        import re
-                        nums = re.findall(r':\s*(\d+)', str(cell))
-                        booth_numbers.extend(nums)
-                header_row_idx = idx
-                break
-        
-        if not booth_numbers:
-            print(f"  Could not find booth numbers on page {page_num}")
+    if not tables:
+        print(f"  No tables found on page {page_num}")
+        return booths
+    
+    # Process first table on the page (main election results table)
+    table = tables[0]
+    
+    # Find header row with booth numbers (म.क.क्र.:)
+    booth_numbers = []
+    header_row_idx = None
+    
+    for idx, row in enumerate(table):
+        if row and any('म.क' in str(cell) for cell in row if cell):
+            # This is likely the header row
+            # Extract booth numbers
+            for cell in row:
+                if cell and 'क्र.:' in str(cell):
+                    # Extract numbers after क्र.:
+                    import re
+                    nums = re.findall(r':\s*(\d+)', str(cell))
+                    booth_numbers.extend(nums)
+            header_row_idx = idx
+            break
+    
+    if not booth_numbers:
+        print(f"  Could not find booth numbers on page {page_num}")
+        return booths
+    
+    print(f"  Found {len(booth_numbers)} booths: {booth_numbers}")
+    
+    # Extract data rows (candidate votes)
+    # Rows after header contain candidate votes, down to the valid votes row
+    candidate_data = {}
+    
+    for row in table[header_row_idx + 1:]:
+        if row and any(VALID_VOTES_MARKER in str(cell) for cell in row if cell):
+            break
+        if not row or len(row) < 3:
             continue
         
-        print(f"  Found {len(booth_numbers)} booths: {booth_numbers}")
-        
-        # Extract data rows (candidate votes)
-        # Rows after header contain candidate votes
-        candidate_data = {}
-        
-        for row_idx in range(header_row_idx + 1, min(header_row_idx + 12, len(table))):
-            row = table[row_idx]
-            if not row or len(row) < 3:
+        # Check if this is a candidate row (contains ward prefix like "027-")
+        if row[0] and ward.zfill(3) in str(row[0]):
+            # Find which candidate this is from the first few cells
+            match = matcher.match_row(row, slice(0, 3))
+            if not match:
+                if match.ambiguous:
+                    print(f"    ⚠ Ambiguous candidate row: {' / '.join(match.tied)}")
                 continue
+            candidate_name = match.candidate
             
-            # Check if this is a candidate row (contains ward prefix like "027-")
-            if row[0] and '027' in str(row[0]):
-                # Find which candidate this is
-                candidate_name = None
-                for cand in CANDIDATES:
-                    # Check in first few cells
-                    row_text = ' '.join([str(cell) for cell in row[:3] if cell])
-                    if any(word in row_text for word in cand.split()[:2]):  # Match first 2 words
-                        candidate_name = cand
-                        break
-                
-                if not candidate_name:
-                    continue
-                
-                # Extract vote numbers from cells after column 2
-                votes = []
-                for cell in row[2:]:
-                    if cell and str(cell).strip():
-                        try:
-                            vote_count = int(str(cell).strip())
-                            votes.append(vote_count)
-                        except ValueError:
-                            pass
-                
-                # Only keep votes matching number of booths
-                votes = votes[:len(booth_numbers)]
-                
-                if len(votes) == len(booth_numbers):
-                    candidate_data[candidate_name] = votes
-                    print(f"    {candidate_name[:30]}: {len(votes)} values")
-        
-        # Organize data by booth
-        if len(candidate_data) == len(CANDIDATES):
-            for booth_idx, booth_num in enumerate(booth_numbers):
-                booth_votes = {}
-                total_votes = 0
-                
-                for candidate in CANDIDATES:
-                    if candidate in candidate_data and booth_idx < len(candidate_data[candidate]):
-                        votes = candidate_data[candidate][booth_idx]
-                        booth_votes[candidate] = votes
-                        total_votes += votes
-                
-                if len(booth_votes) == len(CANDIDATES):
-                    # Find winner (excluding NOTA)
-                    max_votes = max([v for k, v in booth_votes.items() if k != "NOTA"])
-                    winner = [k for k, v in booth_votes.items() if v == max_votes and k != "NOTA"][0]
-                    
-                    # Calculate margin
-                    sorted_votes = sorted([v for k, v in booth_votes.items() if k != "NOTA"], reverse=True)
-                    margin = sorted_votes[0] - sorted_votes[1] if len(sorted_votes) > 1 else 0
-                    
-                    booths.append({
-                        'booth_number': booth_num,
-                        'total_votes': total_votes,
-                        'candidate_votes': booth_votes,
-                        'winner': winner,
-                        'margin': margin
-                    })
-        else:
-            print(f"  WARNING: Expected {len(CANDIDATES)} candidates, found {len(candidate_data)}")
+            # Extract vote numbers from cells after column 2
+            votes = []
+            for cell in row[2:]:
+                if cell and str(cell).strip():
+                    try:
+                        vote_count = int(str(cell).strip())
+                        votes.append(vote_count)
+                    except ValueError:
+                        pass
+            
+            # Only keep votes matching number of booths
+            votes = votes[:len(booth_numbers)]
+            
+            if len(votes) == len(booth_numbers):
+                candidate_data[candidate_name] = votes
+                print(f"    {candidate_name[:30]}: {len(votes)} values")
+    
+    # Organize data by booth: winners and margins for the whole page at once
+    if len(candidate_data) == len(candidates):
+        votes = [candidate_data[candidate] for candidate in candidates]
+        booths.extend(iter_booth_records(booth_numbers, candidates, votes))
+    else:
+        print(f"  WARNING: Expected {len(candidates)} candidates, found {len(candidate_data)}")
     
-    pdf.close()
-    print(f"\n✓ Extracted {len(booths)} booths from Ward 27-{ward_suffix}")
     return booths
 
-def generate_complete_sql(all_ward_data, output_file):
-    """Generate complete SQL for all wards"""
+def open_page_journal(pdf_path, ward='27', matcher=None, journal_dir=DEFAULT_JOURNAL_DIR):
+    """Checkpoint journal (page_journal.py) for parsing pdf_path with these candidates"""
+    config = {
+        'parser': 'parse_booth_table',
+        'ward': ward,
+        'candidates': (matcher or CANDIDATE_MATCHER).candidates,
+        'source': source_fingerprint(*PARSER_SOURCES),
+    }
+    return PageJournal.for_pdf(pdf_path, config, journal_dir)
+
+def iter_booths_from_pdf(pdf_path, ward_suffix, page_tables=None, ward='27', matcher=None,
+                         journal=None, retries=1):
+    """
+    Yield booth records from a single PDF using table extraction, page by page.
+    page_tables optionally supplies the per-page extract_tables() output,
+    e.g. from the process pool in parallel_extraction.
+    matcher is the CandidateMatcher for the ward's candidates (defaults to CANDIDATES).
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("-- Complete Booth-by-Booth Election Results for Ward 27 (A, B, C, D)\n")
-        f.write(f"-- Tenant: {TENANT_ID}\n")
-        f.write(f"-- Generated automatically from PDF data\n\n")
-        
-        # Delete all existing Ward 27 data
-        f.write("-- Delete all existing Ward 27 data\n")
-        f.write(f"DELETE FROM election_results WHERE tenant_id = '{TENANT_ID}';\n\n")
-        
-        total_booths = 0
-        
-        for ward_suffix, booths in all_ward_data.items():
-            ward_name = f"Ward 27-{ward_suffix}"
-            
-            f.write(f"\n-- {'='*60}\n")
-            f.write(f"-- Ward 27-{ward_suffix}: {len(booths)} booths\n")
-            f.write(f"-- {'='*60}\n\n")
-            
-            for booth in booths:
-                votes_json = json.dumps(booth['candidate_votes'], ensure_ascii=False)
-                
-                f.write(f"-- Booth {booth['booth_number']}\n")
-                f.write(f"INSERT INTO election_results (\n")
-                f.write(f"    ward_name, booth_number, booth_name,\n")
-                f.write(f"    total_voters, total_votes_casted, candidate_votes,\n")
-                f.write(f"    winner, margin, tenant_id, created_at\n")
-                f.write(f") VALUES (\n")
-                f.write(f"    '{ward_name}',\n")
-                f.write(f"    '{booth['booth_number']}',\n")
-                f.write(f"    'मतदान केंद्र {booth['booth_number']}',\n")
-                f.write(f"    0,\n")
-                f.write(f"    {booth['total_votes']},\n")
-                f.write(f"    '{votes_json}'::jsonb,\n")
-                f.write(f"    '{booth['winner']}',\n")
-                f.write(f"    {booth['margin']},\n")
-                f.write(f"    '{TENANT_ID}',\n")
-                f.write(f"    NOW()\n")
-                f.write(f");\n\n")
-                
-                total_booths += 1
+    A page that fails is retried on its own up to `retries` times and then
+    skipped, so one bad page never costs the rest of the ward. With a
+    PageJournal every page's booths (or error) are checkpointed and pages
+    already journaled as done are replayed instead of extracted again.
+    A page that parses to no booths is journaled as an error, so a rerun
+    tries it again rather than replaying an empty result.
+    """
+    print(f"\n{'='*60}")
+    print(f"Processing: {pdf_path}")
+    print(f"Ward: {ward}-{ward_suffix}")
+    print('='*60)
+    
+    if page_tables is None:
+        page_tables = iter_serial_page_tables(pdf_path, skip_pages=journal.done_pages() if journal else ())
+    
+    booth_count = 0
+    failed_pages = []
+    for page_index, tables in enumerate(page_tables):
+        page_num = page_index + 1
+        if tables is SKIPPED_PAGE:
+            booths = journal.booths(page_index)
+            print(f"\nPage {page_num}: {len(booths)} booths from checkpoint")
+        else:
+            if isinstance(tables, PageError) and retries:
+                print(f"\n  ⚠ Page {page_num} failed ({tables.message}), retrying")
+                tables = retry_page_tables(pdf_path, page_index, retries)
+            error = tables.message if isinstance(tables, PageError) else None
+            if error is None:
+                try:
+                    booths = parse_booth_table(tables, page_num, matcher, ward)
+                except Exception as exc:
+                    error = f"{type(exc).__name__}: {exc}"
+            if error is not None:
+                print(f"\n  ❌ Page {page_num} skipped: {error}")
+                failed_pages.append(page_num)
+                if journal is not None:
+                    journal.record_error(page_index, error)
+                continue
+            if journal is not None:
+                if booths:
+                    journal.record_ok(page_index, booths)
+                else:
+                    journal.record_error(page_index, "no booths parsed")
         
-        f.write(f"\n-- Verification Query\n")
-        f.write(f"SELECT ward_name, COUNT(*) as booth_count, SUM(total_votes_casted) as total_votes\n")
-        f.write(f"FROM election_results\n")
-        f.write(f"WHERE tenant_id = '{TENANT_ID}'\n")
-        f.write(f"GROUP BY ward_name\n")
-        f.write(f"ORDER BY ward_name;\n")
+        for booth in booths:
+            booth_count += 1
+            yield booth
+    
+    print(f"\n✓ Extracted {booth_count} booths from Ward {ward}-{ward_suffix}")
+    if failed_pages:
+        print(f"  ❌ Failed pages: {', '.join(map(str, failed_pages))}"
+              + (f" (journaled in {journal.path}, rerun to retry them)" if journal is not None else ""))
+
+def extract_booth_data_from_pdf(pdf_path, ward_suffix, page_tables=None, ward='27', matcher=None,
+                                journal=None, retries=1):
+    """
+    Extract all booth data from a single PDF using table extraction.
+    Returns the booth records as a BoothBatch.
+    """
+    return BoothBatch(iter_booths_from_pdf(pdf_path, ward_suffix, page_tables, ward, matcher, journal, retries))
+
+def generate_complete_sql(all_ward_data, output_file, sink_format='insert', batch_size=500, tenant_id=TENANT_ID,
+                          ward_suffixes=None):
+    """
+    Generate complete SQL for all wards.
+    all_ward_data is a dict or an iterable of (ward_suffix, booths) pairs;
+    booths may be a lazy iterator, in which case each booth is written
+    as soon as it is parsed. sink_format is one of election_sinks.SINK_FORMATS.
+    ward_suffixes are the seats being imported (defaults to the dict's keys);
+    only those are replaced, and a seat that parses to no booths is left alone.
+    """
+    if isinstance(all_ward_data, dict):
+        ward_suffixes = ward_suffixes or list(all_ward_data)
+        all_ward_data = all_ward_data.items()
+    
+    ward_names = [f"Ward 27-{ward_suffix}" for ward_suffix in ward_suffixes or ()] or None
+    ward_sources = ((f"Ward 27-{ward_suffix}", booths) for ward_suffix, booths in all_ward_data)
+    sink = make_sql_sink(sink_format, output_file, tenant_id,
+                          title="Complete Booth-by-Booth Election Results for Ward 27 (A, B, C, D)",
+                          source_label="PDF data",
+                          ward_names=ward_names,
+                          batch_size=batch_size)
+    run_pipeline(ward_sources, sink)
     
     print(f"\n{'='*60}")
     print(f"✅ SQL GENERATION COMPLETE")
     print(f"{'='*60}")
     print(f"Output file: {output_file}")
-    print(f"Total booths: {total_booths}")
+    print(f"Total booths: {sink.total_booths}")
+    for ward_name in sink.empty_wards:
+        print(f"⚠ {ward_name}: no booths parsed, its existing results are left in place")
     print(f"Ready to import into database!")
 
 def main():
-    base_path = '/Users/shreyasjadhav/Desktop/Nagar 2/Nagarsevak-Managment/result'
-    output_sql = '/Users/shreyasjadhav/Desktop/Nagar 2/Nagarsevak-Managment/scripts/import_all_wards_complete.sql'
+    parser = argparse.ArgumentParser(description="Extract Ward 27 booth results from PDFs into SQL")
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help="worker processes for page extraction (1 = serial)")
+    parser.add_argument('--base-path', default=RESULT_DIR)
+    parser.add_argument('--output', default=os.path.join(SCRIPTS_DIR, 'import_all_wards_complete.sql'))
+    parser.add_argument('--format', choices=SINK_FORMATS, default='insert',
+                        help="SQL layout: per-booth INSERTs, batched VALUES, or COPY blocks for psql")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="booths per INSERT statement with --format values")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="on-disk cache of per-page extract_tables() output")
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="evict least recently used cache entries beyond this size")
+    parser.add_argument('--no-cache', action='store_true', help="always re-run table extraction")
+    parser.add_argument('--journal-dir', default=DEFAULT_JOURNAL_DIR,
+                        help="per-page checkpoints; a rerun resumes from them")
+    parser.add_argument('--no-journal', action='store_true', help="do not checkpoint or resume pages")
+    parser.add_argument('--retries', type=int, default=1,
+                        help="times a failed page is re-extracted on its own before it is skipped")
+    args = parser.parse_args()
+    
+    cache = None
+    if not args.no_cache:
+        cache = TableCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
     
-    ward_data = {}
+    pdf_files = {}
     
     for suffix in ['A', 'B', 'C', 'D']:
-        pdf_file = os.path.join(base_path, f'27{suffix}.pdf')
+        pdf_file = os.path.join(args.base_path, f'27{suffix}.pdf')
         if os.path.exists(pdf_file):
-            booths = extract_booth_data_from_pdf(pdf_file, suffix)
-            ward_data[suffix] = booths
+            pdf_files[pdf_file] = suffix
         else:
             print(f"WARNING: {pdf_file} not found!")
     
-    # Generate SQL
-    if ward_data:
-        generate_complete_sql(ward_data, output_sql)
-    else:
+    if not pdf_files:
         print("ERROR: No data extracted from PDFs!")
+        return
+    
+    journals = {}
+    if not args.no_journal:
+        journals = {pdf_file: open_page_journal(pdf_file, journal_dir=args.journal_dir) for pdf_file in pdf_files}
+    skip_pages = {pdf_file: journal.done_pages() for pdf_file, journal in journals.items()}
+    
+    # Booths stream from the page pool straight into the SQL file
+    ward_data = ((pdf_files[pdf_file], iter_booths_from_pdf(pdf_file, pdf_files[pdf_file], page_tables,
+                                                            journal=journals.get(pdf_file), retries=args.retries))
+                 for pdf_file, page_tables in iter_pdf_page_tables(list(pdf_files), args.workers, cache, skip_pages))
+    generate_complete_sql(ward_data, args.output, args.format, args.batch_size,
+                          ward_suffixes=list(pdf_files.values()))
 
 if __name__ == '__main__':
     main()
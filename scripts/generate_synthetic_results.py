@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic ward result workbooks and PDFs for load testing the parsers.
+
+Outputs use the layouts the real parsers expect:
+
+    xlsx (--layout columns)  Ward 27 result sheet: booth headers 'म.क.क्र.: N'
+                             on row 9 in every other column from H, one row
+                             per candidate from row 10 (votes under each header)
+    xlsx (--layout rows)     Ward 5 sheet: 'मतदान केंद्र क्र.' header, one booth
+                             per row ('5/N'), one column per candidate up to NOTA
+    pdf                      Ward 27 PDF: a ruled table per page with a
+                             'म.क.क्र.: N' header row, '027-अ' prefixed candidate
+                             rows and a valid-votes row
+
+Every seat also gets <ward><seat>.golden.json with the generated votes, in the
+format of golden/ward27a_booths.json, so benchmark_ingestion.py can score the
+parsers on it.
+
+The PDFs are written directly (no PDF library needed). Text uses a Type0 font
+with Identity-H encoding, where each character code is its own Unicode code
+point, plus an identity ToUnicode CMap. No font program is embedded, so
+viewers draw the Devanagari with a fallback font, but text extraction
+(pdfplumber / pdfminer) returns exactly the generated strings.
+
+Usage:
+    python scripts/generate_synthetic_results.py --booths 400 --candidates 25 --out-dir /tmp/synthetic
+    python scripts/generate_synthetic_results.py --format pdf --seats A,B,C,D --booths-per-page 12
+"""
+
+import argparse
+import json
+import os
+import random
+
+SEAT_LETTERS = {'A': 'अ', 'B': 'ब', 'C': 'क', 'D': 'ड'}
+
+FIRST_NAMES = [
+    'दिलीप', 'अमर', 'धनंजय', 'रविराज', 'नंदू', 'वैभवी', 'सुरज', 'महेश', 'गुलाब', 'भक्ती',
+    'रेश्मा', 'प्रियांका', 'जयश्री', 'राजश्री', 'ममित', 'समीर', 'पूनम', 'श्रेया', 'स्वाती', 'तेजश्री',
+    'प्रिती', 'सरिता', 'चेतन', 'अशोक', 'महादेव', 'विनया', 'देवराम', 'तुकाराम', 'दिनकर', 'अरविंद',
+]
+MIDDLE_NAMES = [
+    'शंकर', 'विलास', 'विष्णू', 'बाळासाहेब', 'काळूराम', 'संजय', 'सोमनाथ', 'बलभीम', 'गंगाराम', 'राजेश',
+    'जगजिवन', 'विजय', 'दिनानाथ', 'नारायण', 'अमित', 'सुदर्शन', 'विशाल', 'करण', 'प्रभाकर', 'मोहन',
+]
+SURNAMES = [
+    'कांबळे', 'आवळे', 'जाधव', 'भामरे', 'विर', 'शिंदे', 'सोनवणे', 'सकट', 'नेटके', 'केणी',
+    'मढवी', 'माने', 'औरादे', 'चौगुले', 'पाटील', 'म्हात्रे', 'आगवणे', 'जिरगे', 'फडतरे', 'शिंदेकर',
+    'सोमवंशी', 'नाईक', 'बोबडे', 'सुर्यवंशी', 'ननावरे', 'पागिरे',
+]
+
+VALID_VOTES_LABEL = 'वैध मतांची संख्या'
+
+
+def candidate_names(count, rng):
+    """count distinct Devanagari candidate names followed by NOTA"""
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = f"{rng.choice(SURNAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(MIDDLE_NAMES)}"
+        key = frozenset(name.split())
+        if key not in seen:
+            seen.add(key)
+            names.append(name)
+    return names + ['NOTA']
+
+
+def booth_votes(candidates, num_booths, rng, min_turnout=250, max_turnout=950):
+    """{booth_number: [votes per candidate]} with a few strong candidates and a small NOTA share"""
+    # Fixed popularity per candidate so the same names tend to win, like a real ward
+    weights = [rng.gammavariate(0.6, 1.0) for _ in candidates[:-1]] + [0.05]
+    booths = {}
+    for booth_num in range(1, num_booths + 1):
+        turnout = rng.randint(min_turnout, max_turnout)
+        shares = [w * rng.uniform(0.5, 1.5) for w in weights]
+        total = sum(shares)
+        booths[str(booth_num)] = [int(turnout * s / total) for s in shares]
+    return booths
+
+
+def write_golden(path, ward_name, candidates, booths):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'ward_name': ward_name, 'source': 'synthetic',
+                   'candidates': candidates, 'booths': booths}, f, ensure_ascii=False, indent=1)
+
+
+def write_column_workbook(path, ward, seat, candidates, booths, valid_votes_row=False):
+    """Booths across columns: row 9 headers, candidate rows from row 10, votes in every other column"""
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.cell(row=1, column=1, value=f"प्रभाग क्र. {ward} {SEAT_LETTERS.get(seat, seat)} - synthetic results")
+
+    # Columns are 1-based here; booth headers/votes start at column H (index 7)
+    for booth_idx, booth_num in enumerate(booths):
+        sheet.cell(row=9, column=8 + 2 * booth_idx, value=f"म.क.क्र.: {booth_num}")
+
+    rows = [(name, [votes[cand_idx] for votes in booths.values()]) for cand_idx, name in enumerate(candidates)]
+    if valid_votes_row:
+        rows.append((VALID_VOTES_LABEL, [sum(votes) for votes in booths.values()]))
+
+    for row_offset, (name, votes) in enumerate(rows):
+        row = 10 + row_offset
+        sheet.cell(row=row, column=1, value=row_offset + 1)
+        sheet.cell(row=row, column=2, value=f"{ward.zfill(3)}-{SEAT_LETTERS.get(seat, seat)}")
+        sheet.cell(row=row, column=3, value=name)
+        sheet.cell(row=row, column=5, value=sum(votes))
+        for booth_idx, count in enumerate(votes):
+            sheet.cell(row=row, column=8 + 2 * booth_idx, value=count)
+    wb.save(path)
+
+
+def write_row_workbook(path, ward, seat, candidates, booths):
+    """One booth per row under a 'मतदान केंद्र क्र.' header (Ward 5 layout)"""
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append([f"प्रभाग क्र. {ward} {SEAT_LETTERS.get(seat, seat)} - synthetic results"])
+    sheet.append([])
+    header = ['अ.क्र.', 'मतदान केंद्र क्र.'] + [c if c != 'NOTA' else 'नोटा' for c in candidates] + ['वैध मते']
+    sheet.append(header)
+    for serial, (booth_num, votes) in enumerate(booths.items(), 1):
+        sheet.append([serial, f"{ward}/{booth_num}"] + votes + [sum(votes)])
+    # Totals row without a serial number, which the parser must skip
+    sheet.append([None, 'एकूण'] + [sum(v[i] for v in booths.values()) for i in range(len(candidates))])
+    wb.save(path)
+
+
+class RawPdfWriter:
+    """Just enough of PDF to draw ruled tables of Unicode text that extracts back verbatim"""
+
+    FONT_SIZE = 8
+    # Every glyph is 600/1000 em wide (the CIDFont's /DW)
+    CHAR_WIDTH = 0.6 * FONT_SIZE
+
+    def __init__(self):
+        self.pages = []
+        self.codepoints = set()
+
+    def text_width(self, text):
+        return len(text) * self.CHAR_WIDTH
+
+    def _hex(self, text):
+        self.codepoints.update(ord(ch) for ch in text)
+        return ''.join(f'{ord(ch):04X}' for ch in text)
+
+    def add_table_page(self, rows, col_widths, width, height, title=None, row_height=16, margin=30):
+        """Add a page with rows (lists of strings) drawn as a ruled table"""
+        ops = []
+        y = height - margin
+        if title:
+            ops.append(f"BT /F1 {self.FONT_SIZE + 2} Tf {margin} {y - 10:.2f} Td <{self._hex(title)}> Tj ET")
+            y -= 30
+
+        for row in rows:
+            x = margin
+            for text, col_width in zip(row, col_widths):
+                ops.append(f"{x:.2f} {y - row_height:.2f} {col_width:.2f} {row_height:.2f} re S")
+                if text:
+                    ops.append(f"BT /F1 {self.FONT_SIZE} Tf {x + 3:.2f} {y - row_height + 5:.2f} Td "
+                               f"<{self._hex(text)}> Tj ET")
+                x += col_width
+            y -= row_height
+
+        self.pages.append((width, height, '\n'.join(ops).encode('ascii')))
+
+    def _to_unicode_cmap(self):
+        # Identity mapping, one bfrange per 256-code block that is actually used
+        blocks = sorted({cp >> 8 for cp in self.codepoints})
+        lines = [
+            "/CIDInit /ProcSet findresource begin",
+            "12 dict begin",
+            "begincmap",
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+            "/CMapName /Adobe-Identity-UCS def",
+            "/CMapType 2 def",
+            "1 begincodespacerange",
+            "<0000> <FFFF>",
+            "endcodespacerange",
+            f"{len(blocks)} beginbfrange",
+        ]
+        lines += [f"<{b:02X}00> <{b:02X}FF> <{b:02X}00>" for b in blocks]
+        lines += ["endbfrange", "endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+        return '\n'.join(lines).encode('ascii')
+
+    def write(self, path):
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        def stream(data, extra=b''):
+            return b"<< /Length %d %s>>\nstream\n" % (len(data), extra) + data + b"\nendstream"
+
+        catalog = add(None)
+        pages = add(None)
+        descriptor = add(b"<< /Type /FontDescriptor /FontName /SyntheticDevanagari /Flags 4 "
+                         b"/FontBBox [0 -200 1000 800] /ItalicAngle 0 /Ascent 800 /Descent -200 "
+                         b"/CapHeight 700 /StemV 80 >>")
+        cid_font = add(b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /SyntheticDevanagari "
+                       b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+                       b"/FontDescriptor %d 0 R /DW 600 /CIDToGIDMap /Identity >>" % descriptor)
+        to_unicode = add(stream(self._to_unicode_cmap()))
+        font = add(b"<< /Type /Font /Subtype /Type0 /BaseFont /SyntheticDevanagari /Encoding /Identity-H "
+                   b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (cid_font, to_unicode))
+
+        page_ids = []
+        for width, height, content in self.pages:
+            content_id = add(stream(content))
+            page_ids.append(add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+                                b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                                % (pages, width, height, font, content_id)))
+
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+        kids = b' '.join(b"%d 0 R" % p for p in page_ids)
+        objects[pages - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for obj_id, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % obj_id + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+
+        with open(path, 'wb') as f:
+            f.write(out)
+
+
+def write_results_pdf(path, ward, seat, candidates, booths, booths_per_page=10):
+    """Ward result PDF: booth columns split across pages, one candidate per row"""
+    writer = RawPdfWriter()
+    prefix = f"{ward.zfill(3)}-{SEAT_LETTERS.get(seat, seat)}"
+    booth_numbers = list(booths)
+
+    for start in range(0, len(booth_numbers), booths_per_page):
+        page_booths = booth_numbers[start:start + booths_per_page]
+        rows = [['अ.क्र.', 'उमेदवाराचे नाव'] + [f"म.क.क्र.: {b}" for b in page_booths]]
+        for cand_idx, name in enumerate(candidates):
+            rows.append([prefix, name] + [str(booths[b][cand_idx]) for b in page_booths])
+        rows.append(['', VALID_VOTES_LABEL] + [str(sum(booths[b])) for b in page_booths])
+
+        col_widths = [max(writer.text_width(row[i]) for row in rows) + 6 for i in range(len(rows[0]))]
+        width = int(sum(col_widths) + 60)
+        height = int(len(rows) * 16 + 100)
+        writer.add_table_page(rows, col_widths, width, height,
+                              title=f"प्रभाग क्र. {ward} {SEAT_LETTERS.get(seat, seat)} - synthetic results")
+
+    writer.write(path)
+
+
+def generate_seat(out_dir, ward, seat, candidates, num_booths, formats, rng,
+                  layout='columns', booths_per_page=10, valid_votes_row=False):
+    """Write every requested format for one seat; returns the written paths"""
+    booths = booth_votes(candidates, num_booths, rng)
+    stem = os.path.join(out_dir, f"{ward}{seat}")
+    paths = []
+
+    if 'xlsx' in formats:
+        if layout == 'rows':
+            write_row_workbook(stem + '.xlsx', ward, seat, candidates, booths)
+        else:
+            write_column_workbook(stem + '.xlsx', ward, seat, candidates, booths, valid_votes_row)
+        paths.append(stem + '.xlsx')
+    if 'pdf' in formats:
+        write_results_pdf(stem + '.pdf', ward, seat, candidates, booths, booths_per_page)
+        paths.append(stem + '.pdf')
+
+    write_golden(stem + '.golden.json', f"Ward {ward}-{seat}", candidates, booths)
+    paths.append(stem + '.golden.json')
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic ward result workbooks / PDFs")
+    parser.add_argument('--out-dir', default='synthetic_results')
+    parser.add_argument('--ward', default='27')
+    parser.add_argument('--seats', default='A', help="comma separated seats, e.g. A,B,C,D")
+    parser.add_argument('--booths', type=int, default=400)
+    parser.add_argument('--candidates', type=int, default=9, help="number of candidates, NOTA is added")
+    parser.add_argument('--format', default='xlsx,pdf', help="comma separated: xlsx, pdf")
+    parser.add_argument('--layout', choices=('columns', 'rows'), default='columns',
+                        help="xlsx layout: booths across columns (Ward 27) or one booth per row (Ward 5)")
+    parser.add_argument('--booths-per-page', type=int, default=10, help="booth columns per PDF page")
+    parser.add_argument('--valid-votes-row', action='store_true',
+                        help="add the valid-votes total row under NOTA in column-layout workbooks")
+    parser.add_argument('--seed', type=int, default=27)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    formats = {f.strip() for f in args.format.split(',') if f.strip()}
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    candidates = candidate_names(args.candidates, rng)
+    print(f"Candidates: {', '.join(candidates)}")
+
+    for seat in [s.strip() for s in args.seats.split(',') if s.strip()]:
+        paths = generate_seat(args.out_dir, args.ward, seat, candidates, args.booths, formats, rng,
+                              args.layout, args.booths_per_page, args.valid_votes_row)
+        print(f"✓ Ward {args.ward}-{seat}: {args.booths} booths -> {', '.join(paths)}")
+
+
+if __name__ == '__main__':
+    main()
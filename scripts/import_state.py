@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Local record of what the last election_results import contained.
+
+For each tenant a small JSON file maps ward -> booth number -> fingerprint,
+where the fingerprint is a hash of (ward, booth_number, candidate_votes).
+An incremental import compares the freshly parsed booths against it and
+only writes the booths that changed (see SqlFileSink in election_sinks.py).
+
+The state is written when the SQL script is generated. If a generated script
+is never run against the database, delete the state file (or do a full
+import) so the next incremental run does not skip booths that were never
+loaded.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_STATE_DIR = os.path.join(SCRIPTS_DIR, '.import_state')
+
+
+def booth_fingerprint(ward_name, booth):
+    """Stable hash of the parts of a booth record that end up in election_results"""
+    raw = json.dumps([ward_name, str(booth['booth_number']), booth['candidate_votes']],
+                     ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def state_path(tenant_id, state_dir=DEFAULT_STATE_DIR):
+    return os.path.join(state_dir, f'{tenant_id}.json')
+
+
+def load_import_state(path):
+    """Return {ward_name: {booth_number: fingerprint}} of the last import, or None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['wards']
+    except FileNotFoundError:
+        return None
+
+
+def save_import_state(path, wards):
+    """Atomically replace the import state file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'wards': wards}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
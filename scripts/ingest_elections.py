@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Ingest election results for many tenants and wards from one manifest.
+
+The manifest (see elections_manifest.json) lists, per tenant, the wards to
+import, each ward's candidates and one source file per seat:
+
+    {
+      "tenants": [
+        {
+          "tenant_id": "...",
+          "name": "...",                       (optional, used in the SQL banner)
+          "output": "import_....sql",          (optional, default import_<tenant_id>.sql)
+          "wards": [
+            {
+              "ward": "27",
+              "candidates": ["...", "NOTA"],   (required for PDF seats)
+              "seats": [
+                {"seat": "A", "source": "../result/27A.pdf"},
+                {"seat": "B", "source": "...xls", "candidates": [...]}
+              ]
+            }
+          ]
+        }
+      ]
+    }
+
+Source paths are relative to the manifest. .pdf sources go through the
+table extractor, everything else through the workbook parsers. A seat whose
+source parses to no booths is not deleted: its existing results stay in
+place and the run exits with status 1 so the broken source gets noticed
+(with --dsn, --allow-empty-wards deletes such wards instead). A seat whose
+source file does not exist is left alone the same way and also fails the
+run. A seat's
+"candidates" override the ward's; for workbooks they are optional and only
+used to normalise the names found in the sheet.
+
+Every PDF page in the manifest is extracted by one shared process pool, and
+each tenant gets its own SQL file which replaces only the wards it imports.
+With --incremental the SQL only touches booths that changed since the last
+run (tracked per tenant in --state-dir, see import_state.py). With --dsn the
+booths are loaded straight into PostgreSQL instead (see election_db_loader.py).
+With --columnar the same booths are also written, one row per candidate, to a
+Parquet / Arrow file next to the SQL output (see columnar_export.py); that
+file always holds every booth, also with --incremental. --rollups writes
+per-ward / per-candidate totals, win counts and margin histograms in the
+same pass (see election_rollups.py), to <output>_rollups.sql or with --dsn
+straight into the rollup tables.
+
+PDF pages are checkpointed in --journal-dir (see page_journal.py): a page
+that fails is retried on its own and then skipped, and rerunning the same
+manifest only extracts the pages that failed or were never reached.
+
+Usage:
+    python scripts/ingest_elections.py
+    python scripts/ingest_elections.py my_manifest.json --format copy --workers 8
+    python scripts/ingest_elections.py --incremental
+    python scripts/ingest_elections.py --dsn postgresql://postgres@localhost/postgres --dry-run
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from candidate_matcher import CandidateMatcher
+from election_pipeline import run_pipeline
+from election_sinks import SINK_FORMATS, TeeSink, make_sql_sink
+from extract_complete_election_data import iter_booths_from_pdf, open_page_journal
+from import_state import DEFAULT_STATE_DIR, load_import_state, save_import_state, state_path
+from page_journal import DEFAULT_JOURNAL_DIR
+from parallel_extraction import default_workers, iter_pdf_page_tables
+from parse_excel_election_data import iter_ward_excel_booths
+from table_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, TableCache
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MANIFEST = os.path.join(SCRIPTS_DIR, 'elections_manifest.json')
+
+
+def load_manifest(manifest_path):
+    """
+    Read and validate a manifest.
+    Returns a list of tenants: {'tenant_id', 'name', 'output', 'seats'} where
+    seats is a flat list of {'ward', 'seat', 'ward_name', 'source', 'is_pdf', 'candidates'}.
+    """
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    tenants = []
+
+    for tenant in manifest.get('tenants', []):
+        tenant_id = tenant.get('tenant_id')
+        if not tenant_id:
+            raise ValueError(f"{manifest_path}: tenant without tenant_id")
+
+        seats = []
+        for ward in tenant.get('wards', []):
+            ward_num = str(ward['ward'])
+            for seat in ward.get('seats', []):
+                source = os.path.join(base_dir, seat['source'])
+                candidates = seat.get('candidates', ward.get('candidates'))
+                is_pdf = source.lower().endswith('.pdf')
+                if is_pdf and not candidates:
+                    raise ValueError(f"{manifest_path}: Ward {ward_num}-{seat['seat']} is a PDF "
+                                     f"source but has no candidates")
+                seats.append({
+                    'ward': ward_num,
+                    'seat': seat['seat'],
+                    'ward_name': f"Ward {ward_num}-{seat['seat']}",
+                    'source': source,
+                    'is_pdf': is_pdf,
+                    'candidates': candidates,
+                })
+
+        tenants.append({
+            'tenant_id': tenant_id,
+            'name': tenant.get('name', tenant_id),
+            'output': tenant.get('output', f'import_{tenant_id}.sql'),
+            'seats': seats,
+        })
+
+    return tenants
+
+
+def available_seats(seats):
+    """Split seats into (found, missing) by whether their source file exists"""
+    found, missing = [], []
+    for seat in seats:
+        (found if os.path.exists(seat['source']) else missing).append(seat)
+    return found, missing
+
+
+def seat_journal(seat, journal_dir):
+    """Page checkpoint journal of a PDF seat"""
+    return open_page_journal(seat['source'], seat['ward'], CandidateMatcher(seat['candidates']), journal_dir)
+
+
+def iter_tenant_sources(seats, pdf_tables, journals=None, retries=1):
+    """
+    Yield (ward_name, booths) for a tenant's seats.
+    pdf_tables is the shared iter_pdf_page_tables() stream, which yields
+    the PDFs in the same order as they appear across all tenants.
+    journals maps a PDF source to its PageJournal.
+    """
+    journals = journals or {}
+    for seat in seats:
+        matcher = CandidateMatcher(seat['candidates']) if seat['candidates'] else None
+
+        if seat['is_pdf']:
+            pdf_path, page_tables = next(pdf_tables)
+            assert pdf_path == seat['source']
+            booths = iter_booths_from_pdf(pdf_path, seat['seat'], page_tables, seat['ward'], matcher,
+                                          journals.get(pdf_path), retries)
+        else:
+            booths = iter_ward_excel_booths(seat['source'], seat['seat'], seat['ward'], matcher)
+
+        yield seat['ward_name'], booths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest election results for every tenant/ward in a manifest")
+    parser.add_argument('manifest', nargs='?', default=DEFAULT_MANIFEST)
+    parser.add_argument('--tenant', action='append',
+                        help="only ingest this tenant_id (repeatable)")
+    parser.add_argument('--output-dir', default=None,
+                        help="directory for the per-tenant SQL files (defaults to the manifest's directory)")
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help="worker processes for PDF page extraction, shared by all tenants (1 = serial)")
+    parser.add_argument('--format', choices=SINK_FORMATS, default='insert',
+                        help="SQL layout: per-booth INSERTs, batched VALUES, or COPY blocks for psql")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="booths per INSERT statement with --format values")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="on-disk cache of per-page extract_tables() output")
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="evict least recently used cache entries beyond this size")
+    parser.add_argument('--no-cache', action='store_true', help="always re-run table extraction")
+    parser.add_argument('--journal-dir', default=DEFAULT_JOURNAL_DIR,
+                        help="per-page checkpoints of PDF extraction; a rerun resumes from them")
+    parser.add_argument('--no-journal', action='store_true', help="do not checkpoint or resume PDF pages")
+    parser.add_argument('--retries', type=int, default=1,
+                        help="times a failed PDF page is re-extracted on its own before it is skipped")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only delete/insert booths that changed since the last import")
+    parser.add_argument('--state-dir', default=DEFAULT_STATE_DIR,
+                        help="where the per-tenant fingerprints of the last import are kept")
+    parser.add_argument('--dsn', help="load into this PostgreSQL database instead of writing SQL files")
+    parser.add_argument('--db-batch-size', type=int, default=0,
+                        help="with --dsn, commit after at least this many booths (0 = one transaction)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="with --dsn, run the load and roll it back")
+    parser.add_argument('--allow-empty-wards', action='store_true',
+                        help="with --dsn, delete the results of wards whose source produced no booths "
+                             "instead of leaving them in place")
+    parser.add_argument('--columnar', choices=('parquet', 'arrow'),
+                        help="also write a long-format (booth x candidate) file per tenant for analytics")
+    parser.add_argument('--rollups', action='store_true',
+                        help="also write ward / candidate rollups (see create_election_rollup_tables.sql)")
+    args = parser.parse_args()
+    if args.dsn and args.incremental:
+        parser.error("--incremental writes SQL files and cannot be combined with --dsn")
+    if args.dry_run and not args.dsn:
+        parser.error("--dry-run needs --dsn")
+    if args.allow_empty_wards and not args.dsn:
+        parser.error("--allow-empty-wards needs --dsn")
+
+    tenants = load_manifest(args.manifest)
+    if args.tenant:
+        tenants = [t for t in tenants if t['tenant_id'] in args.tenant]
+    if not tenants:
+        print("❌ ERROR: No tenants to ingest")
+        return
+
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.manifest))
+    os.makedirs(output_dir, exist_ok=True)
+
+    missing_seats = []
+    for tenant in tenants:
+        tenant['seats'], missing = available_seats(tenant['seats'])
+        for seat in missing:
+            print(f"❌ {seat['ward_name']}: {seat['source']} not found, existing results left in place")
+        missing_seats.extend(missing)
+
+    cache = None
+    if not args.no_cache:
+        cache = TableCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+
+    # One pool for every PDF page of every tenant
+    pdf_seats = [seat for tenant in tenants for seat in tenant['seats'] if seat['is_pdf']]
+    journals = {}
+    if not args.no_journal:
+        journals = {seat['source']: seat_journal(seat, args.journal_dir) for seat in pdf_seats}
+    skip_pages = {pdf_path: journal.done_pages() for pdf_path, journal in journals.items()}
+    pdf_tables = iter_pdf_page_tables([seat['source'] for seat in pdf_seats], args.workers, cache, skip_pages)
+
+    summary = []
+    for tenant in tenants:
+        if not tenant['seats']:
+            print(f"\n⚠ {tenant['name']}: no sources found, skipping")
+            continue
+
+        output_file = os.path.join(output_dir, tenant['output'])
+        tenant_state_path = state_path(tenant['tenant_id'], args.state_dir)
+        last_state = load_import_state(tenant_state_path)
+        if args.incremental and last_state is None:
+            print(f"\n⚠ {tenant['name']}: no previous import state, doing a full import")
+
+        ward_names = [seat['ward_name'] for seat in tenant['seats']]
+        if args.dsn:
+            from election_db_loader import PostgresLoaderSink
+            output_file = 'database' + (' (dry run, rolled back)' if args.dry_run else '')
+            sink = PostgresLoaderSink(args.dsn, tenant['tenant_id'], ward_names=ward_names,
+                                      batch_size=args.db_batch_size, dry_run=args.dry_run,
+                                      allow_empty_wards=args.allow_empty_wards)
+        else:
+            sink = make_sql_sink(args.format, output_file, tenant['tenant_id'],
+                                 title=f"Booth-by-Booth Election Results for {tenant['name']}",
+                                 source_label=f"manifest {os.path.basename(args.manifest)}",
+                                 ward_names=ward_names,
+                                 batch_size=args.batch_size,
+                                 previous_state=last_state if args.incremental else None)
+        extra_sinks = []
+        if args.columnar:
+            from columnar_export import ColumnarExportSink
+            columnar_file = os.path.join(output_dir, os.path.splitext(tenant['output'])[0] + '.' + args.columnar)
+            extra_sinks.append(ColumnarExportSink(columnar_file, tenant['tenant_id']))
+        if args.rollups:
+            from election_rollups import RollupSink
+            rollup_file = os.path.join(output_dir, os.path.splitext(tenant['output'])[0] + '_rollups.sql')
+            extra_sinks.append(RollupSink(None if args.dsn else rollup_file, tenant['tenant_id'], ward_names,
+                                          dsn=args.dsn, dry_run=args.dry_run,
+                                          allow_empty_wards=args.allow_empty_wards))
+        if extra_sinks:
+            sink = TeeSink(sink, *extra_sinks)
+        run_pipeline(iter_tenant_sources(tenant['seats'], pdf_tables, journals, args.retries), sink)
+        if not args.dry_run:
+            save_import_state(tenant_state_path, sink.updated_state(last_state))
+        summary.append((tenant, output_file, sink))
+
+    # Let the pool shut down and the cache trim itself
+    for _ in pdf_tables:
+        pass
+
+    empty_wards = []
+    print(f"\n{'='*70}")
+    print(f"✅ INGESTION COMPLETE")
+    print(f"{'='*70}")
+    for tenant, output_file, sink in summary:
+        print(f"{tenant['name']}")
+        print(f"  Output file: {output_file}")
+        for extra in getattr(sink, 'sinks', ())[1:]:
+            if hasattr(extra, 'total_rows'):
+                print(f"  Columnar file: {extra.output_file} ({extra.total_rows} rows)")
+            elif extra.output_file:
+                print(f"  Rollups: {extra.output_file} ({len(extra.wards)} wards)")
+            else:
+                print(f"  Rollups: {len(extra.wards)} wards loaded into the database")
+        print(f"  Wards: {len(tenant['seats'])}, booths: {sink.total_booths}, votes: {sink.total_votes:,}")
+        if args.dsn:
+            print(f"  Rows deleted: {sink.deleted_rows}, inserted: {sink.inserted_rows}, "
+                  f"transactions: {sink.transactions}")
+        elif sink.incremental:
+            print(f"  Unchanged booths skipped: {sink.unchanged_booths}, removed booths: {sink.deleted_booths}")
+        for ward_name in getattr(sink, 'empty_wards', ()):
+            print(f"  ❌ {ward_name}: no booths parsed, existing results left in place")
+            empty_wards.append(ward_name)
+
+    for seat in missing_seats:
+        print(f"❌ {seat['ward_name']}: source {seat['source']} not found")
+
+    if empty_wards or missing_seats:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Checkpoint journal for page-by-page PDF extraction.
+
+Every page of a ward PDF is an independent task. As each one finishes, a
+line is appended to that PDF's journal:
+
+    {"page": 3, "status": "ok", "booths": [...]}
+    {"page": 4, "status": "error", "error": "PDFSyntaxError: ..."}
+
+A rerun opens the same journal, takes the booths of pages already marked
+"ok" straight from it (those pages are never extracted again) and only
+works on the pages that failed or were never reached. If a page is
+journaled more than once, the last line wins. So a batch of many wards that
+dies halfway picks up at the page it stopped on instead of starting over.
+
+A journal belongs to one PDF and one parser configuration: it is keyed by
+the PDF's SHA-256 and a hash of the ward, candidate list, extractor
+settings and the source of the parser modules. An edited PDF, a new
+candidate list or a parser fix therefore starts a fresh journal.
+"""
+
+import hashlib
+import json
+import os
+
+from booth_model import BoothResult
+from table_cache import extractor_settings, file_sha256
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_JOURNAL_DIR = os.path.join(SCRIPTS_DIR, '.page_journal')
+
+
+def source_fingerprint(*paths):
+    """SHA-256 over the given source files, for the parser part of a journal config"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def journal_key(pdf_path, config):
+    """Journal name for a PDF parsed with config (any JSON-serialisable value)"""
+    raw = json.dumps([file_sha256(pdf_path), config, extractor_settings()],
+                     ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class PageJournal:
+    """Append-only JSONL record of the pages of one PDF"""
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short when a previous run was killed
+                        continue
+                    self.pages[entry['page']] = entry
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def for_pdf(cls, pdf_path, config, journal_dir=DEFAULT_JOURNAL_DIR):
+        name = os.path.splitext(os.path.basename(pdf_path))[0]
+        return cls(os.path.join(journal_dir, f'{name}-{journal_key(pdf_path, config)[:16]}.jsonl'))
+
+    def done_pages(self):
+        """Indexes of pages whose booths are already in the journal"""
+        return {page for page, entry in self.pages.items() if entry['status'] == 'ok'}
+
+    def failed_pages(self):
+        return {page for page, entry in self.pages.items() if entry['status'] == 'error'}
+
+    def booths(self, page_index):
+        return [BoothResult.from_record(booth) for booth in self.pages[page_index]['booths']]
+
+    def _append(self, entry):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.pages[entry['page']] = entry
+
+    def record_ok(self, page_index, booths):
+        self._append({'page': page_index, 'status': 'ok', 'booths': [dict(booth) for booth in booths]})
+
+    def record_error(self, page_index, error):
+        self._append({'page': page_index, 'status': 'error', 'error': error})
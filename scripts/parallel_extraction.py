@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Process-pool page extraction for election result PDFs.
+
+pdfplumber's extract_tables() is the slow part of parsing a ward PDF, and it
+only depends on the page itself. This module fans pages from one or more PDFs
+out to a pool of worker processes and hands the tables back in the original
+(pdf, page) order, so the booth parsing that follows sees exactly the same
+input as the serial path.
+
+Each page is first rebuilt from its words (pdf_text_grid.py); extract_tables()
+only runs on pages where that grid does not balance.
+
+With a TableCache (table_cache.py) pages whose tables are already on disk are
+answered in the parent process and only cache misses reach the pool.
+
+A page that cannot be extracted does not take the batch down: its slot in the
+stream holds a PageError instead of tables, which the caller can retry on its
+own with retry_page_tables(). Pages listed in skip_pages (e.g. already in a
+checkpoint journal, see page_journal.py) are not extracted at all and their
+slot holds SKIPPED_PAGE.
+"""
+
+import itertools
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+
+import pdfplumber
+
+from pdf_text_grid import page_tables
+from table_cache import extractor_settings, file_sha256
+
+
+class PageError:
+    """Stands in for a page's tables when extracting it failed"""
+
+    def __init__(self, page_index, message):
+        self.page_index = page_index
+        self.message = message
+
+    def __repr__(self):
+        return f"PageError(page {self.page_index + 1}: {self.message})"
+
+
+# Slot of a page that was skipped on request
+SKIPPED_PAGE = 'skipped'
+
+
+def default_workers():
+    """Number of worker processes to use when none is configured"""
+    return os.cpu_count() or 1
+
+
+def page_count(pdf_path):
+    """Return the number of pages in a PDF"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def page_jobs(pdf_path, cache=None):
+    """
+    Return one (pdf_path, page_index, cache_key) job per page of a PDF.
+    cache_key is None when no cache is in use.
+    """
+    count = page_count(pdf_path)
+    if cache is None:
+        return [(pdf_path, page_index, None) for page_index in range(count)]
+    
+    pdf_sha = file_sha256(pdf_path)
+    settings = extractor_settings()
+    return [(pdf_path, page_index, cache.key(pdf_sha, page_index, settings))
+            for page_index in range(count)]
+
+
+def extract_page_tables(job, cache=None):
+    """
+    Worker: run extract_tables() on a single (pdf_path, page_index, cache_key) job.
+    Returns a PageError instead of raising if the page cannot be extracted.
+    """
+    pdf_path, page_index, cache_key = job
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            tables = page_tables(pdf.pages[page_index])
+    except Exception as exc:
+        return PageError(page_index, f"{type(exc).__name__}: {exc}")
+    if cache is not None:
+        cache.put(cache_key, tables)
+    return tables
+
+
+def retry_page_tables(pdf_path, page_index, attempts=1):
+    """Re-extract a single failed page on its own, with a fresh PDF handle per attempt"""
+    result = PageError(page_index, "not attempted")
+    for _ in range(attempts):
+        result = extract_page_tables((pdf_path, page_index, None))
+        if not isinstance(result, PageError):
+            break
+    return result
+
+
+def cached_tables(cache, job):
+    """Tables for a job from the cache, or None on a miss / without a cache"""
+    if cache is None:
+        return None
+    return cache.get(job[2])
+
+
+def lookup_page(cache, skip_pages, job):
+    """Answer a job without extracting it: SKIPPED_PAGE, cached tables, or None"""
+    if job[1] in skip_pages.get(job[0], ()):
+        return SKIPPED_PAGE
+    return cached_tables(cache, job)
+
+
+def bounded_map(pool, fn, jobs, window, lookup=None):
+    """
+    Like pool.map(), but keeps at most `window` jobs in flight so finished
+    pages never pile up in memory faster than the consumer drains them.
+    lookup(job) may answer a job without the pool (e.g. a cache hit) by
+    returning something other than None. Results are yielded in job order.
+    """
+    jobs = iter(jobs)
+    pending = deque()
+    
+    def fill():
+        for job in itertools.islice(jobs, window - len(pending)):
+            result = lookup(job) if lookup else None
+            pending.append(result if result is not None else pool.submit(fn, job))
+    
+    fill()
+    while pending:
+        result = pending.popleft()
+        if isinstance(result, Future):
+            try:
+                result = result.result()
+            except Exception as exc:
+                # e.g. a worker process died; the caller decides whether to retry
+                result = exc
+        fill()
+        yield result
+
+
+def iter_serial_page_tables(pdf_path, cache=None, skip_pages=()):
+    """Yield extract_tables() output (or PageError / SKIPPED_PAGE) for every page of one PDF, in-process"""
+    pdf = None
+    try:
+        for job in page_jobs(pdf_path, cache):
+            tables = lookup_page(cache, {pdf_path: skip_pages}, job)
+            if tables is None:
+                try:
+                    if pdf is None:
+                        pdf = pdfplumber.open(pdf_path)
+                    tables = page_tables(pdf.pages[job[1]])
+                except Exception as exc:
+                    yield PageError(job[1], f"{type(exc).__name__}: {exc}")
+                    continue
+                if cache is not None:
+                    cache.put(job[2], tables)
+            yield tables
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def iter_pdf_page_tables(pdf_paths, workers=None, cache=None, skip_pages=None):
+    """
+    Yield (pdf_path, page_tables) for each PDF in pdf_paths.
+
+    page_tables is an iterator over the extract_tables() output of every page,
+    in page order. All pages of all PDFs share one process pool, so a batch of
+    wards keeps every core busy. Each page_tables iterator must be consumed
+    before moving on to the next PDF. With a cache, hits skip the pool and the
+    cache is trimmed back to its size limit once the batch is done.
+    skip_pages maps pdf_path -> page indexes that must not be extracted.
+    Failed pages come through as PageError.
+    """
+    workers = workers or default_workers()
+    skip_pages = skip_pages or {}
+
+    if workers <= 1:
+        for pdf_path in pdf_paths:
+            yield pdf_path, iter_serial_page_tables(pdf_path, cache, skip_pages.get(pdf_path, ()))
+    else:
+        pdf_jobs = [(pdf_path, page_jobs(pdf_path, cache)) for pdf_path in pdf_paths]
+        jobs = [job for _, page_list in pdf_jobs for job in page_list]
+
+        # Worker processes are only started once the first cache miss is submitted
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Results come back in submission order, which keeps the merged
+            # booth list identical to the serial path.
+            results = bounded_map(pool, partial(extract_page_tables, cache=cache), jobs,
+                                  workers * 2, lookup=partial(lookup_page, cache, skip_pages))
+            for pdf_path, page_list in pdf_jobs:
+                page_results = itertools.islice(results, len(page_list))
+                yield pdf_path, (PageError(job[1], f"{type(r).__name__}: {r}") if isinstance(r, Exception) else r
+                                 for job, r in zip(page_list, page_results))
+
+    if cache is not None:
+        cache.evict()
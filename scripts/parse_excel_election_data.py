@@ -1,28 +1,91 @@
 #!/usr/bin/env python3
 """
 Parse Excel files for Ward 27 election results - CORRECTED VERSION
+
+Workbooks are read through workbook_backends, so .xlsx, legacy .xls and .csv
+exports all go through the same streaming row API. Two sheet layouts are
+understood:
+  - booths across columns (Ward 27 result sheets: row 9 booth headers,
+    candidate rows from row 10 down to the total row, votes in every other column)
+  - one booth per row (Ward 5 sheets: a 'मतदान केंद्र क्र.' column followed by
+    one column per candidate up to NOTA)
 """
 
-import openpyxl
-import json
+import argparse
+import glob
 import os
 import re
 
+from booth_aggregation import iter_booth_records
+from booth_model import BoothBatch
+from election_pipeline import run_pipeline
+from election_sinks import SINK_FORMATS, make_sql_sink
+from workbook_backends import WORKBOOK_EXTENSIONS, open_workbook
+
 TENANT_ID = 'bf1a3e36-464e-4eff-b21d-dc71f5a5a582'
 
-def parse_ward_excel(excel_path, ward_suffix):
-    """Parse a single Excel file and extract all booth data - FIXED"""
-    print(f"\n{'='*60}")
-    print(f"Processing: {excel_path}")
-    print(f"Ward: 27-{ward_suffix}")
-    print(f"{'='*60}")
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), 'result')
+
+# Row 9 holds the booth headers, the candidates + NOTA follow from row 10
+HEADER_ROW = 9
+
+# Label of the valid votes total under the candidate block
+VALID_VOTES_MARKER = 'वैध'
+
+# Booth-per-row sheets: booth number column header and NOTA column headers
+BOOTH_COLUMN_HEADER = 'मतदान केंद्र क्र'
+NOTA_HEADERS = ('नोटा', 'NOTA', 'एकही नाही')
+
+# Seat letters used in Marathi file names (प्रभाग_क्र_5_अ_...)
+SEAT_LETTERS = {'A': 'अ', 'B': 'ब', 'C': 'क', 'D': 'ड'}
+
+def ends_candidate_block(row):
+    """True for the empty or valid votes total row that follows the last candidate"""
+    if not row or all(cell is None or str(cell).strip() == '' for cell in row):
+        return True
+    # Candidate rows are numbered; the total row has no serial number
+    if row[0] is None or str(row[0]).strip() == '':
+        return True
+    return any(VALID_VOTES_MARKER in str(cell) for cell in row[1:4] if cell is not None)
+
+def read_ward_sheet(excel_path):
+    """
+    Read the booth header row and all candidate rows of a result workbook
+    in a single pass over a streaming worksheet. The candidate block runs
+    from the row after the header to the first empty or total row, however
+    many candidates the ward has.
+    Returns (header_row, candidate_rows) as tuples of cell values.
+    """
+    rows = []
+    with open_workbook(excel_path) as wb:
+        for row in wb.iter_rows(min_row=HEADER_ROW):
+            if rows and ends_candidate_block(row):
+                break
+            rows.append(row)
     
-    wb = openpyxl.load_workbook(excel_path)
-    sheet = wb.active
+    # Streaming worksheets may trim trailing empty cells, pad to a common width
+    width = max((len(row) for row in rows), default=0)
+    rows = [tuple(row) + (None,) * (width - len(row)) for row in rows]
     
+    if not rows:
+        return (), []
+    return rows[0], rows[1:]
+
+def canonical_candidate(name, matcher=None):
+    """Map a candidate name from the sheet onto the election's candidate list, if one is given"""
+    if matcher is None or name == 'NOTA':
+        return name
+    match = matcher.match(name)
+    if not match:
+        print(f"  ⚠ '{name}' does not match any configured candidate, keeping sheet name")
+        return name
+    return match.candidate
+
+def iter_booth_column_booths(excel_path, matcher=None):
+    """Yield booth records from a sheet with booths across columns"""
     # Row 9 contains (२७) नवी पठ - पवती designation - booth headers start at column H
-    # Find row 9
-    header_row = list(sheet.iter_rows(min_row=9, max_row=9, values_only=True))[0]
+    header_row, candidate_rows = read_ward_sheet(excel_path)
     
     # Extract booth numbers from odd columns starting from column 7 (H)
     # Pattern: Column 7=booth header, Column 8=booth number
@@ -45,9 +108,7 @@ def parse_ward_excel(excel_path, ward_suffix):
     candidates_data = {}
     candidate_names = []
     
-    for row_idx in range(10, min(21, sheet.max_row + 1)):  # Process up to row 20 (candidates + NOTA)
-        row = list(sheet.iter_rows(min_row=row_idx, max_row=row_idx, values_only=True))[0]
-        
+    for row in candidate_rows:  # Candidates + NOTA from row 10
         # Get candidate name from columns 2-3 (C-D)
         candidate_parts = []
         for i in [2, 3]:
@@ -61,6 +122,7 @@ def parse_ward_excel(excel_path, ward_suffix):
         # Check if this is NOTA
         if 'एकही नाही' in candidate_name or 'NOTA' in candidate_name:
             candidate_name = 'NOTA'
+        candidate_name = canonical_candidate(candidate_name, matcher)
         
         # Extract votes from odd columns starting from column 7 (H)
         votes = []
@@ -88,138 +150,188 @@ def parse_ward_excel(excel_path, ward_suffix):
         total_votes_this_candidate = sum(votes)
         print(f"  {candidate_name[:45]:45} Total: {total_votes_this_candidate:6}, First 5: {votes[:5]}")
     
-    wb.close()
-    
-    # Organize data by booth
-    booths = []
-    for booth_idx, booth_num in enumerate(booth_numbers):
-        booth_votes = {}
-        total_votes = 0
+    # Winners and margins for every booth of the sheet come out of one vote matrix
+    if candidate_names:
+        # A repeated candidate row replaces the earlier one
+        candidate_names = list(dict.fromkeys(candidate_names))
+        votes = [candidates_data[name] for name in candidate_names]
+        yield from iter_booth_records(booth_numbers, candidate_names, votes, skip_empty=True)
+
+def find_booth_row_header(excel_path):
+    """
+    Return the 1-based row number of the 'मतदान केंद्र क्र.' header if the sheet
+    has one booth per row, or None for the booths-across-columns layout.
+    """
+    with open_workbook(excel_path) as wb:
+        for row_idx, row in enumerate(wb.iter_rows(max_row=HEADER_ROW), 1):
+            if any(cell and str(cell).strip().startswith(BOOTH_COLUMN_HEADER) for cell in row):
+                return row_idx
+    return None
+
+def to_vote_count(value):
+    """Cell value to int vote count; blanks and non-numeric cells count as 0"""
+    if value is None:
+        return 0
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+def iter_booth_row_booths(excel_path, header_row_idx, matcher=None):
+    """Yield booth records from a sheet with one booth per row (Ward 5 layout)"""
+    with open_workbook(excel_path) as wb:
+        rows = wb.iter_rows(min_row=header_row_idx)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows)]
         
-        for candidate_name in candidate_names:
-            if candidate_name in candidates_data and booth_idx < len(candidates_data[candidate_name]):
-                vote_count = candidates_data[candidate_name][booth_idx]
-                booth_votes[candidate_name] = vote_count
-                total_votes += vote_count
+        booth_col = next(i for i, h in enumerate(header) if h.startswith(BOOTH_COLUMN_HEADER))
         
-        if len(booth_votes) > 0 and total_votes > 0:
-            # Find winner (excluding NOTA)
-            non_nota_votes = {k: v for k, v in booth_votes.items() if k != 'NOTA'}
-            if non_nota_votes:
-                winner = max(non_nota_votes, key=non_nota_votes.get)
-                sorted_votes = sorted(non_nota_votes.values(), reverse=True)
-                margin = sorted_votes[0] - sorted_votes[1] if len(sorted_votes) > 1 else 0
-            else:
-                winner = 'Unknown'
-                margin = 0
-            
-            booths.append({
-                'booth_number': booth_num,
-                'total_votes': total_votes,
-                'candidate_votes': booth_votes,
-                'winner': winner,
-                'margin': margin
-            })
-    
-    print(f"\n✓ Extracted {len(booths)} booths from Ward 27-{ward_suffix}")
-    print(f"  Total votes across all booths: {sum(b['total_votes'] for b in booths)}")
-    return booths
-
-def generate_complete_sql(all_ward_data, output_file):
-    """Generate complete SQL for all wards"""
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("-- ====================================================================\n")
-        f.write("-- Complete Booth-by-Booth Election Results for Ward 27\n")
-        f.write(f"-- Tenant: {TENANT_ID}\n")
-        f.write("-- Generated from Excel files\n")
-        f.write("-- ====================================================================\n\n")
-        
-        f.write("-- Delete all existing Ward 27 data first\n")
-        f.write(f"DELETE FROM election_results WHERE tenant_id = '{TENANT_ID}';\n\n")
+        # Candidate columns run from the booth column up to and including NOTA
+        candidate_cols = []
+        for col_idx in range(booth_col + 1, len(header)):
+            name = header[col_idx]
+            if not name:
+                continue
+            if any(nota in name for nota in NOTA_HEADERS):
+                candidate_cols.append((col_idx, 'NOTA'))
+                break
+            candidate_cols.append((col_idx, canonical_candidate(name, matcher)))
         
-        total_booths = 0
-        total_votes_all = 0
+        print(f"Found {len(candidate_cols)} candidates: {[name for _, name in candidate_cols]}")
         
-        for ward_suffix in ['A', 'B', 'C', 'D']:
-            if ward_suffix not in all_ward_data:
+        # Collect the sheet into a candidate x booth matrix, then aggregate it in one go
+        booth_numbers = []
+        votes = [[] for _ in candidate_cols]
+        for row in rows:
+            # Booth rows start with a serial number; totals / postal vote rows do not
+            if len(row) <= booth_col or not isinstance(row[0], int) or row[booth_col] is None:
                 continue
-                
-            booths = all_ward_data[ward_suffix]
-            ward_name = f"Ward 27-{ward_suffix}"
-            ward_total_votes = sum(b['total_votes'] for b in booths)
-            
-            f.write(f"\n-- {'='*60}\n")
-            f.write(f"-- Ward 27-{ward_suffix}: {len(booths)} booths, {ward_total_votes:,} total votes\n")
-            f.write(f"-- {'='*60}\n\n")
             
-            for booth in booths:
-                votes_json = json.dumps(booth['candidate_votes'], ensure_ascii=False)
-                
-                f.write(f"-- Booth {booth['booth_number']}: {booth['total_votes']} votes, Winner: {booth['winner']}\n")
-                f.write(f"INSERT INTO election_results (\n")
-                f.write(f"    ward_name, booth_number, booth_name,\n")
-                f.write(f"    total_voters, total_votes_casted, candidate_votes,\n")
-                f.write(f"    winner, margin, tenant_id, created_at\n")
-                f.write(f") VALUES (\n")
-                f.write(f"    '{ward_name}',\n")
-                f.write(f"    '{booth['booth_number']}',\n")
-                f.write(f"    'मतदान केंद्र {booth['booth_number']}',\n")
-                f.write(f"    0,\n")
-                f.write(f"    {booth['total_votes']},\n")
-                f.write(f"    '{votes_json}'::jsonb,\n")
-                f.write(f"    '{booth['winner']}',\n")
-                f.write(f"    {booth['margin']},\n")
-                f.write(f"    '{TENANT_ID}',\n")
-                f.write(f"    NOW()\n")
-                f.write(f");\n\n")
-                
-                total_booths += 1
-                total_votes_all += booth['total_votes']
-        
-        f.write(f"\n\n-- ====================================================================\n")
-        f.write(f"-- Verification Query\n")
-        f.write(f"-- ====================================================================\n")
-        f.write(f"SELECT \n")
-        f.write(f"    ward_name, \n")
-        f.write(f"    COUNT(*) as booth_count, \n")
-        f.write(f"    SUM(total_votes_casted) as total_votes\n")
-        f.write(f"FROM election_results\n")
-        f.write(f"WHERE tenant_id = '{TENANT_ID}'\n")
-        f.write(f"GROUP BY ward_name\n")
-        f.write(f"ORDER BY ward_name;\n")
+            # Booth cells look like '5/12' (ward/booth)
+            booth_numbers.append(str(row[booth_col]).split('/')[-1].strip())
+            for cand_idx, (col_idx, _) in enumerate(candidate_cols):
+                votes[cand_idx].append(to_vote_count(row[col_idx]) if col_idx < len(row) else 0)
+    
+    if candidate_cols:
+        candidate_names = [name for _, name in candidate_cols]
+        yield from iter_booth_records(booth_numbers, candidate_names, votes, skip_empty=True)
+
+def iter_ward_excel_booths(excel_path, ward_suffix, ward='27', matcher=None):
+    """
+    Parse a single workbook (.xlsx, .xls or .csv) and yield booth records one at a time.
+    With a CandidateMatcher, sheet candidate names are replaced by the configured ones.
+    """
+    print(f"\n{'='*60}")
+    print(f"Processing: {excel_path}")
+    print(f"Ward: {ward}-{ward_suffix}")
+    print(f"{'='*60}")
+    
+    header_row_idx = find_booth_row_header(excel_path)
+    if header_row_idx is None:
+        booths = iter_booth_column_booths(excel_path, matcher)
+    else:
+        booths = iter_booth_row_booths(excel_path, header_row_idx, matcher)
+    
+    booth_count = 0
+    votes_all_booths = 0
+    for booth in booths:
+        booth_count += 1
+        votes_all_booths += booth['total_votes']
+        yield booth
+    
+    print(f"\n✓ Extracted {booth_count} booths from Ward {ward}-{ward_suffix}")
+    print(f"  Total votes across all booths: {votes_all_booths}")
+    if not booth_count:
+        print(f"⚠ WARNING: No booths extracted from {excel_path}")
+
+def parse_ward_excel(excel_path, ward_suffix, ward='27'):
+    """Parse a single Excel file and extract all booth data - FIXED"""
+    return BoothBatch(iter_ward_excel_booths(excel_path, ward_suffix, ward))
+
+def find_ward_workbook(base_path, ward, suffix):
+    """
+    Locate the results workbook for one seat of a ward: '27A.xlsx' style names
+    in any supported format, or Marathi exports like 'प्रभाग_क्र_5_अ_पूर्ण_डेटा final.xls'.
+    """
+    for ext in WORKBOOK_EXTENSIONS:
+        path = os.path.join(base_path, f'{ward}{suffix}{ext}')
+        if os.path.exists(path):
+            return path
+    
+    pattern = os.path.join(base_path, f'प्रभाग_क्र_{ward}_{SEAT_LETTERS[suffix]}_*')
+    for path in sorted(glob.glob(pattern)):
+        if path.lower().endswith(WORKBOOK_EXTENSIONS):
+            return path
+    return None
+
+def generate_complete_sql(all_ward_data, output_file, sink_format='insert', batch_size=500, ward='27',
+                          tenant_id=TENANT_ID):
+    """
+    Generate complete SQL for all seats of a ward.
+    all_ward_data is a dict or an iterable of (ward_suffix, booths) pairs;
+    booths may be a lazy iterator, in which case each booth is written
+    as soon as it is parsed. sink_format is one of election_sinks.SINK_FORMATS.
+    Only the seats being imported are deleted before the insert.
+    """
+    if isinstance(all_ward_data, dict):
+        all_ward_data = [(s, all_ward_data[s]) for s in ['A', 'B', 'C', 'D'] if s in all_ward_data]
+    all_ward_data = list(all_ward_data)
+    
+    ward_names = [f"Ward {ward}-{ward_suffix}" for ward_suffix, _ in all_ward_data]
+    ward_sources = zip(ward_names, (booths for _, booths in all_ward_data))
+    sink = make_sql_sink(sink_format, output_file, tenant_id,
+                          title=f"Complete Booth-by-Booth Election Results for Ward {ward}",
+                          source_label="Excel files",
+                          ward_names=ward_names,
+                          batch_size=batch_size)
+    run_pipeline(ward_sources, sink)
     
     print(f"\n{'='*70}")
     print(f"✅ SQL GENERATION COMPLETE!")
     print(f"{'='*70}")
     print(f"Output file: {output_file}")
-    print(f"Total booths: {total_booths}")
-    print(f"Total votes: {total_votes_all:,}")
+    print(f"Total booths: {sink.total_booths}")
+    print(f"Total votes: {sink.total_votes:,}")
+    for ward_name in sink.empty_wards:
+        print(f"⚠ {ward_name}: no booths parsed, its existing results are left in place")
     print(f"\n📌 Next Steps:")
     print(f"1. Run this SQL file in Supabase SQL Editor")
     print(f"2. Refresh your Election Results page")
-    print(f"3. You should see all {total_booths} booths!")
+    print(f"3. You should see all {sink.total_booths} booths!")
 
 def main():
-    base_path = '/Users/shreyasjadhav/Desktop/Nagar 2/Nagarsevak-Managment/result'
-    output_sql = '/Users/shreyasjadhav/Desktop/Nagar 2/Nagarsevak-Managment/scripts/import_all_wards_from_excel.sql'
+    parser = argparse.ArgumentParser(description="Parse ward result workbooks (.xlsx, .xls, .csv) into SQL")
+    parser.add_argument('--ward', default='27', help="ward number, e.g. 27 or 5")
+    parser.add_argument('--base-path', default=RESULT_DIR)
+    parser.add_argument('--output', default=None,
+                        help="defaults to scripts/import_all_wards_from_excel.sql for Ward 27, "
+                             "scripts/import_ward<N>_from_excel.sql otherwise")
+    parser.add_argument('--format', choices=SINK_FORMATS, default='insert',
+                        help="SQL layout: per-booth INSERTs, batched VALUES, or COPY blocks for psql")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="booths per INSERT statement with --format values")
+    args = parser.parse_args()
+    base_path = args.base_path
+    ward = args.ward
+    output_sql = args.output
+    if output_sql is None:
+        output_name = 'import_all_wards_from_excel.sql' if ward == '27' else f'import_ward{ward}_from_excel.sql'
+        output_sql = os.path.join(SCRIPTS_DIR, output_name)
     
-    ward_data = {}
+    excel_files = {}
     
     for suffix in ['A', 'B', 'C', 'D']:
-        excel_file = os.path.join(base_path, f'27{suffix}.xlsx')
-        if os.path.exists(excel_file):
-            booths = parse_ward_excel(excel_file, suffix)
-            if booths:
-                ward_data[suffix] = booths
-            else:
-                print(f"⚠ WARNING: No booths extracted from {excel_file}")
+        excel_file = find_ward_workbook(base_path, ward, suffix)
+        if excel_file:
+            excel_files[suffix] = excel_file
         else:
-            print(f"\n⚠ File not found: 27{suffix}.xlsx")
-            print(f"  If you have this data, please save it as Excel at: {excel_file}")
+            print(f"\n⚠ File not found: {ward}{suffix}.xlsx / .xls / .csv")
+            print(f"  If you have this data, please save it in {base_path}")
     
-    if ward_data:
-        generate_complete_sql(ward_data, output_sql)
+    if excel_files:
+        # Booths stream from each workbook straight into the SQL file
+        ward_data = ((suffix, iter_ward_excel_booths(excel_file, suffix, ward))
+                     for suffix, excel_file in excel_files.items())
+        generate_complete_sql(ward_data, output_sql, args.format, args.batch_size, ward)
     else:
         print("\n❌ ERROR: No data extracted! Please check the Excel files.")
 
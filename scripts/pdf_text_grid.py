@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Fast path for ward result pages: rebuild the results table from word positions.
+
+pdfplumber's extract_tables() has to find ruling lines, intersect them and
+assign characters to cells. A ward result page is a regular grid, so most of
+that can be skipped: extract_words() gives every word with its coordinates,
+words with the same baseline form a row, and each booth column spans from its
+"म.क.क्र.: N" header cell to the next one.
+
+The rebuilt grid is only trusted when it balances: for every booth column
+the candidate votes have to add up to the valid votes row
+("वैध मतांची संख्या") underneath them, every candidate row needs exactly one
+number per booth, and the grid must have at least one candidate row. Pages
+that fail any check (or have no valid votes row to check against) go
+through extract_tables() as before. Pages whose text is made of unmapped
+(cid:N) glyphs have no usable text layer, so they skip the grid entirely.
+The fast path only helps PDFs with a real text layer.
+
+page_tables() returns the grid in the same shape as extract_tables(), so
+parse_booth_table() and the table cache work unchanged.
+"""
+
+import bisect
+import re
+
+# Rows closer than this (in points) belong to the same line
+LINE_TOLERANCE = 3
+
+HEADER_RE = re.compile(r'क्र\.?\s*:\s*(\d*)$')
+NUMBER_RE = re.compile(r'^\d+$')
+CANDIDATE_PREFIX_RE = re.compile(r'^\d{3}-')
+VALID_VOTES_MARKER = 'वैध'
+# pdfplumber's text for glyphs the font has no Unicode mapping for
+UNMAPPED_GLYPH = '(cid:'
+
+HEADER_LABELS = ['अ.क्र.', 'उमेदवाराचे नाव']
+VALID_VOTES_LABEL = 'वैध मतांची संख्या'
+
+
+def group_lines(words, tolerance=LINE_TOLERANCE):
+    """Group words into lines by their top coordinate; each line sorted left to right"""
+    lines = []
+    for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
+        if lines and word['top'] - lines[-1][0]['top'] <= tolerance:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w['x0']) for line in lines]
+
+
+def center(word):
+    return (word['x0'] + word['x1']) / 2
+
+
+def header_columns(line):
+    """[(booth_number, x_start)] from a 'म.क.क्र.: N' header line, or [] if it is not one"""
+    columns = []
+    for i, word in enumerate(line):
+        match = HEADER_RE.search(word['text'])
+        if not match:
+            continue
+        if match.group(1):
+            columns.append((match.group(1), word['x0']))
+        elif i + 1 < len(line) and NUMBER_RE.match(line[i + 1]['text']):
+            columns.append((line[i + 1]['text'], word['x0']))
+    return columns
+
+
+def row_values(line, starts):
+    """
+    Assign the numbers of a line to the booth column they sit in; starts are
+    the left edges of the columns. Returns (label_words, values) or None if a
+    column is empty or holds two numbers.
+    """
+    labels = []
+    values = [None] * len(starts)
+    for word in line:
+        # Tolerate numbers drifting slightly left of their header
+        col = bisect.bisect_right(starts, center(word) + LINE_TOLERANCE) - 1
+        if col < 0 or not NUMBER_RE.match(word['text']):
+            labels.append(word['text'])
+            continue
+        if values[col] is not None:
+            return None
+        values[col] = int(word['text'])
+    if any(v is None for v in values):
+        return None
+    return labels, values
+
+
+def grid_from_words(words):
+    """
+    Rebuild the results grid of a page from extract_words() output.
+    Returns the grid (list of rows of strings) if it balances, otherwise None.
+    """
+    lines = group_lines(words)
+
+    columns = []
+    header_idx = None
+    for idx, line in enumerate(lines):
+        columns = header_columns(line)
+        if columns:
+            header_idx = idx
+            break
+    if not columns:
+        return None
+
+    booth_numbers = [b for b, _ in columns]
+    starts = [x for _, x in columns]
+
+    candidate_rows = []
+    valid_votes = None
+    for line in lines[header_idx + 1:]:
+        first = line[0]['text']
+        if CANDIDATE_PREFIX_RE.match(first):
+            parsed = row_values(line[1:], starts)
+            if parsed is None:
+                return None
+            labels, values = parsed
+            candidate_rows.append([first, ' '.join(labels)] + [str(v) for v in values])
+        elif any(VALID_VOTES_MARKER in word['text'] for word in line):
+            parsed = row_values(line, starts)
+            if parsed is None:
+                return None
+            valid_votes = parsed[1]
+            break
+
+    if not candidate_rows or valid_votes is None:
+        return None
+
+    # Checksum: candidate votes of every booth add up to its valid votes
+    for col, expected in enumerate(valid_votes):
+        if sum(int(row[2 + col]) for row in candidate_rows) != expected:
+            return None
+
+    header = HEADER_LABELS + [f"म.क.क्र.: {b}" for b in booth_numbers]
+    footer = ['', VALID_VOTES_LABEL] + [str(v) for v in valid_votes]
+    return [header] + candidate_rows + [footer]
+
+
+def page_tables(page):
+    """extract_tables() output for a page, from the word grid when it balances"""
+    words = page.extract_words()
+    # No text layer to rebuild a grid from; don't bother grouping lines
+    if any(UNMAPPED_GLYPH in word['text'] for word in words):
+        return page.extract_tables()
+    grid = grid_from_words(words)
+    if grid is not None:
+        return [grid]
+    return page.extract_tables()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Reconcile the PDF and Excel results of the same seats.
+
+Ward 27-A exists both as 27A.pdf and 27A.xlsx, and the two parsers can
+disagree without anybody noticing. For every seat that has both sources
+this script:
+
+  1. parses the PDF (extract_complete_election_data) and the workbook
+     (parse_excel_election_data) concurrently, every source in its own
+     worker process, PDF tables coming from the table cache when possible;
+  2. maps candidate names of both sides onto the candidate list with
+     CandidateMatcher and joins the booths on booth number (dicts, no
+     nested scans);
+  3. writes every disagreement - booths or candidates missing on one side,
+     differing vote counts - to a CSV;
+  4. writes a merged dataset with the best source per booth.
+
+Best source per booth: the only source that has it; otherwise the source
+that found more of the listed candidates; otherwise --prefer (the cleaned
+workbooks by default). Booths where the sources disagree are marked
+"conflict" in the merged output so they can be checked by hand.
+
+Seats come either from --base-path / --ward ('27A.pdf' next to '27A.xlsx',
+one candidate list for all of them) or from an ingestion manifest (see
+ingest_elections.py): every PDF seat there whose workbook sits next to the
+PDF, with the seat's own candidates.
+
+Usage:
+    python scripts/reconcile_sources.py --base-path result --ward 27
+    python scripts/reconcile_sources.py --manifest scripts/elections_manifest.json --sql /tmp/merged.sql
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from booth_aggregation import iter_booth_records
+from booth_model import BoothBatch
+from candidate_matcher import CandidateMatcher, normalize_text
+from election_pipeline import run_pipeline
+from election_sinks import SINK_FORMATS, make_sql_sink
+from extract_complete_election_data import CANDIDATES, RESULT_DIR, TENANT_ID
+from parallel_extraction import default_workers
+from parse_excel_election_data import find_ward_workbook
+from table_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, TableCache
+
+SOURCES = ('pdf', 'excel')
+
+DISCREPANCY_FIELDS = ('ward_name', 'booth_number', 'candidate', 'kind', 'pdf_votes', 'excel_votes', 'difference')
+
+
+def find_seat_pairs(base_path, wards, candidates):
+    """(ward, seat, pdf_path, excel_path, candidates) for every seat with both a PDF and a workbook"""
+    pairs = []
+    for ward in wards:
+        for seat in ['A', 'B', 'C', 'D']:
+            pdf_path = os.path.join(base_path, f'{ward}{seat}.pdf')
+            excel_path = find_ward_workbook(base_path, ward, seat)
+            if os.path.exists(pdf_path) and excel_path:
+                pairs.append((ward, seat, pdf_path, excel_path, candidates))
+    return pairs
+
+
+def manifest_seat_pairs(manifest_path):
+    """Seat pairs for the PDF seats of a manifest that have a workbook beside the PDF"""
+    from ingest_elections import load_manifest
+
+    pairs = []
+    for tenant in load_manifest(manifest_path):
+        for seat in tenant['seats']:
+            if not seat['is_pdf'] or not os.path.exists(seat['source']):
+                continue
+            excel_path = find_ward_workbook(os.path.dirname(seat['source']), seat['ward'], seat['seat'])
+            if excel_path:
+                pairs.append((seat['ward'], seat['seat'], seat['source'], excel_path, seat['candidates']))
+    return pairs
+
+
+def parse_source(kind, path, ward, seat, candidates, cache=None):
+    """Worker: parse one source and return (BoothBatch, error)"""
+    matcher = CandidateMatcher(candidates)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            if kind == 'pdf':
+                from extract_complete_election_data import extract_booth_data_from_pdf
+                from parallel_extraction import iter_serial_page_tables
+                return extract_booth_data_from_pdf(path, seat, iter_serial_page_tables(path, cache),
+                                                   ward, matcher), None
+            from parse_excel_election_data import iter_ward_excel_booths
+            return BoothBatch(iter_ward_excel_booths(path, seat, ward, matcher)), None
+    except Exception as exc:
+        return BoothBatch(), f"{type(exc).__name__}: {exc}"
+
+
+def index_booths(booths, matcher):
+    """{booth_number: {candidate: votes}} with names mapped onto the candidate list"""
+    index = {}
+    for booth in booths:
+        votes = {}
+        for name, count in booth['candidate_votes'].items():
+            match = matcher.match(name)
+            key = match.candidate if match else normalize_text(name)
+            votes[key] = votes.get(key, 0) + count
+        index[str(booth['booth_number'])] = votes
+    return index
+
+
+def booth_sort_key(booth_number):
+    return (0, int(booth_number), '') if booth_number.isdigit() else (1, 0, booth_number)
+
+
+def reconcile_seat(ward_name, parsed, candidates, prefer='excel'):
+    """
+    Join the booths of both sources of one seat.
+    parsed maps 'pdf' / 'excel' to {booth_number: {candidate: votes}}.
+    Returns (discrepancies, merged) where merged is a list of
+    (booth_number, votes, source, status).
+    """
+    pdf, excel = parsed['pdf'], parsed['excel']
+    listed = set(candidates)
+    discrepancies = []
+    merged = []
+
+    for booth_number in sorted(pdf.keys() | excel.keys(), key=booth_sort_key):
+        in_pdf, in_excel = pdf.get(booth_number), excel.get(booth_number)
+        if in_pdf is None or in_excel is None:
+            source = 'excel' if in_pdf is None else 'pdf'
+            discrepancies.append({
+                'ward_name': ward_name, 'booth_number': booth_number, 'candidate': '',
+                'kind': f'missing_in_{"pdf" if in_pdf is None else "excel"}',
+                'pdf_votes': sum(in_pdf.values()) if in_pdf else '',
+                'excel_votes': sum(in_excel.values()) if in_excel else '',
+                'difference': '',
+            })
+            merged.append((booth_number, in_excel if in_pdf is None else in_pdf, source, 'single'))
+            continue
+
+        differs = False
+        for candidate in list(in_pdf) + [c for c in in_excel if c not in in_pdf]:
+            pdf_votes, excel_votes = in_pdf.get(candidate), in_excel.get(candidate)
+            if pdf_votes == excel_votes:
+                continue
+            differs = True
+            if pdf_votes is None or excel_votes is None:
+                kind = f'candidate_missing_in_{"pdf" if pdf_votes is None else "excel"}'
+                difference = ''
+            else:
+                kind = 'votes_differ'
+                difference = excel_votes - pdf_votes
+            discrepancies.append({
+                'ward_name': ward_name, 'booth_number': booth_number, 'candidate': candidate,
+                'kind': kind,
+                'pdf_votes': '' if pdf_votes is None else pdf_votes,
+                'excel_votes': '' if excel_votes is None else excel_votes,
+                'difference': difference,
+            })
+
+        if not differs:
+            merged.append((booth_number, in_excel, 'both', 'agree'))
+            continue
+
+        coverage = {'pdf': len(listed & in_pdf.keys()), 'excel': len(listed & in_excel.keys())}
+        if coverage['pdf'] != coverage['excel']:
+            source = max(coverage, key=coverage.get)
+        else:
+            source = prefer
+        merged.append((booth_number, in_pdf if source == 'pdf' else in_excel, source, 'conflict'))
+
+    return discrepancies, merged
+
+
+def merged_booth_records(merged, candidates):
+    """Rebuild full booth records (winner, margin, ...) for the merged votes of a seat"""
+    names = list(candidates)
+    for _, votes, _, _ in merged:
+        names.extend(c for c in votes if c not in names)
+    booth_numbers = [booth_number for booth_number, _, _, _ in merged]
+    matrix = [[votes.get(name, 0) for _, votes, _, _ in merged] for name in names]
+    if not booth_numbers:
+        return []
+    return list(iter_booth_records(booth_numbers, names, matrix))
+
+
+def load_candidates(path):
+    """Candidate list from a JSON file: a plain list or a golden file with 'candidates'"""
+    if not path:
+        return CANDIDATES
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return data['candidates'] if isinstance(data, dict) else data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile PDF and Excel election results booth by booth")
+    parser.add_argument('--base-path', default=RESULT_DIR)
+    parser.add_argument('--ward', default='27', help="comma separated ward numbers, e.g. 27,5")
+    parser.add_argument('--candidates', help="JSON candidate list (or golden file) instead of the Ward 27 list")
+    parser.add_argument('--manifest', help="take seats and their candidates from an ingestion manifest")
+    parser.add_argument('--prefer', choices=SOURCES, default='excel',
+                        help="source used for booths where both sources are equally complete but disagree")
+    parser.add_argument('--output-dir', default='.', help="where the discrepancy CSV and merged JSONL go")
+    parser.add_argument('--sql', help="also write the merged dataset as an election_results import script")
+    parser.add_argument('--format', choices=SINK_FORMATS, default='insert')
+    parser.add_argument('--workers', type=int, default=default_workers())
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="on-disk cache of per-page extract_tables() output")
+    parser.add_argument('--no-cache', action='store_true', help="always re-run table extraction")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else TableCache(args.cache_dir, DEFAULT_MAX_BYTES)
+
+    if args.manifest:
+        pairs = manifest_seat_pairs(args.manifest)
+    else:
+        pairs = find_seat_pairs(args.base_path, [w.strip() for w in args.ward.split(',') if w.strip()],
+                                load_candidates(args.candidates))
+    if not pairs:
+        print("❌ ERROR: No seat has both a PDF and a workbook")
+        return
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {}
+        for ward, seat, pdf_path, excel_path, candidates in pairs:
+            for kind, path in (('pdf', pdf_path), ('excel', excel_path)):
+                futures[(ward, seat, kind)] = pool.submit(parse_source, kind, path, ward, seat, candidates, cache)
+        results = {key: future.result() for key, future in futures.items()}
+    parse_seconds = time.perf_counter() - start
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    discrepancy_path = os.path.join(args.output_dir, 'reconcile_discrepancies.csv')
+    merged_path = os.path.join(args.output_dir, 'reconcile_merged.jsonl')
+
+    merged_wards = []
+    with open(discrepancy_path, 'w', encoding='utf-8', newline='') as disc_f, \
+            open(merged_path, 'w', encoding='utf-8') as merged_f:
+        writer = csv.DictWriter(disc_f, fieldnames=DISCREPANCY_FIELDS)
+        writer.writeheader()
+
+        print(f"{'Seat':10} {'PDF':>5} {'Excel':>6} {'Agree':>6} {'Conflict':>9} {'Single':>7} {'Issues':>7}")
+        print('-' * 56)
+        for ward, seat, pdf_path, excel_path, candidates in pairs:
+            ward_name = f"Ward {ward}-{seat}"
+            matcher = CandidateMatcher(candidates)
+            parsed = {}
+            for kind in SOURCES:
+                booths, error = results[(ward, seat, kind)]
+                if error:
+                    print(f"  ⚠ {ward_name}: {kind} parser failed: {error}")
+                parsed[kind] = index_booths(booths, matcher)
+
+            discrepancies, merged = reconcile_seat(ward_name, parsed, candidates, args.prefer)
+            writer.writerows(discrepancies)
+
+            records = merged_booth_records(merged, candidates)
+            for record, (_, _, source, status) in zip(records, merged):
+                merged_f.write(json.dumps({'ward_name': ward_name, 'source': source, 'status': status,
+                                           **record}, ensure_ascii=False) + '\n')
+            merged_wards.append((ward_name, records))
+
+            status = [m[3] for m in merged]
+            print(f"{ward_name:10} {len(parsed['pdf']):5} {len(parsed['excel']):6} {status.count('agree'):6} "
+                  f"{status.count('conflict'):9} {status.count('single'):7} {len(discrepancies):7}")
+
+    if args.sql:
+        sink = make_sql_sink(args.format, args.sql, TENANT_ID,
+                             title="Reconciled Booth-by-Booth Election Results",
+                             source_label="PDF and Excel sources (reconcile_sources.py)",
+                             ward_names=[ward_name for ward_name, _ in merged_wards])
+        run_pipeline(merged_wards, sink)
+
+    print(f"\nParsed {len(pairs)} seats ({len(pairs) * 2} sources) in {parse_seconds:.2f}s, "
+          f"total {time.perf_counter() - start:.2f}s")
+    print(f"Discrepancies: {discrepancy_path}")
+    print(f"Merged dataset: {merged_path}")
+    if args.sql:
+        print(f"Merged SQL: {args.sql}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of pdfplumber extract_tables() output.
+
+Layout analysis dominates the cost of parsing a ward PDF, and its output
+only depends on the page contents and the extractor settings. Entries are
+keyed by (PDF SHA-256, page index, settings) so re-running an extractor
+after a parser fix reads tables straight from disk, while an edited PDF,
+different table settings or a pdfplumber upgrade all miss.
+
+The cache directory is bounded: entries are touched on every hit and the
+least recently used ones are evicted once the directory grows past
+max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CACHE_DIR = os.path.join(SCRIPTS_DIR, '.table_cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def file_sha256(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extractor_settings(table_settings=None):
+    """Everything besides the page itself that can change extract_tables() output"""
+    import pdfplumber
+    return {
+        'pdfplumber': pdfplumber.__version__,
+        'table_settings': table_settings or {},
+        # Pages may come from the word grid fast path (pdf_text_grid.py)
+        'text_grid': 1,
+    }
+
+
+class TableCache:
+    """Size-bounded LRU cache of per-page tables, stored as one JSON file per page"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, pdf_sha, page_index, settings):
+        raw = json.dumps([pdf_sha, page_index, settings], sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def get(self, key):
+        """Return cached tables for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                tables = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return tables
+
+    def put(self, key, tables):
+        """Store tables for key; concurrent writers of the same key are harmless"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(tables, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+PostgresLoaderSink against a throwaway PostgreSQL schema.
+
+Needs a database to write to; point ELECTION_TEST_DSN at one (the tests
+create and drop their own schema, nothing else is touched):
+
+    ELECTION_TEST_DSN=postgresql://postgres@localhost/postgres python -m pytest scripts/tests
+"""
+
+import os
+import sys
+import unittest
+import uuid
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+DSN = os.environ.get('ELECTION_TEST_DSN')
+
+TENANT_ID = 'bf1a3e36-464e-4eff-b21d-dc71f5a5a582'
+
+CREATE_TABLE_SQL = """
+CREATE TABLE election_results (
+    ward_name TEXT NOT NULL,
+    booth_number TEXT NOT NULL,
+    booth_name TEXT NOT NULL,
+    total_voters INTEGER NOT NULL DEFAULT 0,
+    total_votes_casted INTEGER NOT NULL DEFAULT 0,
+    candidate_votes JSONB NOT NULL DEFAULT '{}'::jsonb,
+    winner TEXT,
+    margin INTEGER DEFAULT 0,
+    tenant_id UUID NOT NULL
+)
+"""
+
+
+def booth(number, votes):
+    return {'booth_number': str(number), 'candidate_votes': {'A': votes, 'NOTA': 1},
+            'total_votes': votes + 1, 'winner': 'A', 'margin': votes - 1}
+
+
+@unittest.skipUnless(DSN, "set ELECTION_TEST_DSN to run the loader against PostgreSQL")
+class PostgresLoaderSinkTest(unittest.TestCase):
+
+    def setUp(self):
+        import psycopg2
+        from psycopg2.extensions import make_dsn
+
+        self.schema = f'loader_test_{uuid.uuid4().hex[:12]}'
+        self.conn = psycopg2.connect(DSN)
+        self.conn.autocommit = True
+        with self.conn.cursor() as cur:
+            cur.execute(f'CREATE SCHEMA {self.schema}')
+            cur.execute(f'SET search_path TO {self.schema}')
+            cur.execute(CREATE_TABLE_SQL)
+        self.dsn = make_dsn(DSN, options=f'-c search_path={self.schema}')
+
+    def tearDown(self):
+        with self.conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA {self.schema} CASCADE')
+        self.conn.close()
+
+    def insert(self, ward_name, booth_numbers):
+        with self.conn.cursor() as cur:
+            for number in booth_numbers:
+                cur.execute("INSERT INTO election_results (ward_name, booth_number, booth_name, tenant_id) "
+                            "VALUES (%s, %s, 'old', %s)", (ward_name, str(number), TENANT_ID))
+
+    def rows(self):
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT ward_name, booth_number, booth_name FROM election_results "
+                        "ORDER BY ward_name, booth_number")
+            return cur.fetchall()
+
+    def load(self, sources, **kwargs):
+        from election_db_loader import PostgresLoaderSink
+        from election_pipeline import run_pipeline
+
+        ward_names = list(dict.fromkeys(ward_name for ward_name, _ in sources))
+        sink = PostgresLoaderSink(self.dsn, TENANT_ID, ward_names=ward_names, **kwargs)
+        return run_pipeline(((w, iter(booths)) for w, booths in sources), sink)
+
+    def test_ward_split_across_batches(self):
+        self.insert('Ward 27-A', [1, 2, 3, 9])
+        self.insert('Ward 27-B', [1])
+        sink = self.load([
+            ('Ward 27-A', [booth(1, 10), booth(2, 20)]),
+            ('Ward 27-B', [booth(1, 30)]),
+            ('Ward 27-A', [booth(3, 40)]),
+        ], batch_size=1)
+
+        self.assertEqual(sink.transactions, 3)
+        self.assertEqual(self.rows(), [
+            ('Ward 27-A', '1', 'मतदान केंद्र 1'),
+            ('Ward 27-A', '2', 'मतदान केंद्र 2'),
+            ('Ward 27-A', '3', 'मतदान केंद्र 3'),
+            ('Ward 27-B', '1', 'मतदान केंद्र 1'),
+        ])
+        self.assertEqual((sink.deleted_rows, sink.inserted_rows), (5, 4))
+
+    def test_batched_load_matches_single_transaction(self):
+        sources = [
+            ('Ward 27-A', [booth(1, 10)]),
+            ('Ward 27-B', [booth(1, 30), booth(2, 5)]),
+            ('Ward 27-A', [booth(2, 40)]),
+        ]
+        self.insert('Ward 27-A', [1, 2])
+        single = self.load(sources)
+        expected = self.rows()
+
+        self.insert('Ward 27-A', [7])
+        batched = self.load(sources, batch_size=1)
+        self.assertEqual(self.rows(), expected)
+        self.assertEqual(batched.inserted_rows, single.inserted_rows)
+
+    def test_dry_run_leaves_the_table_alone(self):
+        self.insert('Ward 27-A', [1, 2])
+        before = self.rows()
+        sink = self.load([('Ward 27-A', [booth(1, 10)]), ('Ward 27-B', [booth(1, 5)]),
+                          ('Ward 27-A', [booth(2, 20)])], batch_size=1, dry_run=True)
+        self.assertEqual(self.rows(), before)
+        self.assertEqual((sink.deleted_rows, sink.inserted_rows), (2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Pluggable workbook backends for the election results Excel ingestion path.
+
+Every backend exposes the same streaming row API:
+
+    with open_workbook(path) as wb:
+        for row in wb.iter_rows(min_row=9, max_row=20):
+            ...
+
+Rows are tuples of cell values (1-based row numbers, like openpyxl),
+empty cells are None and whole-number cells are ints, so the booth parsers
+in parse_excel_election_data.py do not care which format a ward's results
+were saved in.
+
+    .xlsx / .xlsm   openpyxl read-only (streaming) worksheets
+    .xls            xlrd (legacy Excel 97-2003 workbooks)
+    .csv            csv module
+"""
+
+import csv
+import os
+import re
+
+INTEGER_RE = re.compile(r'-?\d+')
+
+
+def normalize_cell(value):
+    """Map backend-specific empty/float values onto the shared conventions"""
+    if value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class WorkbookBackend:
+    """Base class: subclasses implement _iter_all_rows() and close()"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def iter_rows(self, min_row=1, max_row=None):
+        """Yield rows min_row..max_row (inclusive) of the first worksheet"""
+        for row_idx, row in enumerate(self._iter_all_rows(min_row), min_row):
+            if max_row is not None and row_idx > max_row:
+                break
+            yield tuple(normalize_cell(v) for v in row)
+
+    def _iter_all_rows(self, min_row):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class XlsxBackend(WorkbookBackend):
+    """Streaming reader for .xlsx workbooks"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        import openpyxl
+        self.wb = openpyxl.load_workbook(path, read_only=True)
+
+    def iter_rows(self, min_row=1, max_row=None):
+        # Let openpyxl stop parsing the sheet XML after max_row
+        sheet = self.wb.active
+        for row in sheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True):
+            yield tuple(normalize_cell(v) for v in row)
+
+    def close(self):
+        self.wb.close()
+
+
+class XlsBackend(WorkbookBackend):
+    """Reader for legacy .xls workbooks"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        import xlrd
+        self.book = xlrd.open_workbook(path, on_demand=True)
+        self.sheet = self.book.sheet_by_index(0)
+
+    def _iter_all_rows(self, min_row):
+        for row_idx in range(min_row - 1, self.sheet.nrows):
+            yield self.sheet.row_values(row_idx)
+
+    def close(self):
+        self.book.release_resources()
+
+
+class CsvBackend(WorkbookBackend):
+    """Reader for a single-sheet CSV export"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.f = open(path, newline='', encoding='utf-8-sig')
+
+    def _iter_all_rows(self, min_row):
+        reader = csv.reader(self.f)
+        for row_idx, row in enumerate(reader, 1):
+            if row_idx >= min_row:
+                # CSV has no cell types; whole numbers come back as ints like the other backends
+                yield [int(v) if INTEGER_RE.fullmatch(v) else v for v in row]
+
+    def close(self):
+        self.f.close()
+
+
+BACKENDS = {
+    '.xlsx': XlsxBackend,
+    '.xlsm': XlsxBackend,
+    '.xls': XlsBackend,
+    '.csv': CsvBackend,
+}
+
+WORKBOOK_EXTENSIONS = tuple(BACKENDS)
+
+
+def open_workbook(path):
+    """Open a workbook with the backend matching its file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in BACKENDS:
+        raise ValueError(f"Unsupported workbook format '{ext}': {path}")
+    return BACKENDS[ext](path)
@@ -1,9 +1,4 @@
-import csv
-
-CSV_PATH = r'c:\Users\SAHIL\Downloads\Office\Nagarsevak-Managment\migrations\live_policies.csv'
-
-with open(CSV_PATH, 'r', encoding='utf-8') as f:
-    rows = list(csv.DictReader(f))
+from policy_catalog import load_live
 
 target_tables = {
     'ai_history', 'complaints', 'election_results', 'event_rsvps', 'events', 'gallery', 
@@ -14,15 +9,9 @@ target_tables = {
 }
 
 rogues = []
-for r in rows:
-    table = r['tablename']
-    policy = r['policyname']
-    cmd = r.get('operation', '').upper()
-    
-    if table not in target_tables:
-        continue
-    if cmd not in ('INSERT', 'UPDATE'):
-        continue
+for r in load_live().select(tables=target_tables, operations=('INSERT', 'UPDATE')):
+    table = r.table
+    policy = r.name
 
     # EXACT Test 19 logic from phase5b_rbac_verify.sql
     if policy in ('Tenant Isolation Insert', 'Tenant Isolation Update'):
@@ -64,11 +53,11 @@ print(f"Total Rogues Found in migrations/live_policies.csv: {len(rogues)}")
 anon_rogues = 0
 true_rogues = 0
 for i, r in enumerate(rogues, 1):
-    if "anon" in r['policyname'].lower() or "public" in r['policyname'].lower():
+    if "anon" in r.name.lower() or "public" in r.name.lower():
         anon_rogues += 1
     else:
         true_rogues += 1
-        print(f"ROGUE -> {r['tablename']} | {r['policyname']} | {r.get('operation')} | {r.get('roles')}")
+        print(f"ROGUE -> {r.table} | {r.name} | {r.operation} | {r.roles_text}")
 
 print(f"Filtered out {anon_rogues} anon/public policies known to be dropped.")
 print(f"Net remaining rogues: {true_rogues}")
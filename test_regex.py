@@ -1,7 +1,11 @@
 import csv
-import re
 import os
 
+from policy_expr import (
+    Func, is_call, is_name, member_feature_access, parse, strip_plan_checks, to_sql, transform,
+    upgrade_membership_checks, walk,
+)
+
 tables = {
   'ai_history': 'ai_content',
   'complaints': 'complaints',
@@ -36,39 +40,26 @@ tables = {
 def clean_qual(qual, table):
     if not qual:
         return qual
-    # Strip category and plan checks
-    cleaned = re.sub(
-        r" AND \(category = \( SELECT upper\(tenants\.tier\).*?\)\)",
-        "",
-        qual
-    )
-    cleaned = re.sub(
-        r" AND \(plan = \( SELECT upper\(tenants\.plan\).*?\)\)",
-        "",
-        cleaned
-    )
-    # Upgrade to EXISTS
-    cleaned = cleaned.replace(
-        "(tenant_id = ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE (user_tenant_mapping.user_id = auth.uid())))",
-        f"(EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id))"
-    )
-    cleaned = cleaned.replace(
-        "(tenant_id IN ( SELECT user_tenant_mapping.tenant_id FROM user_tenant_mapping WHERE (user_tenant_mapping.user_id = auth.uid())))",
-        f"(EXISTS (SELECT 1 FROM public.user_tenant_mapping utm WHERE utm.user_id = auth.uid() AND utm.tenant_id = {table}.tenant_id))"
-    )
-    return cleaned
+    # Strip category and plan checks, upgrade to EXISTS
+    cleaned = strip_plan_checks(parse(qual))
+    return upgrade_membership_checks(cleaned, table, parenthesize=True, super_admin=False)
 
 def append_feature_check(qual, table, feature):
     if not qual:
         return qual
-    if "public.has_feature_access" in qual:
-        return qual.replace(
-            f"public.has_feature_access(tenant_id",
-            f"public.has_member_feature_access({table}.tenant_id, auth.uid()"
-        )
+
+    def member_access(node):
+        if is_call(node, 'public.has_feature_access') and node.args and is_name(node.args[0], 'tenant_id'):
+            user = parse('auth.uid()')
+            return Func(name=('public', 'has_member_feature_access'),
+                        args=[parse(f'{table}.tenant_id'), user] + node.args[1:])
+        return node
+
+    if any(is_call(node, 'public.has_feature_access') for node in walk(qual)):
+        return to_sql(transform(qual, member_access))
     else:
-        appendage = f"(auth.role() = 'anon'::text OR auth.role() = 'service_role'::text OR {table}.tenant_id IS NULL OR public.has_member_feature_access({table}.tenant_id, auth.uid(), '{feature}'))"
-        return f"({qual}) AND {appendage}"
+        appendage = f"(auth.role() = 'anon'::text OR auth.role() = 'service_role'::text OR {table}.tenant_id IS NULL OR {to_sql(member_feature_access(table, feature))})"
+        return f"({to_sql(qual)}) AND {appendage}"
 
 def main():
     target_policies = ["Tenant Isolation Select", "Tenant Isolation Insert", "Tenant Isolation Update", "Tenant Isolation Delete"]